@@ -0,0 +1,93 @@
+from collections import Counter
+import datetime as dt
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002_create_rollups'
+down_revision = '0001_create_user_logs'
+branch_labels = None
+depends_on = None
+
+
+def _hour(ts):
+    if ts is None:
+        ts = dt.datetime.now(dt.timezone.utc)
+    if isinstance(ts, str):
+        ts = dt.datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt.timezone.utc)
+    return ts.astimezone(dt.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _fields(summary):
+    fields = {}
+    parts = (summary or '').split('; ')
+    for i, part in enumerate(parts):
+        key, sep, value = part.partition('=')
+        if not sep:
+            continue
+        if key.strip() == 'notes':
+            break
+        fields[key.strip()] = value.strip()
+    return fields
+
+
+def _backfill(bind, log_hourly, feedback_hourly, symptom_hourly) -> None:
+    types, feedback, symptoms = Counter(), Counter(), Counter()
+    result = bind.execution_options(stream_results=True).execute(
+        sa.text('SELECT type, result_summary, created_at FROM user_logs')
+    )
+    for log_type, summary, created_at in result:
+        bucket = _hour(created_at)
+        types[(bucket, log_type)] += 1
+        fields = _fields(summary)
+        if log_type == 'feedback':
+            feedback[(bucket, fields.get('context', '')[:50], fields.get('verdict', '')[:20])] += 1
+        elif log_type == 'symptom_check':
+            for name in fields.get('extracted', '').split(','):
+                if name.strip():
+                    symptoms[(bucket, name.strip()[:100])] += 1
+
+    if types:
+        op.bulk_insert(log_hourly, [
+            {'bucket_start': b, 'type': t, 'count': n} for (b, t), n in types.items()
+        ])
+    if feedback:
+        op.bulk_insert(feedback_hourly, [
+            {'bucket_start': b, 'context': c, 'verdict': v, 'count': n} for (b, c, v), n in feedback.items()
+        ])
+    if symptoms:
+        op.bulk_insert(symptom_hourly, [
+            {'bucket_start': b, 'name': s, 'count': n} for (b, s), n in symptoms.items()
+        ])
+
+
+def upgrade() -> None:
+    log_hourly = op.create_table(
+        'log_hourly_rollups',
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('type', sa.String(length=50), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    feedback_hourly = op.create_table(
+        'feedback_hourly_rollups',
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('context', sa.String(length=50), primary_key=True),
+        sa.Column('verdict', sa.String(length=20), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    symptom_hourly = op.create_table(
+        'symptom_hourly_rollups',
+        sa.Column('bucket_start', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('name', sa.String(length=100), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    _backfill(op.get_bind(), log_hourly, feedback_hourly, symptom_hourly)
+
+
+def downgrade() -> None:
+    op.drop_table('symptom_hourly_rollups')
+    op.drop_table('feedback_hourly_rollups')
+    op.drop_table('log_hourly_rollups')
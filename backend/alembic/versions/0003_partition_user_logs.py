@@ -0,0 +1,108 @@
+"""Turn user_logs into monthly range partitions on created_at (PostgreSQL only).
+
+The copy runs inside the migration transaction and holds an exclusive lock on
+user_logs for its duration, so run it in a maintenance window. SQLite (and any
+other dialect) keeps the plain table; the migration is a no-op there.
+"""
+import datetime as dt
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003_partition_user_logs'
+down_revision = '0002_create_rollups'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _month(ts):
+    return dt.date(ts.year, ts.month, 1)
+
+
+def _next_month(month):
+    return dt.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _create_partition(month) -> None:
+    op.execute(
+        f"CREATE TABLE user_logs_{month.year:04d}_{month.month:02d} PARTITION OF user_logs "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_next_month(month).isoformat()} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    seq = bind.execute(sa.text("SELECT pg_get_serial_sequence('user_logs', 'id')")).scalar()
+    oldest = bind.execute(sa.text('SELECT min(created_at) FROM user_logs')).scalar()
+
+    op.execute('ALTER TABLE user_logs RENAME TO user_logs_unpartitioned')
+    op.execute('ALTER INDEX IF EXISTS user_logs_pkey RENAME TO user_logs_unpartitioned_pkey')
+    op.execute('ALTER INDEX IF EXISTS ix_user_logs_id RENAME TO ix_user_logs_unpartitioned_id')
+    op.execute('ALTER INDEX IF EXISTS ix_user_logs_type RENAME TO ix_user_logs_unpartitioned_type')
+
+    # The partition key must be part of the primary key; ids stay unique via the shared sequence
+    op.execute(f"""
+        CREATE TABLE user_logs (
+            id integer NOT NULL DEFAULT nextval('{seq}'::regclass),
+            type varchar(50),
+            input_text text NOT NULL,
+            result_summary text,
+            created_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT user_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('CREATE INDEX ix_user_logs_id ON user_logs (id)')
+    op.execute('CREATE INDEX ix_user_logs_created_at ON user_logs (created_at)')
+    op.execute('CREATE INDEX ix_user_logs_type_created_at ON user_logs (type, created_at)')
+
+    today = dt.datetime.now(dt.timezone.utc)
+    month = _month(min(oldest, today) if oldest else today)
+    last = _month(today)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        _create_partition(month)
+        month = _next_month(month)
+    # Catches anything outside the managed months so inserts never fail
+    op.execute('CREATE TABLE user_logs_default PARTITION OF user_logs DEFAULT')
+
+    op.execute("""
+        INSERT INTO user_logs (id, type, input_text, result_summary, created_at)
+        SELECT id, type, input_text, result_summary, COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM user_logs_unpartitioned
+    """)
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY user_logs.id')
+    op.execute('DROP TABLE user_logs_unpartitioned')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    seq = bind.execute(sa.text("SELECT pg_get_serial_sequence('user_logs', 'id')")).scalar()
+    op.execute(f"""
+        CREATE TABLE user_logs_plain (
+            id integer NOT NULL DEFAULT nextval('{seq}'::regclass),
+            type varchar(50),
+            input_text text NOT NULL,
+            result_summary text,
+            created_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT user_logs_plain_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO user_logs_plain (id, type, input_text, result_summary, created_at)
+        SELECT id, type, input_text, result_summary, created_at FROM user_logs
+    """)
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY user_logs_plain.id')
+    op.execute('DROP TABLE user_logs CASCADE')
+    op.execute('ALTER TABLE user_logs_plain RENAME TO user_logs')
+    op.execute('ALTER INDEX user_logs_plain_pkey RENAME TO user_logs_pkey')
+    op.execute('CREATE INDEX ix_user_logs_type ON user_logs (type)')
@@ -0,0 +1,61 @@
+"""Store log input texts once in log_contents, referenced from user_logs.content_id.
+
+Existing rows keep their inline input_text; move them with
+``python -m app.logstore migrate`` after upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004_create_log_contents'
+down_revision = '0003_partition_user_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'log_contents',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('sha256', sa.LargeBinary(length=32), nullable=False, unique=True),
+        sa.Column('encoding', sa.String(length=8), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    # Batch mode rebuilds the table on SQLite, which cannot alter column nullability
+    with op.batch_alter_table('user_logs') as batch:
+        batch.add_column(sa.Column('content_id', sa.Integer(), nullable=True))
+        batch.alter_column('input_text', existing_type=sa.Text(), nullable=True)
+        batch.create_foreign_key('fk_user_logs_content_id', 'log_contents', ['content_id'], ['id'])
+        batch.create_index('ix_user_logs_content_id', ['content_id'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    # Inline the texts again before dropping the content table
+    rows = bind.execute(sa.text(
+        'SELECT l.id, c.encoding, c.data FROM user_logs l JOIN log_contents c ON c.id = l.content_id'
+    )).all()
+    if rows:
+        import zlib
+
+        def _decode(encoding, data):
+            data = bytes(data)
+            if encoding == 'zlib':
+                data = zlib.decompress(data)
+            elif encoding == 'zstd':
+                import zstandard
+                data = zstandard.ZstdDecompressor().decompress(data)
+            return data.decode('utf-8')
+
+        bind.execute(
+            sa.text('UPDATE user_logs SET input_text = :text WHERE id = :id'),
+            [{'id': log_id, 'text': _decode(encoding, data)} for log_id, encoding, data in rows],
+        )
+    with op.batch_alter_table('user_logs') as batch:
+        batch.drop_index('ix_user_logs_content_id')
+        batch.drop_constraint('fk_user_logs_content_id', type_='foreignkey')
+        batch.drop_column('content_id')
+        batch.alter_column('input_text', existing_type=sa.Text(), nullable=False)
+    op.drop_table('log_contents')
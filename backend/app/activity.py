@@ -0,0 +1,197 @@
+import asyncio
+from collections import deque
+from typing import Deque, List, Optional, Set
+
+import orjson
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+try:
+    import redis.asyncio as aioredis  # type: ignore
+except Exception:
+    aioredis = None  # type: ignore
+
+CHANNEL = "medlens:activity"
+
+
+class TooManySubscribers(Exception):
+    """Raised when this process already serves ``activity_max_subscribers`` feeds."""
+
+
+class Subscription:
+    """A bounded per-connection event queue.
+
+    When the consumer falls behind, the oldest events are dropped and counted
+    so a slow socket can never grow memory or stall fan-out.
+    """
+
+    def __init__(self, broker: "ActivityBroker", maxsize: int) -> None:
+        self._broker = broker
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, payload: bytes) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(payload)
+
+    def close(self) -> None:
+        self._broker._subscribers.discard(self)
+
+
+class ActivityBroker:
+    """Fans out activity events to WebSocket subscribers in this process.
+
+    With Redis available, events are published to a pub/sub channel and one
+    reader task per process relays them locally, so every worker's dashboards
+    see every worker's writes. Without Redis, or while the reader reconnects
+    after losing it, fan-out is process-local.
+    """
+
+    def __init__(self, url: Optional[str] = None) -> None:
+        self.url = url or settings.redis_url
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis = None
+        self._reader: Optional[asyncio.Task] = None
+        self._subscribers: Set[Subscription] = set()
+        self._backlog: Deque[bytes] = deque(maxlen=settings.activity_backlog)
+        self._patterns: Optional[bytes] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if aioredis is None:
+            logger.warning("redis library not installed; activity feed is process-local")
+            return
+        self._reader = asyncio.create_task(self._relay())
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except BaseException:
+                pass
+            self._reader = None
+        self._loop = None
+
+    async def _relay(self) -> None:
+        """Relay the pub/sub channel to local subscribers, reconnecting with backoff.
+
+        ``_redis`` is set only while the subscription is live, so while Redis
+        is unreachable ``publish`` fans out in-process instead of publishing
+        into a channel nobody here is reading.
+        """
+        failures = 0
+        while True:
+            client = pubsub = None
+            try:
+                client = aioredis.from_url(self.url)
+                await client.ping()
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(CHANNEL)
+                self._redis = client
+                failures = 0
+                logger.info("Activity feed using Redis pub/sub", url=self.url)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._fanout(message["data"])
+                error = "subscription closed"
+            except Exception as e:
+                error = str(e)
+            finally:
+                self._redis = None
+                for resource in (pubsub, client):
+                    if resource is not None:
+                        try:
+                            await resource.aclose()
+                        except Exception:
+                            pass
+            delay = min(settings.redis_retry_max_seconds, 0.5 * 2 ** failures)
+            failures += 1
+            logger.warning(
+                "Redis pub/sub unavailable; activity feed is process-local",
+                error=error,
+                retry_in_seconds=delay,
+            )
+            await asyncio.sleep(delay)
+
+    def subscribe(self) -> Subscription:
+        if len(self._subscribers) >= settings.activity_max_subscribers:
+            raise TooManySubscribers()
+        sub = Subscription(self, settings.activity_queue_size)
+        self._subscribers.add(sub)
+        return sub
+
+    def snapshot(self) -> List[bytes]:
+        """Recent events for a newly connected client, oldest first."""
+        events = list(self._backlog)
+        if self._patterns is not None:
+            events.append(self._patterns)
+        return events
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, kind: str, data) -> None:
+        """Publish an event; safe to call from the event loop or a worker thread.
+
+        Never blocks the caller: the Redis publish (or local fan-out) is
+        scheduled on the broker's loop.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        payload = orjson.dumps({"event": kind, "data": data})
+        client = self._redis
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(self._publish(client, payload), loop)
+        else:
+            loop.call_soon_threadsafe(self._fanout, payload)
+
+    async def _publish(self, client, payload: bytes) -> None:
+        try:
+            await client.publish(CHANNEL, payload)
+        except Exception as e:
+            # The connection dropped before the reader noticed; at least this process's feeds get it
+            logger.warning("Failed to publish activity event; delivering locally", error=str(e))
+            self._fanout(payload)
+
+    def _fanout(self, payload: bytes) -> None:
+        if payload.startswith(b'{"event":"patterns"'):
+            self._patterns = payload
+        else:
+            self._backlog.append(payload)
+        for sub in list(self._subscribers):
+            sub.offer(payload)
+
+
+broker = ActivityBroker()
+
+
+def queue_log_event(db: Session, log, input_text: str) -> None:
+    """Queue a flushed ``UserLog`` for publication once ``db`` commits."""
+    db.info.setdefault("activity", []).append({
+        "id": log.id,
+        "type": log.type,
+        "input_text": input_text,
+        "result_summary": log.result_summary,
+        "created_at": log.created_at.isoformat() if log.created_at else None,
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    for item in session.info.pop("activity", ()):
+        broker.publish("log", item)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back(session: Session, previous_transaction) -> None:
+    session.info.pop("activity", None)
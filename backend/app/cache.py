@@ -1,9 +1,13 @@
 import os
-from typing import Optional
+import threading
+import time
+from typing import Dict, List, Optional
 import json
 
 import structlog
 
+from .config import settings
+
 logger = structlog.get_logger()
 
 try:
@@ -12,34 +16,101 @@ except Exception:
     redis = None  # type: ignore
 
 
+class _Connection:
+    """One Redis client per URL, connected on first use.
+
+    A failed connect is retried no sooner than an exponentially growing
+    delay (capped at ``REDIS_RETRY_MAX_SECONDS``), so requests never wait on
+    a Redis that is down, and the cache comes back on its own once it is up.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.client = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self.client is not None or redis is None or time.monotonic() < self._retry_at:
+            return self.client
+        with self._lock:
+            if self.client is None and time.monotonic() >= self._retry_at:
+                self._connect()
+        return self.client
+
+    def _connect(self) -> None:
+        try:
+            client = redis.from_url(
+                self.url,
+                decode_responses=True,
+                socket_connect_timeout=settings.redis_connect_timeout_seconds,
+            )
+            client.ping()
+            self.client = client
+            self._failures = 0
+            logger.info("Redis cache connected", url=self.url)
+        except Exception as e:
+            delay = min(settings.redis_retry_max_seconds, 0.5 * 2 ** self._failures)
+            self._failures += 1
+            self._retry_at = time.monotonic() + delay
+            logger.warning("Redis cache unavailable; proceeding without cache", error=str(e), retry_in_seconds=delay)
+
+
+_connections: Dict[str, _Connection] = {}
+_connections_lock = threading.Lock()
+
+
+def _connection(url: str) -> _Connection:
+    with _connections_lock:
+        if url not in _connections:
+            _connections[url] = _Connection(url)
+        return _connections[url]
+
+
 class CacheClient:
     def __init__(self, url: Optional[str] = None) -> None:
         self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        self.client = None
         if redis is None:
             logger.warning("redis library not installed; cache disabled")
-            return
-        try:
-            self.client = redis.from_url(self.url, decode_responses=True)
-            self.client.ping()
-            logger.info("Redis cache connected", url=self.url)
-        except Exception as e:
-            logger.warning("Redis cache unavailable; proceeding without cache", error=str(e))
-            self.client = None
+        self._connection = _connection(self.url)
+
+    @property
+    def client(self):
+        """The shared Redis client, or ``None`` while Redis is unavailable."""
+        return self._connection.get()
+
+    def connect(self) -> bool:
+        """Try to connect now (e.g. at startup) instead of on the first cache call."""
+        return self.client is not None
 
     def get_json(self, key: str) -> Optional[dict]:
-        if not self.client:
+        client = self.client
+        if not client:
             return None
         try:
-            val = self.client.get(key)
+            val = client.get(key)
             return json.loads(val) if val else None
         except Exception:
             return None
 
     def set_json(self, key: str, value: dict, ttl_seconds: int = 3600) -> None:
-        if not self.client:
+        client = self.client
+        if not client:
+            return
+        try:
+            client.setex(key, ttl_seconds, json.dumps(value))
+        except Exception:
+            pass
+
+    def incr_many(self, keys: List[str]) -> None:
+        client = self.client
+        if not client:
             return
         try:
-            self.client.setex(key, ttl_seconds, json.dumps(value))
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(key)
+            pipe.execute()
         except Exception:
             pass
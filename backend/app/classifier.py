@@ -0,0 +1,396 @@
+"""Local misinformation classifier: hashed n-grams and a calibrated linear model.
+
+Every sentence of a document is vectorized with a stateless
+``HashingVectorizer`` and scored in one sparse matrix-vector product, so a
+long article costs a few milliseconds on CPU. Scores are Platt-calibrated
+probabilities; ``risk_level`` maps them to low / medium / high and
+``is_uncertain`` tells the scan route when an LLM second opinion is worth
+its latency.
+
+The model is trained from the bundled seed set plus labelled JSONL files
+(``{"text": ..., "label": 0|1}``) and per-claim feedback stored in
+``user_logs``::
+
+    cd backend
+    python -m app.classifier train --data labelled.jsonl --out misinfo_model.npz
+    python -m app.classifier score "This tea cures diabetes in a week."
+
+Point ``MISINFO_MODEL_PATH`` at the saved file; without it the seed set is
+trained in memory on first use. If scikit-learn is not installed the scan
+route keeps its keyword heuristic.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+SEED_DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "misinfo_seed.jsonl")
+
+N_FEATURES = 2 ** 18
+NGRAM_RANGE = (1, 2)
+
+# Titles never end a sentence; initials and other abbreviations do not when a lowercase
+# word follows, and initials next to another initial (J. R. Smith) never do
+_TITLES = {"dr", "mr", "mrs", "ms", "prof", "st", "sr", "jr"}
+_ABBREVIATIONS = {"etc", "e.g", "i.e", "approx", "vs", "al", "fig", "no", "mg", "ml", "hrs", "min"}
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+|\s*\n\s*")
+_LAST_WORD = re.compile(r"(\S+)$")
+_DOTTED = re.compile(r"^(?:[a-z]\.)+[a-z]$")  # u.s, u.k, a.m
+_INITIAL = re.compile(r"[A-Z]\.\s")
+_AFTER_INITIAL = re.compile(r"(?:^|\s)[A-Z]\.\s+[A-Z]$")
+
+
+def _is_abbreviation(head: str, following: str) -> bool:
+    word = _LAST_WORD.search(head)
+    token = word.group(1).lower().rstrip(".") if word else ""
+    if token in _TITLES:
+        return True
+    initial = len(token) == 1 and token.isalpha()
+    if initial and (_INITIAL.match(following) or _AFTER_INITIAL.search(head)):
+        return True  # J. R. Smith
+    return (initial or token in _ABBREVIATIONS or bool(_DOTTED.match(token))) and following[:1].islower()
+
+
+def split_sentences(text: str, max_sentences: int = 2000) -> List[str]:
+    """Split text into sentences.
+
+    Breaks on ``.``, ``!`` and ``?`` followed by whitespace and at line
+    breaks, so headlines and list items stand alone. A period after a title
+    (``Dr.``) is not a boundary, nor is one after an initial or an
+    abbreviation (``e.g.``, ``U.S.``) followed by a lowercase word; an initial
+    followed by another initial (``J. R. Smith``) is kept together too, but
+    ``vitamin C. It`` splits. Decimals such as ``2.5 mg`` never match.
+    """
+    sentences: List[str] = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        end = match.end()
+        if match.group(0).startswith(".") and _is_abbreviation(text[start:match.start()], text[end:end + 3]):
+            continue
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+            if len(sentences) >= max_sentences:
+                return sentences
+        start = end
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def _has_sklearn() -> bool:
+    return importlib.util.find_spec("sklearn") is not None
+
+
+def _vectorizer(n_features: int = N_FEATURES, ngram_range: Tuple[int, int] = NGRAM_RANGE):
+    # scikit-learn is imported on first use; it would add over a second to app import
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=ngram_range,
+        alternate_sign=False,
+        norm="l2",
+        lowercase=True,
+        stop_words="english",
+        token_pattern=r"(?u)\b\w[\w%']*\b",
+    )
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+class ClaimClassifier:
+    """Linear model over hashed features with Platt calibration."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        intercept: float,
+        calibration: Tuple[float, float] = (1.0, 0.0),
+        n_features: int = N_FEATURES,
+        ngram_range: Tuple[int, int] = NGRAM_RANGE,
+        meta: Optional[Dict] = None,
+    ) -> None:
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.calibration = (float(calibration[0]), float(calibration[1]))
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.meta = meta or {}
+        self._vectorizer = _vectorizer(n_features, self.ngram_range)
+
+    def decision(self, sentences: Sequence[str]) -> np.ndarray:
+        if not sentences:
+            return np.zeros(0)
+        X = self._vectorizer.transform(sentences)
+        return X @ self.weights + self.intercept
+
+    def score(self, sentences: Sequence[str]) -> np.ndarray:
+        """Calibrated probability that each sentence is a dubious health claim."""
+        a, b = self.calibration
+        return _sigmoid(a * self.decision(sentences) + b)
+
+    def save(self, path: str) -> None:
+        # Only the non-zero weights are stored; loading needs no pickle
+        nz = np.flatnonzero(self.weights)
+        meta = dict(self.meta, n_features=self.n_features, ngram_range=list(self.ngram_range))
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp,
+            indices=nz.astype(np.int32),
+            values=self.weights[nz].astype(np.float32),
+            intercept=np.array([self.intercept]),
+            calibration=np.array(self.calibration),
+            meta=np.array(json.dumps(meta)),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ClaimClassifier":
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            n_features = int(meta.get("n_features", N_FEATURES))
+            weights = np.zeros(n_features)
+            weights[npz["indices"]] = npz["values"]
+            return cls(
+                weights,
+                float(npz["intercept"][0]),
+                tuple(npz["calibration"]),
+                n_features=n_features,
+                ngram_range=tuple(meta.get("ngram_range", NGRAM_RANGE)),
+                meta=meta,
+            )
+
+
+def risk_level(score: float) -> str:
+    if score >= settings.misinfo_high_threshold:
+        return "high"
+    if score >= settings.misinfo_medium_threshold:
+        return "medium"
+    return "low"
+
+
+def is_uncertain(score: float) -> bool:
+    return settings.misinfo_uncertain_min <= score < settings.misinfo_uncertain_max
+
+
+def load_jsonl(path: str) -> List[Tuple[str, int]]:
+    samples: List[Tuple[str, int]] = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            samples.append((str(row["text"]), int(bool(row["label"]))))
+    return samples
+
+
+def feedback_label(risk: str, verdict: str) -> Optional[int]:
+    """Turn a reviewer verdict on a flagged claim into a training label.
+
+    "Helpful" confirms the classifier's call and "Not helpful" reverses it.
+    Medium-risk claims count as flagged, since they sit in the uncertain band
+    where reviewer labels help most; neutral verdicts carry no usable signal.
+    """
+    if verdict not in ("up", "down") or risk not in ("high", "medium", "low"):
+        return None
+    flagged = risk != "low"
+    return int(flagged if verdict == "up" else not flagged)
+
+
+def load_feedback(db) -> List[Tuple[str, int]]:
+    """Labelled claims from ``misinformation_scan`` feedback rows (latest verdict wins)."""
+    from sqlalchemy import select
+
+    from . import models
+    from .logstore import TEXT_COLUMNS, log_text, with_contents
+    from .rollups import parse_summary
+
+    stmt = (
+        with_contents(select(*TEXT_COLUMNS, models.UserLog.result_summary))
+        .where(models.UserLog.type == "feedback")
+        .where(models.UserLog.result_summary.like("context=misinformation_scan;%"))
+        .order_by(models.UserLog.id)
+    )
+    labels: Dict[str, int] = {}
+    for input_text, encoding, data, summary in db.execute(stmt):
+        fields = parse_summary(summary)
+        label = feedback_label(fields.get("risk", ""), fields.get("verdict", ""))
+        claim = log_text(input_text, encoding, data).strip()
+        if label is not None and claim and claim != "misinformation_scan":
+            labels[claim] = label
+    return list(labels.items())
+
+
+def _fit_linear(X, y: np.ndarray, C: float) -> Tuple[np.ndarray, float]:
+    from sklearn.linear_model import LogisticRegression
+
+    model = LogisticRegression(C=C, class_weight="balanced", max_iter=1000, solver="liblinear")
+    model.fit(X, y)
+    return model.coef_.ravel(), float(model.intercept_[0])
+
+
+def _platt(decision: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+    # Platt's smoothed targets keep the fit finite on small, separable folds
+    pos, neg = int(y.sum()), int(len(y) - y.sum())
+    targets = np.where(y == 1, (pos + 1.0) / (pos + 2.0), 1.0 / (neg + 2.0))
+    a, b = 1.0, 0.0
+    for _ in range(100):
+        p = _sigmoid(a * decision + b)
+        g = p - targets
+        w = np.maximum(p * (1 - p), 1e-12)
+        grad = np.array([(g * decision).sum(), g.sum()])
+        hess = np.array([
+            [(w * decision * decision).sum() + 1e-9, (w * decision).sum()],
+            [(w * decision).sum(), w.sum() + 1e-9],
+        ])
+        step = np.linalg.solve(hess, grad)
+        a, b = a - step[0], b - step[1]
+        if np.abs(step).max() < 1e-8:
+            break
+    return float(a), float(b)
+
+
+def evaluate(scores: np.ndarray, y: np.ndarray, threshold: float = 0.5) -> Dict[str, float]:
+    pred = scores >= threshold
+    tp = int((pred & (y == 1)).sum())
+    fp = int((pred & (y == 0)).sum())
+    fn = int((~pred & (y == 1)).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "accuracy": round(float((pred == (y == 1)).mean()), 4) if len(y) else 0.0,
+        "brier": round(float(((scores - y) ** 2).mean()), 4) if len(y) else 0.0,
+    }
+
+
+def train(samples: Iterable[Tuple[str, int]], C: float = 4.0, folds: int = 5, seed: int = 0) -> ClaimClassifier:
+    """Fit the linear model on all samples and calibrate it on out-of-fold decisions."""
+    if not _has_sklearn():
+        raise RuntimeError("scikit-learn is required to train the misinformation classifier")
+    samples = list(samples)
+    texts = [t for t, _ in samples]
+    y = np.array([label for _, label in samples], dtype=np.int64)
+    if len(set(y.tolist())) < 2:
+        raise ValueError("training data needs both positive and negative examples")
+
+    X = _vectorizer().transform(texts)
+    rng = np.random.default_rng(seed)
+    fold_of = rng.permutation(len(y)) % max(2, min(folds, int(np.bincount(y).min())))
+    oof = np.zeros(len(y))
+    for fold in np.unique(fold_of):
+        test = fold_of == fold
+        if len(set(y[~test].tolist())) < 2:
+            continue
+        w, b = _fit_linear(X[~test], y[~test], C)
+        oof[test] = X[test] @ w + b
+    calibration = _platt(oof, y)
+    cv = evaluate(_sigmoid(calibration[0] * oof + calibration[1]), y)
+
+    weights, intercept = _fit_linear(X, y, C)
+    meta = {
+        "trained_at": int(time.time()),
+        "samples": len(y),
+        "positives": int(y.sum()),
+        "C": C,
+        "cv": cv,
+    }
+    return ClaimClassifier(weights, intercept, calibration, meta=meta)
+
+
+_classifier: Optional[ClaimClassifier] = None
+_classifier_failed = False
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> Optional[ClaimClassifier]:
+    """Process-wide classifier, loaded (or trained from the seed set) on first use; ``None`` if unavailable."""
+    global _classifier, _classifier_failed
+    if _classifier is None and not _classifier_failed:
+        with _classifier_lock:
+            if _classifier is None and not _classifier_failed:
+                try:
+                    if not _has_sklearn():
+                        raise RuntimeError("scikit-learn is not installed")
+                    path = settings.misinfo_model_path
+                    if path and os.path.exists(path):
+                        _classifier = ClaimClassifier.load(path)
+                        logger.info("Loaded misinformation classifier", path=path, samples=_classifier.meta.get("samples"))
+                    else:
+                        _classifier = train(load_jsonl(SEED_DATA_PATH))
+                        logger.info("Trained misinformation classifier from seed data", samples=_classifier.meta["samples"])
+                except Exception as e:
+                    _classifier_failed = True
+                    logger.error("Misinformation classifier unavailable; using keyword heuristic", error=str(e))
+    return _classifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit = sub.add_parser("train", help="train and save a model")
+    fit.add_argument("--data", action="append", default=[], help="labelled JSONL file (repeatable)")
+    fit.add_argument("--no-seed", action="store_true", help="leave out the bundled seed set")
+    fit.add_argument("--no-feedback", action="store_true", help="leave out claim feedback from user_logs")
+    fit.add_argument("--C", type=float, default=4.0, help="inverse regularization strength")
+    fit.add_argument("--out", default=settings.misinfo_model_path or "misinfo_model.npz")
+    score = sub.add_parser("score", help="score the sentences of a text")
+    score.add_argument("text")
+    args = parser.parse_args()
+
+    if args.command == "score":
+        classifier = get_classifier()
+        if classifier is None:
+            raise SystemExit("classifier unavailable")
+        sentences = split_sentences(args.text)
+        result = [
+            {"sentence": s, "score": round(p, 4), "risk": risk_level(p), "uncertain": is_uncertain(p)}
+            for s, p in zip(sentences, classifier.score(sentences).tolist())
+        ]
+        print(json.dumps(result, indent=2))
+        return
+
+    samples: Dict[str, int] = {}
+    sources: Dict[str, int] = {}
+    if not args.no_seed:
+        seed = load_jsonl(SEED_DATA_PATH)
+        samples.update(seed)
+        sources["seed"] = len(seed)
+    for path in args.data:
+        rows = load_jsonl(path)
+        samples.update(rows)
+        sources[path] = len(rows)
+    if not args.no_feedback:
+        from .db import SessionLocal
+
+        with SessionLocal() as db:
+            rows = load_feedback(db)
+        samples.update(rows)  # reviewer verdicts override earlier labels for the same text
+        sources["feedback"] = len(rows)
+
+    classifier = train(samples.items(), C=args.C)
+    classifier.meta["sources"] = sources
+    classifier.save(args.out)
+    print(json.dumps({"out": args.out, **classifier.meta}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
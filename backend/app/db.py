@@ -1,5 +1,12 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from sqlalchemy.pool import QueuePool
 import structlog
 
@@ -7,19 +14,144 @@ from .config import settings
 
 logger = structlog.get_logger()
 
-engine = create_engine(
-    settings.database_url,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=settings.debug,
-)
+def _connect_args(url: str) -> dict:
+    # Sessions are opened in FastAPI's threadpool and used on the event loop
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+
+def _make_engine(url: str):
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=settings.debug,
+        connect_args=_connect_args(url),
+    )
+
+
+engine = _make_engine(settings.database_url)
+# Optional streaming replica for read-only routes; None means everything uses the primary
+read_engine = _make_engine(settings.database_replica_url) if settings.database_replica_url else None
+
+
+class ReadSession(Session):
+    """Replica session that reruns a statement on the primary if the replica connection fails.
+
+    The replica is marked down by the engine's error hook; this only keeps the
+    request that hit the failure from returning a 500.
+    """
+
+    # execute(), scalar(), scalars() and get() all run through _execute_internal
+    def _execute_internal(self, *args, **kwargs):
+        if not self.info.get("replica") or kwargs.get("_parent_execute_state") is not None:
+            return super()._execute_internal(*args, **kwargs)
+        try:
+            return super()._execute_internal(*args, **kwargs)
+        except DBAPIError as e:
+            if not (e.connection_invalidated or isinstance(e, OperationalError)):
+                raise
+            self.rollback()
+            self.bind = engine
+            self.info["replica"] = False
+            replica_monitor.reads["primary-retry"] += 1
+            state = self.info.get("request_state")
+            if state is not None:
+                state.read_source = "primary-retry"
+            return super()._execute_internal(*args, **kwargs)
+
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = (
+    sessionmaker(class_=ReadSession, autocommit=False, autoflush=False, bind=read_engine) if read_engine else SessionLocal
+)
 Base = declarative_base()
 
+READ_YOUR_WRITES_HEADER = "x-read-your-writes"
+READ_YOUR_WRITES_COOKIE = "medlens_ryw"
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaMonitor:
+    """Decides whether reads may go to the replica.
+
+    Replay lag is measured at most every ``replica_lag_check_seconds`` by one
+    request thread while the others reuse the last result, so the check never
+    adds a query to every read. A replica that lags more than
+    ``replica_max_lag_seconds`` or fails a check or a query is bypassed until
+    a later check succeeds.
+    """
+
+    def __init__(self, engine, max_lag: float, check_seconds: float) -> None:
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self.lag: Optional[float] = None
+        self.healthy = engine is not None
+        self.checked_at = 0.0
+        self.reads = Counter()
+        self._lock = threading.Lock()
+
+    def _measure(self) -> float:
+        with self.engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return 0.0
+            return float(conn.execute(REPLICA_LAG_SQL).scalar() or 0.0)
+
+    def available(self) -> bool:
+        if self.engine is None:
+            return False
+        if time.monotonic() - self.checked_at >= self.check_seconds and self._lock.acquire(blocking=False):
+            try:
+                self.lag = self._measure()
+                self.healthy = self.lag <= self.max_lag
+                if not self.healthy:
+                    logger.warning("Replica lagging; reading from primary", lag_seconds=self.lag)
+            except Exception as e:
+                self.lag = None
+                self.healthy = False
+                logger.warning("Replica check failed; reading from primary", error=str(e))
+            finally:
+                self.checked_at = time.monotonic()
+                self._lock.release()
+        return self.healthy
+
+    def mark_down(self, error: Exception) -> None:
+        self.healthy = False
+        self.checked_at = time.monotonic()
+        logger.warning("Replica query failed; reading from primary", error=str(error))
+
+
+replica_monitor = ReplicaMonitor(read_engine, settings.replica_max_lag_seconds, settings.replica_lag_check_seconds)
+
+if read_engine is not None:
+    @event.listens_for(read_engine, "handle_error")
+    def _replica_error(context) -> None:
+        # Routes turn exceptions into 500s, so watch the engine rather than the dependency
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+            replica_monitor.mark_down(context.original_exception)
+
+
+def wants_primary(request: Request) -> bool:
+    """True if the client asked to see its own writes (header) or wrote recently (cookie)."""
+    if request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
 
 def get_db():
     db = SessionLocal()
@@ -29,6 +161,37 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """Session for read-only routes: the replica when configured and fresh, else the primary."""
+    if read_engine is None:
+        source = "primary"
+    elif wants_primary(request):
+        source = "primary-read-your-writes"
+    elif not replica_monitor.available():
+        source = "primary-fallback"
+    else:
+        source = "replica"
+    replica_monitor.reads[source] += 1
+    request.state.read_source = source
+    db = ReadSessionLocal() if source == "replica" else SessionLocal()
+    db.info["replica"] = source == "replica"
+    db.info["request_state"] = request.state
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
 def check_db_connection():
     """Check database connectivity"""
     try:
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
-from .db import get_db
+from .db import get_db, get_read_db
 
-__all__ = ["Session", "get_db"]
+__all__ = ["Session", "get_db", "get_read_db"]
 
 
@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import ipaddress
+import socket
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpcore
+import httpx
+import structlog
+
+from .cache import CacheClient
+from .config import settings
+
+logger = structlog.get_logger()
+
+try:
+    import lxml  # type: ignore  # noqa: F401
+    _PARSER = "lxml"
+except Exception:
+    _PARSER = "html.parser"
+
+_SKIP_TAGS = ["script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form"]
+_TEXT_TAGS = ["h1", "h2", "h3", "p", "li", "blockquote"]
+
+
+class FetchError(Exception):
+    """Raised when an article URL cannot be fetched or yields no text."""
+
+
+def extract_text(html: str) -> str:
+    """Return readable article text from an HTML document.
+
+    Prefers the lxml parser when installed and only walks the content tags
+    of ``<article>``/``<main>`` (or the whole body as a fallback).
+    """
+    from bs4 import BeautifulSoup  # lazy import
+
+    soup = BeautifulSoup(html, _PARSER)
+    for tag in soup(_SKIP_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    blocks = [el.get_text(" ", strip=True) for el in root.find_all(_TEXT_TAGS)]
+    text = "\n".join(b for b in blocks if b)
+    if not text:
+        text = root.get_text(" ", strip=True)
+    return text
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError) as e:
+        raise FetchError(f"Could not resolve host {host}") from e
+    return list(dict.fromkeys(info[4][0].split("%", 1)[0] for info in infos))
+
+
+async def public_addresses(host: str, port: int) -> List[str]:
+    """Resolve ``host`` and return its addresses, or raise if any of them is not public."""
+    addresses = await _resolve(host, port)
+    if settings.fetch_allow_private_hosts:
+        return addresses
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise FetchError("URL resolves to a non-public address")
+    return addresses
+
+
+async def check_public_url(url: str) -> None:
+    """Reject URLs that are not http(s) or whose host resolves to a non-public address.
+
+    Guards the server against being used to reach loopback, private-network or
+    cloud metadata endpoints. Called for the requested URL and every redirect
+    hop; the connection itself is pinned to checked addresses by ``_PublicOnlyBackend``.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise FetchError("Only absolute http(s) URLs can be fetched")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    await public_addresses(parsed.hostname, port)
+
+
+class _PublicOnlyBackend(httpcore.AsyncNetworkBackend):
+    """Connects only to addresses that passed ``public_addresses``.
+
+    The host is resolved here and the socket opened to the checked IP, so a
+    DNS-rebinding name cannot answer the check with a public address and the
+    connection with a private one. TLS still uses the URL's hostname for SNI
+    and certificate checks, and the Host header is unchanged.
+    """
+
+    def __init__(self) -> None:
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        error: Optional[Exception] = None
+        for address in await public_addresses(host, port):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as e:
+                error = e
+        raise error or httpcore.ConnectError(f"No address to connect to for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise httpcore.ConnectError("Unix sockets are not fetched")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _PublicOnlyTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, limits: httpx.Limits) -> None:
+        super().__init__(limits=limits, trust_env=False)
+        # AsyncHTTPTransport has no network_backend option; rebuild its pool with ours
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=_PublicOnlyBackend(),
+        )
+
+
+class ArticleFetcher:
+    """Fetches article pages over a shared, pooled async HTTP client.
+
+    Pages are revalidated with conditional GETs (ETag / Last-Modified) against
+    the Redis cache, and concurrent fetches of the same URL share one request.
+    """
+
+    def __init__(self, cache: Optional[CacheClient] = None) -> None:
+        self.cache = cache or CacheClient()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=settings.fetch_max_connections,
+                max_keepalive_connections=settings.fetch_max_connections,
+            )
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.fetch_timeout_seconds),
+                transport=_PublicOnlyTransport(limits),
+                # Redirects are followed in _fetch so every hop goes through check_public_url
+                follow_redirects=False,
+                headers={"User-Agent": f"{settings.app_name}/{settings.app_version}"},
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_text(self, url: str) -> str:
+        """Return extracted article text for ``url``, deduplicating in-flight fetches."""
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise FetchError("Only absolute http(s) URLs can be fetched")
+
+        pending = self._inflight.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            text = await self._fetch(url)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            # Waiters are shielded from the leader, so the future must settle even
+            # when the leader is cancelled (e.g. its client disconnected)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.set_exception(FetchError("Article fetch was cancelled"))
+            # Mark retrieved so waiter-less failures don't log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(url, None)
+
+    @staticmethod
+    async def _read(resp: httpx.Response):
+        """Validate a final response and read its body within ``FETCH_MAX_BYTES``."""
+        if resp.status_code >= 400:
+            raise FetchError(f"Upstream returned HTTP {resp.status_code}")
+        content_type = resp.headers.get("content-type", "")
+        if "html" not in content_type and "text" not in content_type:
+            raise FetchError(f"Unsupported content type: {content_type or 'unknown'}")
+        declared = resp.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > settings.fetch_max_bytes:
+            raise FetchError("Article exceeds maximum fetch size")
+
+        body = bytearray()
+        async for chunk in resp.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > settings.fetch_max_bytes:
+                raise FetchError("Article exceeds maximum fetch size")
+        return body, resp.headers.get("etag"), resp.headers.get("last-modified"), resp.encoding or "utf-8"
+
+    async def _fetch(self, url: str) -> str:
+        cache_key = f"fetch:v1:{hashlib.sha256(url.encode()).hexdigest()}"
+        cached = self.cache.get_json(cache_key)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        client = self._get_client()
+        target = url
+        try:
+            for _ in range(settings.fetch_max_redirects + 1):
+                await check_public_url(target)
+                async with client.stream("GET", target, headers=headers) as resp:
+                    if resp.is_redirect and resp.headers.get("location"):
+                        target = urljoin(target, resp.headers["location"])
+                        continue
+                    if resp.status_code == 304 and cached:
+                        logger.info("Article not modified; using cached text", url=url)
+                        return cached["text"]
+                    body, etag, last_modified, encoding = await self._read(resp)
+                    break
+            else:
+                raise FetchError("Too many redirects")
+        except httpx.HTTPError as e:
+            raise FetchError(f"Failed to fetch article: {e}") from e
+
+        # Parsing is CPU-bound; keep it off the event loop
+        html = bytes(body).decode(encoding, errors="replace")
+        text = await asyncio.to_thread(extract_text, html)
+        if not text:
+            raise FetchError("No readable text found at URL")
+
+        if etag or last_modified:
+            self.cache.set_json(
+                cache_key,
+                {"etag": etag, "last_modified": last_modified, "text": text},
+                ttl_seconds=settings.fetch_cache_ttl_seconds,
+            )
+        logger.info("Article fetched", url=url, bytes=len(body), text_length=len(text))
+        return text
+
+
+fetcher = ArticleFetcher()
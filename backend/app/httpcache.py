@@ -0,0 +1,106 @@
+import hashlib
+import uuid
+from typing import Optional
+
+import structlog
+from fastapi import Request, Response
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .cache import CacheClient
+from .config import settings
+
+logger = structlog.get_logger()
+
+VERSION_KEY = "logs:version:{}"
+EPOCH_KEY = "logs:version:epoch"
+
+
+class LogVersions:
+    """Cheap version markers for ``user_logs``, used to derive ETags.
+
+    With Redis, each committed write bumps a per-type counter (and ``*``), so
+    checking a version costs one MGET and no table query. The counters are
+    namespaced by an epoch token so a Redis flush can never make an old ETag
+    match new content. Without Redis, or when ``db`` reads from a replica that
+    may not have replayed the latest writes yet, the marker is ``max(id)`` for
+    the type as seen by ``db`` itself.
+    """
+
+    def __init__(self, cache: Optional[CacheClient] = None) -> None:
+        self.cache = cache or CacheClient()
+
+    def _epoch(self) -> Optional[str]:
+        client = self.cache.client
+        epoch = client.get(EPOCH_KEY)
+        if epoch is None:
+            client.set(EPOCH_KEY, uuid.uuid4().hex[:12], nx=True)
+            epoch = client.get(EPOCH_KEY)
+        return epoch
+
+    def current(self, db: Session, log_type: Optional[str] = None) -> str:
+        if self.cache.client and not db.info.get("replica"):
+            try:
+                epoch, count = self.cache.client.mget(EPOCH_KEY, VERSION_KEY.format(log_type or "*"))
+                if epoch is None:
+                    epoch = self._epoch()
+                return f"r{epoch}.{count or 0}"
+            except Exception as e:
+                logger.warning("Log version lookup failed; using database marker", error=str(e))
+        stmt = select(func.max(models.UserLog.id))
+        if log_type:
+            stmt = stmt.where(models.UserLog.type == log_type)
+        return f"d{db.execute(stmt).scalar() or 0}"
+
+    def bump(self, *log_types: str) -> None:
+        self.cache.incr_many([VERSION_KEY.format(t) for t in log_types] + [VERSION_KEY.format("*")])
+
+
+log_versions = LogVersions()
+
+
+def queue_version_bump(db: Session, log_type: str) -> None:
+    """Bump ``log_type``'s version once ``db`` commits, never before data is visible."""
+    db.info.setdefault("bump_log_types", set()).add(log_type)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session: Session) -> None:
+    types = session.info.pop("bump_log_types", None)
+    if types:
+        log_versions.bump(*types)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_bumps(session: Session, previous_transaction) -> None:
+    session.info.pop("bump_log_types", None)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against ``If-None-Match`` (compression marks ETags weak)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def cache_headers(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.http_cache_max_age}, "
+        f"stale-while-revalidate={settings.http_cache_stale_while_revalidate}"
+    )
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    return cache_headers(Response(status_code=304), etag)
@@ -1,75 +1,460 @@
-import os
-from typing import Optional, List
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional
+
 import structlog
-from openai import OpenAI
-import cohere
 
 from .config import settings
 
 logger = structlog.get_logger()
 
+SYSTEM_PROMPT = "You are a careful medical content validator. Identify dubious claims and cite reliable sources (NIH, CDC, WHO, Mayo Clinic)."
+COHERE_PROMPT = "Flag dubious medical claims and cite sources for the following text:\n{text}"
+HEURISTIC_NOTE = "Using heuristic claim analysis (no API keys configured)."
+UNAVAILABLE_NOTE = "Using heuristic claim analysis (LLM providers unavailable)."
+
+
+class ProviderUnavailable(Exception):
+    """Raised when a provider's circuit is open or its concurrency limit is reached."""
+
+
+class OpenAIProvider:
+    name = "openai"
+
+    def __init__(self) -> None:
+        # SDKs are imported only for configured providers; each costs hundreds of ms at startup
+        from openai import OpenAI
+
+        # Retries are the router's job (failover to the next provider), not the SDK's
+        self._client = OpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=settings.llm_timeout_seconds,
+            max_retries=0,
+        )
+
+    def _messages(self, text: str) -> List[dict]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text},
+        ]
+
+    def complete(self, text: str) -> str:
+        completion = self._client.chat.completions.create(
+            model=settings.openai_model,
+            messages=self._messages(text),
+            temperature=0.2,
+            max_tokens=500,
+        )
+        return completion.choices[0].message.content or ""
+
+    def stream(self, text: str) -> Iterator[str]:
+        stream = self._client.chat.completions.create(
+            model=settings.openai_model,
+            messages=self._messages(text),
+            temperature=0.2,
+            max_tokens=500,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            stream.close()
+
+
+class CohereProvider:
+    name = "cohere"
+
+    def __init__(self) -> None:
+        import cohere
+
+        self._client = cohere.Client(
+            settings.cohere_api_key,
+            base_url=settings.cohere_base_url,
+            timeout=settings.llm_timeout_seconds,
+        )
 
-class LLMClient:
-    """Minimal wrapper to switch between providers via env flags.
+    def complete(self, text: str) -> str:
+        resp = self._client.chat(
+            model=settings.cohere_model,
+            message=COHERE_PROMPT.format(text=text),
+            temperature=0.2,
+        )
+        return resp.text or ""
 
-    This is a placeholder for real integration with OpenAI or Cohere.
+    def stream(self, text: str) -> Iterator[str]:
+        for event in self._client.chat_stream(
+            model=settings.cohere_model,
+            message=COHERE_PROMPT.format(text=text),
+            temperature=0.2,
+        ):
+            if getattr(event, "event_type", None) == "text-generation" and event.text:
+                yield event.text
+
+
+PROVIDERS = {"openai": OpenAIProvider, "cohere": CohereProvider}
+
+
+class ProviderState:
+    """Rolling latency/error stats, circuit breaker and concurrency limit for one provider.
+
+    The breaker opens after ``LLM_BREAKER_FAILURES`` consecutive failures, or
+    when the error rate over the window exceeds ``LLM_BREAKER_ERROR_RATE``.
+    After ``LLM_BREAKER_RESET_SECONDS`` one trial request is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, provider) -> None:
+        self.provider = provider
+        self.name = provider.name
+        self.semaphore = threading.BoundedSemaphore(settings.llm_max_concurrency)
+        self.latencies: Dict[str, Deque[float]] = {
+            "complete": deque(maxlen=settings.llm_stats_window),
+            "stream": deque(maxlen=settings.llm_stats_window),
+        }
+        self.outcomes: Deque[bool] = deque(maxlen=settings.llm_stats_window)
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_inflight = False
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def p95(self, kind: str) -> Optional[float]:
+        samples = sorted(self.latencies[kind])
+        if len(samples) < settings.llm_hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= settings.llm_breaker_reset_seconds:
+            return "half_open"
+        return "open"
+
+    def acquire(self) -> bool:
+        """Reserve a slot; returns whether it is the half-open trial request.
+
+        Raises ``ProviderUnavailable`` rather than queueing.
+        """
+        with self._lock:
+            state = self.state()
+            if state == "open" or (state == "half_open" and self.trial_inflight):
+                raise ProviderUnavailable(f"{self.name} circuit {state}")
+            if not self.semaphore.acquire(blocking=False):
+                self.rejected += 1
+                raise ProviderUnavailable(f"{self.name} at concurrency limit")
+            trial = state == "half_open"
+            if trial:
+                self.trial_inflight = True
+            self.in_flight += 1
+            return trial
+
+    def release(self, ok: bool, kind: str, elapsed: float, trial: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.semaphore.release()
+            if trial:
+                self.trial_inflight = False
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies[kind].append(elapsed)
+                self.consecutive_failures = 0
+                if self.opened_at is not None:
+                    logger.info("LLM provider circuit closed", provider=self.name)
+                self.opened_at = None
+                return
+            self.consecutive_failures += 1
+            tripped = (
+                trial
+                or self.consecutive_failures >= settings.llm_breaker_failures
+                or (
+                    len(self.outcomes) >= settings.llm_breaker_min_requests
+                    and self.error_rate() > settings.llm_breaker_error_rate
+                )
+            )
+            if tripped:
+                if self.opened_at is None or trial:
+                    logger.warning(
+                        "LLM provider circuit opened",
+                        provider=self.name,
+                        consecutive_failures=self.consecutive_failures,
+                        error_rate=round(self.error_rate(), 3),
+                    )
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        p95 = self.p95("complete")
+        stream_p95 = self.p95("stream")
+        return {
+            "state": self.state(),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "requests": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 4),
+            "consecutive_failures": self.consecutive_failures,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "stream_first_token_p95_ms": round(stream_p95 * 1000, 1) if stream_p95 is not None else None,
+        }
+
+
+class LLMRouter:
+    """Routes claim analysis across the configured providers.
+
+    Providers are tried in ``LLM_PROVIDER_ORDER`` (those without an API key
+    are skipped), failing over when a call errors or a circuit is open. When
+    ``LLM_HEDGE`` is on and the first provider has not answered within its own
+    p95 latency, the next one is asked as well and the first success wins.
+    Streams hedge on time to first token. With no provider available the
+    heuristic note is returned, as before.
     """
 
     def __init__(self) -> None:
-        self.provider = None
-        self._openai: Optional[OpenAI] = None
-        self._cohere: Optional[cohere.Client] = None
-        
-        if settings.openai_api_key:
-            self.provider = "openai"
-            self._openai = OpenAI(api_key=settings.openai_api_key)
-            logger.info("OpenAI client initialized")
-        elif settings.cohere_api_key:
-            self.provider = "cohere"
-            self._cohere = cohere.Client(settings.cohere_api_key)
-            logger.info("Cohere client initialized")
-        else:
-            self.provider = "heuristic"
+        self._states: Optional[List[ProviderState]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._init_lock = threading.Lock()
+
+    @property
+    def states(self) -> List[ProviderState]:
+        if self._states is None:
+            with self._init_lock:
+                if self._states is None:
+                    self._states = self._build_states()
+        return self._states
+
+    def _build_states(self) -> List[ProviderState]:
+        keys = {"openai": settings.openai_api_key, "cohere": settings.cohere_api_key}
+        states = []
+        for name in (n.strip() for n in settings.llm_provider_order.split(",")):
+            if name not in PROVIDERS or not keys.get(name):
+                continue
+            try:
+                states.append(ProviderState(PROVIDERS[name]()))
+                logger.info("LLM provider initialized", provider=name)
+            except Exception as e:
+                logger.error("Failed to initialize LLM provider", provider=name, error=str(e))
+        if not states:
             logger.info("Using heuristic fallback (no API keys configured)")
+        return states
 
-    def analyze_claims(self, text: str) -> List[str]:
-        """Analyze text for medical claims using configured LLM provider"""
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._init_lock:
+                if self._executor is None:
+                    workers = max(1, len(self.states)) * settings.llm_max_concurrency
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm")
+        return self._executor
+
+    @property
+    def provider(self) -> str:
+        """Name of the preferred provider, or ``heuristic`` when none is configured."""
+        return self.states[0].name if self.states else "heuristic"
+
+    def _hedge_delay(self, state: ProviderState, kind: str) -> float:
+        p95 = state.p95(kind)
+        delay = p95 if p95 is not None else settings.llm_hedge_default_delay_ms / 1000.0
+        return max(delay, settings.llm_hedge_min_delay_ms / 1000.0)
+
+    def _complete(self, state: ProviderState, trial: bool, text: str) -> str:
+        start = time.perf_counter()
+        ok = False
         try:
-            if self.provider == "openai" and self._openai is not None:
+            result = state.provider.complete(text)
+            ok = True
+            return result
+        finally:
+            state.release(ok, "complete", time.perf_counter() - start, trial)
+
+    async def analyze_claims(self, text: str) -> List[str]:
+        """Analyze text for medical claims; returns ``[summary]``.
+
+        Provider calls run on the router's own thread pool and are awaited
+        here, so no event-loop worker thread is held while they wait.
+        """
+        if not self.states:
+            logger.info("Using heuristic claim analysis")
+            return [HEURISTIC_NOTE]
+
+        candidates = list(self.states)
+        pending: Dict[asyncio.Future, ProviderState] = {}
+        started: Dict[asyncio.Future, float] = {}
+
+        def launch() -> bool:
+            while candidates:
+                state = candidates.pop(0)
                 try:
-                    completion = self._openai.chat.completions.create(
-                        model=settings.openai_model,
-                        messages=[
-                            {"role": "system", "content": "You are a careful medical content validator. Identify dubious claims and cite reliable sources (NIH, CDC, WHO, Mayo Clinic)."},
-                            {"role": "user", "content": text},
-                        ],
-                        temperature=0.2,
-                        max_tokens=500,
-                    )
-                    result = completion.choices[0].message.content
-                    logger.info("OpenAI analysis completed", text_length=len(text))
-                    return [result] if result else []
-                except Exception as e:
-                    logger.error("OpenAI analysis failed", error=str(e))
-                    
-            if self.provider == "cohere" and self._cohere is not None:
+                    trial = state.acquire()
+                except ProviderUnavailable as e:
+                    logger.info("Skipping LLM provider", provider=state.name, reason=str(e))
+                    continue
+                future = asyncio.wrap_future(self.executor.submit(self._complete, state, trial, text))
+                # A losing hedge may fail after we have returned; its error only feeds the stats
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                pending[future] = state
+                started[future] = time.monotonic()
+                return True
+            return False
+
+        launch()
+        while pending:
+            timeout = None
+            if settings.llm_hedge and len(pending) == 1 and candidates:
+                (future, state), = pending.items()
+                timeout = max(0.0, started[future] + self._hedge_delay(state, "complete") - time.monotonic())
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if launch():
+                    logger.info("Hedging LLM request", after_ms=round(timeout * 1000, 1))
+                continue
+            for future in done:
+                state = pending.pop(future)
                 try:
-                    resp = self._cohere.chat(
-                        model=settings.cohere_model,
-                        message=f"Flag dubious medical claims and cite sources for the following text:\n{text}",
-                        temperature=0.2,
-                    )
-                    logger.info("Cohere analysis completed", text_length=len(text))
-                    return [resp.text] if resp.text else []
+                    result = future.result()
                 except Exception as e:
-                    logger.error("Cohere analysis failed", error=str(e))
-                    
-            # Fallback heuristic
-            logger.info("Using heuristic claim analysis")
-            return ["Using heuristic claim analysis (no API keys configured)."]
-            
+                    logger.error("LLM analysis failed", provider=state.name, error=str(e))
+                    continue
+                # Any hedged request still running finishes in the background and only feeds the stats
+                logger.info("LLM analysis completed", provider=state.name, text_length=len(text))
+                return [result] if result else []
+            if not pending:
+                launch()
+
+        logger.warning("All LLM providers failed or unavailable; using heuristic claim analysis")
+        return [UNAVAILABLE_NOTE]
+
+    def _pump(
+        self, state: ProviderState, trial: bool, text: str, events: "queue.Queue", cancelled: threading.Event
+    ) -> None:
+        """Run one provider stream in a worker, forwarding chunks as ``(state, kind, value)`` events."""
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        ok = False
+        try:
+            for delta in state.provider.stream(text):
+                if cancelled.is_set():
+                    break
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                events.put((state, "delta", delta))
+            ok = True
+            events.put((state, "done", None))
         except Exception as e:
-            logger.error("LLM analysis failed", error=str(e), exc_info=True)
-            return ["Analysis failed due to technical error."]
+            events.put((state, "error", e))
+        finally:
+            elapsed = first_token if first_token is not None else time.perf_counter() - start
+            state.release(ok, "stream", elapsed, trial)
+
+    def stream_claims(self, text: str) -> Iterator[str]:
+        """Yield summary text chunks from the first provider to start streaming.
+
+        Falls back to the heuristic note if every provider fails, or none has
+        produced a chunk within ``LLM_TIMEOUT_SECONDS`` plus the hedge delay.
+        """
+        if not self.states:
+            logger.info("Using heuristic claim analysis")
+            yield HEURISTIC_NOTE
+            return
+
+        candidates = list(self.states)
+        events: "queue.Queue" = queue.Queue()
+        cancelled: Dict[str, threading.Event] = {}
+        started: Dict[str, float] = {}
+        winner: Optional[ProviderState] = None
+
+        def launch() -> bool:
+            while candidates:
+                state = candidates.pop(0)
+                try:
+                    trial = state.acquire()
+                except ProviderUnavailable as e:
+                    logger.info("Skipping LLM provider", provider=state.name, reason=str(e))
+                    continue
+                cancelled[state.name] = threading.Event()
+                started[state.name] = time.monotonic()
+                self.executor.submit(self._pump, state, trial, text, events, cancelled[state.name])
+                return True
+            return False
+
+        running = 1 if launch() else 0
+        # Provider SDK timeouts are not relied on: a stream with no first chunk by then is abandoned
+        deadline = time.monotonic() + settings.llm_timeout_seconds + (
+            self._hedge_delay(self.states[0], "stream") if settings.llm_hedge else 0.0
+        )
+        try:
+            while running:
+                timeout = settings.llm_timeout_seconds
+                if winner is None and settings.llm_hedge and running == 1 and candidates:
+                    name = next(n for n, ev in cancelled.items() if not ev.is_set())
+                    state = next(s for s in self.states if s.name == name)
+                    timeout = max(0.0, started[name] + self._hedge_delay(state, "stream") - time.monotonic())
+                if winner is None:
+                    timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+                try:
+                    state, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    if winner is None and time.monotonic() >= deadline:
+                        logger.error("LLM stream timed out before the first chunk", providers=list(cancelled))
+                        break
+                    if winner is None and launch():
+                        running += 1
+                        logger.info("Hedging LLM stream", after_ms=round(timeout * 1000, 1))
+                        continue
+                    if winner is None:
+                        continue
+                    logger.error("LLM stream stalled", provider=winner.name)
+                    return
+                if winner is not None and state is not winner:
+                    if kind != "delta":
+                        running -= 1
+                    continue
+                if kind == "delta":
+                    if winner is None:
+                        winner = state
+                        for name, ev in cancelled.items():
+                            if name != state.name:
+                                ev.set()
+                    yield value
+                    continue
+                running -= 1
+                cancelled[state.name].set()
+                if kind == "done" and winner is state:
+                    logger.info("LLM streaming analysis completed", provider=state.name, text_length=len(text))
+                    return
+                if kind == "error":
+                    logger.error("LLM streaming analysis failed", provider=state.name, error=str(value))
+                    if winner is state:
+                        return
+                # Failed, or finished without output, before anything was sent: fail over
+                if not running and launch():
+                    running += 1
+        finally:
+            for ev in cancelled.values():
+                ev.set()
+
+        logger.info("Using heuristic claim analysis")
+        yield UNAVAILABLE_NOTE
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {state.name: state.snapshot() for state in self.states}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
 
+llm_router = LLMRouter()
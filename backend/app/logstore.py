@@ -0,0 +1,262 @@
+"""Content-addressed storage for log input texts.
+
+Identical symptom descriptions and re-scanned viral articles are stored once
+in ``log_contents``, keyed by their SHA-256, and ``user_logs.content_id``
+points at them. Texts of at least ``LOG_CONTENT_COMPRESS_MIN_BYTES`` are
+compressed with zlib, or zstd when ``LOG_CONTENT_CODEC=zstd`` and the
+``zstandard`` package is installed. Rows written before this table existed
+keep ``input_text`` inline until ``migrate`` moves them::
+
+    cd backend
+    python -m app.logstore report      # bytes saved by deduplication and compression
+    python -m app.logstore migrate     # move legacy inline texts into log_contents
+"""
+import argparse
+import hashlib
+import json
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .db import SessionLocal
+
+logger = structlog.get_logger()
+
+try:
+    import zstandard  # type: ignore
+except Exception:
+    zstandard = None  # type: ignore
+
+# Columns to select alongside ``with_contents(stmt)``; ``log_text`` turns them back into the text
+TEXT_COLUMNS = (models.UserLog.input_text, models.LogContent.encoding, models.LogContent.data)
+
+_zstd = threading.local()  # zstandard contexts are not thread-safe
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def encode(text: str) -> Tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if len(raw) < settings.log_content_compress_min_bytes:
+        return "raw", raw
+    if settings.log_content_codec == "zstd" and zstandard is not None:
+        if not hasattr(_zstd, "compressor"):
+            _zstd.compressor = zstandard.ZstdCompressor(level=10)
+        encoding, data = "zstd", _zstd.compressor.compress(raw)
+    else:
+        encoding, data = "zlib", zlib.compress(raw, 6)
+    # Short or already-dense texts can grow when compressed
+    return (encoding, data) if len(data) < len(raw) else ("raw", raw)
+
+
+def decode(encoding: str, data: bytes) -> str:
+    if encoding == "zlib":
+        data = zlib.decompress(data)
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed log contents")
+        if not hasattr(_zstd, "decompressor"):
+            _zstd.decompressor = zstandard.ZstdDecompressor()
+        data = _zstd.decompressor.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def with_contents(stmt):
+    """Outer-join ``log_contents`` onto a ``user_logs`` select that includes ``TEXT_COLUMNS``."""
+    return stmt.outerjoin(models.LogContent, models.LogContent.id == models.UserLog.content_id)
+
+
+def log_text(input_text: Optional[str], encoding: Optional[str], data: Optional[bytes]) -> str:
+    if input_text is not None:
+        return input_text
+    if encoding is None:
+        return ""
+    return decode(encoding, data)
+
+
+def _insert_missing(db: Session, rows: List[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        # DO NOTHING rather than DO UPDATE: a duplicate must not write a new row version
+        db.execute(insert(models.LogContent).values(rows).on_conflict_do_nothing(index_elements=["sha256"]))
+        return
+
+    # Portable fallback for dialects without ON CONFLICT
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.add(models.LogContent(**row))
+        except IntegrityError:
+            pass
+
+
+def store_contents(db: Session, texts: Iterable[str], chunk_size: int = 500) -> Dict[str, int]:
+    """Store each distinct text once; returns ``{text: content id}``.
+
+    Existing contents are looked up by hash first, so repeated texts cost one
+    indexed read and are never compressed or written again. On PostgreSQL the
+    rows found are ``FOR KEY SHARE`` locked until the caller commits, so
+    ``prune_orphans`` cannot delete them before the referencing log is written.
+    """
+    by_hash: Dict[bytes, str] = {content_hash(t): t for t in dict.fromkeys(texts)}
+    ids: Dict[str, int] = {}
+    hashes = list(by_hash)
+    for start in range(0, len(hashes), chunk_size):
+        chunk = hashes[start:start + chunk_size]
+        stmt = (
+            select(models.LogContent.sha256, models.LogContent.id)
+            .where(models.LogContent.sha256.in_(chunk))
+            .with_for_update(read=True, key_share=True)
+        )
+        # bytes() because PostgreSQL returns bytea as memoryview
+        found = {bytes(h): i for h, i in db.execute(stmt)}
+        missing = [h for h in chunk if h not in found]
+        if missing:
+            rows = []
+            for h in missing:
+                encoding, data = encode(by_hash[h])
+                rows.append({"sha256": h, "encoding": encoding, "data": data, "size": len(by_hash[h].encode("utf-8"))})
+            _insert_missing(db, rows)
+            # Also picks up rows a concurrent writer inserted first
+            found.update((bytes(h), i) for h, i in db.execute(stmt))
+        for h in chunk:
+            ids[by_hash[h]] = found[h]
+    return ids
+
+
+def store_content(db: Session, text: str) -> int:
+    return store_contents(db, [text])[text]
+
+
+def migrate_inline(db: Session, batch_size: int = 1000) -> int:
+    """Move legacy inline ``input_text`` values into ``log_contents``; returns rows moved."""
+    moved = 0
+    last_id = 0
+    stmt = (
+        select(models.UserLog.id, models.UserLog.created_at, models.UserLog.input_text)
+        .where(models.UserLog.input_text.is_not(None))
+        .order_by(models.UserLog.id)
+        .limit(batch_size)
+    )
+    while True:
+        rows = db.execute(stmt.where(models.UserLog.id > last_id)).all()
+        if not rows:
+            break
+        ids = store_contents(db, [text for _, _, text in rows])
+        db.execute(
+            update(models.UserLog),
+            [
+                {"id": log_id, "created_at": created_at, "content_id": ids[text], "input_text": None}
+                for log_id, created_at, text in rows
+            ],
+        )
+        db.commit()
+        moved += len(rows)
+        last_id = rows[-1][0]
+        logger.info("Moved inline log texts", rows=moved, last_id=last_id)
+    return moved
+
+
+def prune_orphans(db: Session, batch_size: int = 1000) -> int:
+    """Delete contents no log references any more (e.g. after partition retention).
+
+    Candidates are locked ``FOR UPDATE SKIP LOCKED``: contents a concurrent
+    ``store_contents`` has just resolved are skipped, and a writer resolving one
+    of this batch waits and then stores its text again.
+    """
+    referenced = select(models.UserLog.id).where(models.UserLog.content_id == models.LogContent.id).exists()
+    deleted = 0
+    last_id = 0
+    while True:
+        ids = db.execute(
+            select(models.LogContent.id)
+            .where(models.LogContent.id > last_id, ~referenced)
+            .order_by(models.LogContent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            db.rollback()
+            break
+        last_id = ids[-1]
+        try:
+            deleted += db.query(models.LogContent).filter(
+                models.LogContent.id.in_(ids), ~referenced
+            ).delete(synchronize_session=False)
+            db.commit()
+        except IntegrityError:
+            # A concurrent write just reused one of these; leave the batch for the next run
+            db.rollback()
+    return deleted
+
+
+def report(db: Session) -> Dict:
+    """Bytes the log texts would take inline versus what is actually stored."""
+    logs, inline_rows, inline_chars = db.execute(
+        select(
+            func.count(),
+            func.count(models.UserLog.input_text),
+            func.coalesce(func.sum(func.length(models.UserLog.input_text)), 0),
+        )
+    ).one()
+    logical = db.execute(
+        select(func.coalesce(func.sum(models.LogContent.size), 0))
+        .select_from(models.UserLog)
+        .join(models.LogContent, models.LogContent.id == models.UserLog.content_id)
+    ).scalar()
+    contents, distinct_bytes, stored = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(models.LogContent.size), 0),
+            func.coalesce(func.sum(func.length(models.LogContent.data)), 0),
+        )
+    ).one()
+    by_encoding = dict(db.execute(
+        select(models.LogContent.encoding, func.count()).group_by(models.LogContent.encoding)
+    ).all())
+    return {
+        "logs": logs,
+        "inline_rows": inline_rows,
+        "inline_chars": int(inline_chars),
+        "contents": contents,
+        "contents_by_encoding": by_encoding,
+        "logical_bytes": int(logical),
+        "distinct_bytes": int(distinct_bytes),
+        "stored_bytes": int(stored),
+        "saved_by_dedup": int(logical) - int(distinct_bytes),
+        "saved_by_compression": int(distinct_bytes) - int(stored),
+        "saved_ratio": round(1 - int(stored) / int(logical), 4) if logical else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["report", "migrate", "prune"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.command == "migrate":
+            result = {"moved": migrate_inline(db, args.batch_size)}
+        elif args.command == "prune":
+            result = {"deleted": prune_orphans(db, args.batch_size)}
+        else:
+            result = report(db)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import structlog
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
 
 from .routes import health, symptoms, misinformation
 from .routes import logs as logs_routes
+from .routes import stats as stats_routes
+from .routes import activity as activity_routes
 from .db import engine, Base
+from .cache import CacheClient
+from .fetcher import fetcher
+from .activity import broker
+from .partitions import ensure_partitions
+from .classifier import get_classifier
+from .llm import llm_router
 from . import models
 from .config import settings
 from .middleware import setup_middleware, limiter
@@ -35,8 +45,11 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-# Initialize Sentry if DSN is provided
+# Initialize Sentry if DSN is provided (imported only then; the SDK is slow to import)
 if settings.sentry_dsn:
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+
     sentry_sdk.init(
         dsn=settings.sentry_dsn,
         integrations=[FastApiIntegration()],
@@ -45,13 +58,61 @@ if settings.sentry_dsn:
     )
 
 
+async def _warm_up() -> None:
+    """Connect shared clients and load models after startup, off the request path.
+
+    Each of these also initializes on first use, so a request that arrives
+    earlier only waits for what it needs instead of the whole list.
+    """
+    steps = (
+        ("redis", lambda: CacheClient().connect()),
+        ("llm_providers", lambda: llm_router.states),
+        # Load (or train from the seed set) now rather than on the first scan; failures are logged inside
+        ("misinfo_classifier", get_classifier),
+    )
+    for name, step in steps:
+        try:
+            await asyncio.to_thread(step)
+        except Exception as e:
+            logger.error("Warm-up step failed", step=name, error=str(e))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Application starting up", version=settings.app_version)
+    if settings.db_create_all:
+        # Dev convenience in case migrations haven't been run yet
+        try:
+            await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+            logger.info("Database tables created/verified")
+        except Exception as e:
+            logger.error("Failed to create database tables", error=str(e))
+    await broker.start()
+    try:
+        # No-op unless user_logs is partitioned; `python -m app.partitions ensure` can also run from cron
+        await asyncio.to_thread(ensure_partitions)
+    except Exception as e:
+        logger.error("Failed to ensure user_logs partitions", error=str(e))
+    warm_up = asyncio.create_task(_warm_up())
+    try:
+        yield
+    finally:
+        logger.info("Application shutting down")
+        warm_up.cancel()
+        await fetcher.close()
+        await broker.stop()
+        llm_router.close()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
         version=settings.app_version,
         debug=settings.debug,
+        default_response_class=ORJSONResponse,
         docs_url="/docs" if settings.debug else None,
         redoc_url="/redoc" if settings.debug else None,
+        lifespan=lifespan,
     )
 
     # Setup middleware
@@ -74,6 +135,8 @@ def create_app() -> FastAPI:
     app.include_router(symptoms.router, prefix="/api")
     app.include_router(misinformation.router, prefix="/api")
     app.include_router(logs_routes.router, prefix="/api")
+    app.include_router(stats_routes.router, prefix="/api")
+    app.include_router(activity_routes.router, prefix="/api")
 
     # Exception handlers
     @app.exception_handler(StarletteHTTPException)
@@ -91,14 +154,16 @@ def create_app() -> FastAPI:
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
+        # Validator errors can carry the raised exception in ``ctx``; make them JSON-safe
+        errors = jsonable_encoder(exc.errors())
         logger.error(
             "Validation error",
-            errors=exc.errors(),
+            errors=errors,
             url=str(request.url),
         )
         return JSONResponse(
             status_code=422,
-            content={"detail": "Validation error", "errors": exc.errors()}
+            content={"detail": "Validation error", "errors": errors}
         )
 
     @app.exception_handler(Exception)
@@ -118,22 +183,3 @@ def create_app() -> FastAPI:
 
 
 app = create_app()
-
-# Ensure tables exist in case migrations haven't been run yet (dev convenience)
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created/verified")
-except Exception as e:
-    logger.error("Failed to create database tables", error=str(e))
-
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application starting up", version=settings.app_version)
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Application shutting down")
-
-
@@ -5,9 +5,13 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.responses import JSONResponse
 
 
+from .config import settings
+from .db import READ_YOUR_WRITES_COOKIE
+
 logger = structlog.get_logger()
 limiter = Limiter(key_func=get_remote_address)
 
@@ -78,11 +82,79 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             )
 
 
+class CompressionMiddleware:
+    """Gzip large responses, except event streams, which must flush per event.
+
+    Compressed responses get a weak ETag, since the bytes differ from the
+    identity representation.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_weak_etag(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers") or []
+                if any(k == b"content-encoding" and v == b"gzip" for k, v in headers):
+                    message["headers"] = [
+                        (k, b"W/" + v if k == b"etag" and not v.startswith(b"W/") else v)
+                        for k, v in headers
+                    ]
+            await send(message)
+
+        await self.gzip(scope, receive, send_weak_etag)
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client to the primary for a while after it writes.
+
+    Successful non-GET requests set a short-lived cookie that ``get_read_db``
+    honours, so a dashboard reload right after submitting feedback cannot hit
+    a replica that has not replayed it yet. Responses from read routes carry
+    ``X-Read-Source`` (``replica``, ``primary``, ...) for debugging.
+    """
+
+    def __init__(self, app, window_seconds: int = 10) -> None:
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        writes = scope["method"] not in ("GET", "HEAD", "OPTIONS")
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                source = (scope.get("state") or {}).get("read_source")
+                if source:
+                    headers.append((b"x-read-source", source.encode()))
+                if writes and message["status"] < 400:
+                    expires = int(time.time()) + self.window_seconds
+                    cookie = f"{READ_YOUR_WRITES_COOKIE}={expires}; Max-Age={self.window_seconds}; Path=/; SameSite=Lax"
+                    headers.append((b"set-cookie", cookie.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
+
+
 def setup_middleware(app):
     """Setup all middleware"""
     app.add_middleware(SecurityHeadersMiddleware)
     app.add_middleware(LoggingMiddleware)
     app.add_middleware(RateLimitMiddleware)
+    if settings.enable_compression:
+        app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+    if settings.database_replica_url:
+        app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.read_your_writes_seconds)
     
     # Add rate limit exception handler
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -1,14 +1,65 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, String, Text, DateTime, func
 from .db import Base
 
 
+class LogContent(Base):
+    """A distinct log input text, stored once and shared by every log that repeats it."""
+
+    __tablename__ = "log_contents"
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(LargeBinary(32), nullable=False, unique=True)
+    encoding = Column(String(8), nullable=False)  # raw | zlib | zstd
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # UTF-8 bytes before compression
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class UserLog(Base):
     __tablename__ = "user_logs"
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String(50), index=True)  # symptom_check | misinformation_scan
-    input_text = Column(Text, nullable=False)
+    input_text = Column(Text, nullable=True)  # legacy rows only; new rows reference content_id
+    content_id = Column(Integer, ForeignKey("log_contents.id"), nullable=True, index=True)
     result_summary = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # On PostgreSQL user_logs is range-partitioned by created_at (migration 0003),
+    # which makes its primary key (id, created_at); the mapper uses that identity
+    # everywhere, so updates by key also prune partitions. The DDL keeps id as the
+    # only key column because SQLite autoincrements only a single-column INTEGER
+    # PRIMARY KEY, and an unpartitioned table (create_all, SQLite) needs no more:
+    # ids come from one sequence and are unique either way.
+    __mapper_args__ = {"primary_key": [id, created_at]}
+
+
+class LogHourlyRollup(Base):
+    """Per-type request counts, one row per UTC hour."""
+
+    __tablename__ = "log_hourly_rollups"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class FeedbackHourlyRollup(Base):
+    """Feedback verdict tallies per context, one row per UTC hour."""
+
+    __tablename__ = "feedback_hourly_rollups"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    context = Column(String(50), primary_key=True)
+    verdict = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class SymptomHourlyRollup(Base):
+    """Extracted symptom counts from symptom checks, one row per UTC hour."""
 
+    __tablename__ = "symptom_hourly_rollups"
 
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    name = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
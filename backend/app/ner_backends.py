@@ -0,0 +1,229 @@
+"""CPU inference backends for the symptom NER model.
+
+``NER_BACKEND`` selects how ``SymptomExtractor`` runs ``NER_MODEL``:
+
+- ``hf``: the fp32 Hugging Face pipeline (default).
+- ``torch-int8``: the same model with its ``Linear`` layers dynamically
+  quantized to int8 by PyTorch. No export step, roughly half the memory.
+- ``onnx``: the model exported to an ONNX graph and run by ONNX Runtime
+  through ``optimum`` (``pip install "optimum[onnxruntime]"``), quantized to
+  int8 unless ``NER_ONNX_QUANTIZE=false``. The graph is built ahead of
+  deployment by the ``export`` command below into ``NER_ONNX_DIR`` (or a
+  directory under the Hugging Face cache); without it the extractor falls back
+  to ``hf``.
+
+Every backend returns a callable shaped like
+``transformers.pipeline("ner", aggregation_strategy="simple")``, so the
+extractor's post-processing is shared. Before switching backends, check
+that entities match the fp32 model on a reference set::
+
+    cd backend
+    python -m app.ner_backends parity --backend torch-int8
+    python -m app.ner_backends export        # build the ONNX graph ahead of deployment
+    python -m app.ner_backends parity --backend onnx --reference my_texts.txt --min-f1 0.97
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+BACKENDS = ("hf", "torch-int8", "onnx")
+REFERENCE_PATH = os.path.join(os.path.dirname(__file__), "data", "ner_reference.txt")
+
+
+def _set_threads() -> None:
+    if settings.ner_num_threads:
+        import torch
+
+        torch.set_num_threads(settings.ner_num_threads)
+
+
+def _hf(model_name: str):
+    from transformers import pipeline
+
+    _set_threads()
+    return pipeline(task="ner", model=model_name, aggregation_strategy="simple")
+
+
+def _torch_int8(model_name: str):
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+
+    _set_threads()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForTokenClassification.from_pretrained(model_name)
+    model.eval()
+    # Weights are stored as int8; activations are quantized on the fly per batch
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline(task="ner", model=quantized, tokenizer=tokenizer, aggregation_strategy="simple")
+
+
+def onnx_dir(model_name: str, quantize: Optional[bool] = None) -> str:
+    quantize = settings.ner_onnx_quantize if quantize is None else quantize
+    if settings.ner_onnx_dir:
+        return settings.ner_onnx_dir
+    cache = os.environ.get("HF_HOME") or os.path.join(os.path.expanduser("~"), ".cache", "huggingface")
+    suffix = "-int8" if quantize else ""
+    return os.path.join(cache, "medlens-onnx", model_name.replace("/", "--") + suffix)
+
+
+def _onnx_file(quantize: bool) -> str:
+    return "model_quantized.onnx" if quantize else "model.onnx"
+
+
+def export_onnx(model_name: str, out_dir: Optional[str] = None, quantize: Optional[bool] = None) -> str:
+    """Export ``model_name`` to ONNX (optionally int8-quantized) under ``out_dir``; returns the directory."""
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    quantize = settings.ner_onnx_quantize if quantize is None else quantize
+    out_dir = out_dir or onnx_dir(model_name, quantize)
+    tmp = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    start = time.perf_counter()
+    model = ORTModelForTokenClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(tmp)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp)
+    if quantize:
+        # Dynamic quantization needs no calibration data; avx2 kernels run on any x86-64 server
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(tmp, file_name="model.onnx").quantize(save_dir=tmp, quantization_config=qconfig)
+    # Swap the finished export in whole, so a concurrent loader never sees half a directory
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(os.path.dirname(out_dir) or ".", exist_ok=True)
+    os.replace(tmp, out_dir)
+    logger.info("Exported NER model to ONNX", model=model_name, path=out_dir, quantized=quantize,
+                seconds=round(time.perf_counter() - start, 1))
+    return out_dir
+
+
+def _onnx(model_name: str):
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer, pipeline
+
+    quantize = settings.ner_onnx_quantize
+    path = onnx_dir(model_name, quantize)
+    if not os.path.exists(os.path.join(path, _onnx_file(quantize))):
+        # Exporting takes minutes; never do it on the request path
+        raise FileNotFoundError(f"no ONNX export in {path}; run `python -m app.ner_backends export` first")
+    options = onnxruntime.SessionOptions()
+    if settings.ner_num_threads:
+        options.intra_op_num_threads = settings.ner_num_threads
+    model = ORTModelForTokenClassification.from_pretrained(
+        path, file_name=_onnx_file(quantize), session_options=options, provider="CPUExecutionProvider"
+    )
+    return pipeline(task="ner", model=model, tokenizer=AutoTokenizer.from_pretrained(path), aggregation_strategy="simple")
+
+
+_LOADERS = {"hf": _hf, "torch-int8": _torch_int8, "onnx": _onnx}
+
+
+def load_pipeline(model_name: str, backend: str = "hf"):
+    """Build the NER callable for ``backend``; raises if its dependencies or model are missing."""
+    if backend not in _LOADERS:
+        raise ValueError(f"unknown NER backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    return _LOADERS[backend](model_name)
+
+
+def load_reference(path: str = REFERENCE_PATH) -> List[str]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip()]
+
+
+def _entities(preds: Sequence[dict]) -> Dict[Tuple[str, int, int], float]:
+    return {
+        (str(p.get("entity_group") or p.get("entity") or ""), int(p["start"]), int(p["end"])): float(p.get("score") or 0.0)
+        for p in preds
+        if p.get("start") is not None and p.get("end") is not None
+    }
+
+
+def compare(reference_preds: Sequence[Sequence[dict]], candidate_preds: Sequence[Sequence[dict]]) -> Dict:
+    """Entity-level agreement of ``candidate_preds`` with the fp32 ``reference_preds``.
+
+    Entities match on label and character span. Scores of matched entities
+    are compared as well, since the extractor's confidences come from them.
+    """
+    matched = missing = extra = identical_texts = 0
+    score_diffs: List[float] = []
+    for ref, cand in zip(reference_preds, candidate_preds):
+        ref_entities, cand_entities = _entities(ref), _entities(cand)
+        common = ref_entities.keys() & cand_entities.keys()
+        matched += len(common)
+        missing += len(ref_entities.keys() - common)
+        extra += len(cand_entities.keys() - common)
+        identical_texts += ref_entities.keys() == cand_entities.keys()
+        score_diffs.extend(abs(ref_entities[k] - cand_entities[k]) for k in common)
+    precision = matched / (matched + extra) if matched + extra else 1.0
+    recall = matched / (matched + missing) if matched + missing else 1.0
+    score_diffs.sort()
+    return {
+        "texts": len(reference_preds),
+        "identical_texts": identical_texts,
+        "entities_reference": matched + missing,
+        "entities_candidate": matched + extra,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "score_abs_diff_mean": round(sum(score_diffs) / len(score_diffs), 5) if score_diffs else 0.0,
+        "score_abs_diff_max": round(score_diffs[-1], 5) if score_diffs else 0.0,
+    }
+
+
+def run_pipeline(pipe, texts: Sequence[str], batch_size: int = 16) -> List[list]:
+    return list(pipe(list(texts), batch_size=batch_size))
+
+
+def parity(
+    backend: str,
+    model_name: Optional[str] = None,
+    texts: Optional[Sequence[str]] = None,
+    batch_size: int = 16,
+) -> Dict:
+    """Run ``backend`` and the fp32 ``hf`` pipeline over ``texts`` and compare their entities."""
+    model_name = model_name or settings.ner_model
+    texts = list(texts) if texts is not None else load_reference()
+    reference = run_pipeline(load_pipeline(model_name, "hf"), texts, batch_size)
+    candidate = run_pipeline(load_pipeline(model_name, backend), texts, batch_size)
+    return {"model": model_name, "backend": backend, **compare(reference, candidate)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("parity", help="compare a backend's entities with the fp32 pipeline")
+    check.add_argument("--backend", choices=[b for b in BACKENDS if b != "hf"], default=settings.ner_backend if settings.ner_backend != "hf" else "torch-int8")
+    check.add_argument("--model", default=None, help="defaults to NER_MODEL")
+    check.add_argument("--reference", default=REFERENCE_PATH, help="text file, one input per line")
+    check.add_argument("--batch-size", type=int, default=16)
+    check.add_argument("--min-f1", type=float, default=0.98, help="exit non-zero below this entity F1")
+    export = sub.add_parser("export", help="export the ONNX graph for the onnx backend")
+    export.add_argument("--model", default=None, help="defaults to NER_MODEL")
+    export.add_argument("--out", default=None, help="defaults to NER_ONNX_DIR")
+    export.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        quantize = False if args.no_quantize else None
+        print(export_onnx(args.model or settings.ner_model, args.out, quantize))
+        return
+
+    result = parity(args.backend, args.model, load_reference(args.reference), args.batch_size)
+    print(json.dumps(result, indent=2))
+    if result["f1"] < args.min_f1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
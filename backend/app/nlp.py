@@ -1,9 +1,14 @@
 import os
 import threading
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 
 import structlog
 
+from .config import settings
+from .ner_backends import load_pipeline
+from .symptom_index import get_symptom_index
+
 logger = structlog.get_logger()
 
 
@@ -11,49 +16,93 @@ class SymptomExtractor:
     """Extracts symptoms from free text using a Hugging Face NER model.
 
     Uses a singleton-ish lazy loader to avoid repeated heavy initialization.
-    Falls back to a simple keyword heuristic if the model is unavailable.
+    The model runs on the inference backend chosen by ``NER_BACKEND`` (see
+    ``app.ner_backends``); a backend that fails to load falls back to the
+    plain ``hf`` pipeline, and that to a simple keyword heuristic.
     """
 
     _instance_lock = threading.Lock()
     _pipeline = None
+    loaded_backend: Optional[str] = None  # set once a pipeline loads; may differ from ``backend``
+    _retry_at = 0.0  # monotonic time before which a failed load is not retried
 
-    def __init__(self, model_name: str = "d4data/biomedical-ner-all", enable: bool = True) -> None:
-        self.model_name = model_name
+    def __init__(self, model_name: Optional[str] = None, enable: bool = True, backend: Optional[str] = None) -> None:
+        self.model_name = model_name or settings.ner_model
+        self.backend = backend or settings.ner_backend
         self.enable = enable
 
     def _ensure_pipeline(self) -> None:
         if not self.enable:
             return
-        if self._pipeline is not None:
+        if self._pipeline is not None or time.monotonic() < self._retry_at:
             return
         with self._instance_lock:
-            if self._pipeline is None:
-                try:
-                    from transformers import pipeline  # lazy import
-                    self._pipeline = pipeline(
-                        task="ner",
-                        model=self.model_name,
-                        aggregation_strategy="simple",
-                    )
-                    logger.info("HF NER pipeline initialized", model=self.model_name)
-                except Exception as e:
-                    self._pipeline = None
-                    logger.error("Failed to init HF NER pipeline; falling back to heuristics", error=str(e))
+            if self._pipeline is None and time.monotonic() >= self._retry_at:
+                backends = [self.backend] if self.backend == "hf" else [self.backend, "hf"]
+                for backend in backends:
+                    try:
+                        self._pipeline = load_pipeline(self.model_name, backend)
+                        self.loaded_backend = backend
+                        logger.info("HF NER pipeline initialized", model=self.model_name, backend=backend)
+                        return
+                    except Exception as e:
+                        logger.error("Failed to init HF NER pipeline", model=self.model_name, backend=backend, error=str(e))
+                self._retry_at = time.monotonic() + settings.ner_load_retry_seconds
+                logger.error(
+                    "No NER backend available; falling back to heuristics",
+                    retry_in_seconds=settings.ner_load_retry_seconds,
+                )
+
+    def current_backend(self, prefer_model: bool = True) -> str:
+        """Backend that extraction would use right now, without loading anything.
+
+        The loaded backend once there is one, ``"heuristic"`` while the model is
+        off or a failed load waits to be retried, else the configured backend.
+        """
+        if not (prefer_model and self.enable) or (self._pipeline is None and time.monotonic() < self._retry_at):
+            return "heuristic"
+        if self._pipeline is not None:
+            return self.loaded_backend or self.backend
+        return self.backend
 
     def extract_symptoms(self, text: str, prefer_model: bool = True) -> List[Dict[str, float]]:
         """Return a list of {name, confidence} for extracted symptoms.
         If prefer_model is False, skip the model and use heuristics only.
         """
-        normalized = text.strip()
-        if not normalized:
-            return []
+        return self.extract_symptoms_batch([text], prefer_model=prefer_model)[0]
+
+    def extract_symptoms_batch(
+        self, texts: List[str], prefer_model: bool = True, batch_size: int = 16
+    ) -> List[List[Dict[str, float]]]:
+        """Like ``extract_symptoms`` for many texts, running the model in batches.
+
+        Used by offline reprocessing, where per-text pipeline calls would
+        dominate the run time.
+        """
+        normalized = [text.strip() for text in texts]
+        results: List[List[Dict[str, float]]] = [[] for _ in texts]
+        todo = [i for i, text in enumerate(normalized) if text]
+        if not todo:
+            return results
 
         if prefer_model and self.enable:
             self._ensure_pipeline()
-        else:
-            # treat as if model is unavailable
-            pass
 
+        preds: List[list] = [[] for _ in texts]
+        if prefer_model and self._pipeline is not None:
+            try:
+                inputs = [normalized[i] for i in todo]
+                outputs = self._pipeline(inputs, batch_size=batch_size) if len(inputs) > 1 else [self._pipeline(inputs[0])]
+                for i, out in zip(todo, outputs):
+                    preds[i] = out
+            except Exception as e:
+                logger.error("HF NER extraction failed; using heuristics only", error=str(e))
+
+        for i in todo:
+            results[i] = self._merge(normalized[i], preds[i])
+        return results
+
+    def _merge(self, normalized: str, preds: list) -> List[Dict[str, float]]:
         # Heuristic keywords as a fallback and to merge with NER results
         heuristic_map = {
             "fever": 0.6,
@@ -71,22 +120,17 @@ class SymptomExtractor:
         found: Dict[str, float] = {}
 
         # NER path
-        if prefer_model and self._pipeline is not None:
-            try:
-                preds = self._pipeline(normalized)
-                for p in preds:
-                    label = (p.get("entity_group") or p.get("entity") or "").upper()
-                    word = (p.get("word") or "").strip()
-                    score = float(p.get("score") or 0.0)
-                    if not word:
-                        continue
-                    if any(key in label for key in ["SYMPT", "DISE", "PROBLEM", "CONDITION"]):
-                        name = word.lower()
-                        prev = found.get(name, 0.0)
-                        if score > prev:
-                            found[name] = score
-            except Exception as e:
-                logger.error("HF NER extraction failed; using heuristics only", error=str(e))
+        for p in preds:
+            label = (p.get("entity_group") or p.get("entity") or "").upper()
+            word = (p.get("word") or "").strip()
+            score = float(p.get("score") or 0.0)
+            if not word:
+                continue
+            if any(key in label for key in ["SYMPT", "DISE", "PROBLEM", "CONDITION"]):
+                name = word.lower()
+                prev = found.get(name, 0.0)
+                if score > prev:
+                    found[name] = score
 
         # Heuristic path
         lower = normalized.lower()
@@ -94,6 +138,16 @@ class SymptomExtractor:
             if k in lower:
                 found[k] = max(found.get(k, 0.0), conf)
 
+        # Map raw spans ("head ache", "breathlessness") onto the canonical vocabulary
+        index = get_symptom_index()
+        if index is not None:
+            canonical: Dict[str, float] = {}
+            for name, conf in found.items():
+                key = index.lookup(name) or name
+                if conf > canonical.get(key, 0.0):
+                    canonical[key] = conf
+            found = canonical
+
         results = [{"name": name, "confidence": float(conf)} for name, conf in found.items()]
         results.sort(key=lambda x: x["confidence"], reverse=True)
         return results
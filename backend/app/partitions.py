@@ -0,0 +1,247 @@
+"""Monthly ``user_logs`` partitions: creation ahead of time, retention and archival.
+
+On PostgreSQL (after migration ``0003_partition_user_logs``) ``user_logs`` is
+range-partitioned by ``created_at`` into ``user_logs_YYYY_MM`` tables plus a
+``user_logs_default`` catch-all. Other databases keep a plain table and every
+function here is a no-op::
+
+    cd backend
+    python -m app.partitions status
+    python -m app.partitions ensure --months-ahead 3
+    python -m app.partitions retain --retain-months 12 --archive-dir /var/lib/medlens/archive
+
+Creating a partition for a month whose rows already landed in
+``user_logs_default`` moves those rows into it.
+
+Retention detaches expired partitions first, so queries stop seeing them
+immediately, then exports each one (texts joined back from ``log_contents``) to
+a gzipped CSV and drops it only after the export's row count matches the
+table; contents no remaining log references are then pruned. A partition left detached
+by an interrupted run is picked up again by the next run. Rollup tables keep
+their counts, so ``/api/stats`` is unaffected by retention.
+"""
+import argparse
+import csv
+import datetime as dt
+import gzip
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .config import settings
+from .db import SessionLocal, engine as default_engine
+from .httpcache import log_versions
+from .logstore import log_text, prune_orphans
+
+logger = structlog.get_logger()
+
+PARENT = "user_logs"
+PARTITION_RE = re.compile(r"^user_logs_(\d{4})_(\d{2})$")
+
+
+def month_start(ts: Optional[dt.datetime] = None) -> dt.date:
+    ts = ts or dt.datetime.now(dt.timezone.utc)
+    return dt.date(ts.year, ts.month, 1)
+
+
+def add_months(month: dt.date, n: int) -> dt.date:
+    index = month.year * 12 + month.month - 1 + n
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: dt.date) -> str:
+    return f"{PARENT}_{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    kind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": PARENT}).scalar()
+    return kind == "p"
+
+
+def list_partitions(conn: Connection) -> List[Dict]:
+    """Monthly partition tables, attached or left detached, oldest first."""
+    rows = conn.execute(text("""
+        SELECT c.relname, i.inhrelid IS NOT NULL AS attached
+        FROM pg_class c
+        LEFT JOIN pg_inherits i ON i.inhrelid = c.oid AND i.inhparent = to_regclass(:parent)
+        WHERE c.relkind = 'r' AND c.relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = current_schema())
+          AND c.relname ~ '^user_logs_[0-9]{4}_[0-9]{2}$'
+    """), {"parent": PARENT}).all()
+    partitions = []
+    for name, attached in rows:
+        m = PARTITION_RE.match(name)
+        partitions.append({"name": name, "month": dt.date(int(m.group(1)), int(m.group(2)), 1), "attached": attached})
+    return sorted(partitions, key=lambda p: p["month"])
+
+
+def _create_partition(conn: Connection, month: dt.date) -> None:
+    """Create the partition for ``month``, moving its rows out of ``user_logs_default``.
+
+    PostgreSQL refuses a new partition while the default partition holds rows in
+    its range, so the default is detached, those rows are moved into the new
+    partition and the default is attached again, all in the caller's transaction.
+    """
+    name = partition_name(month)
+    default = f"{PARENT}_default"
+    bounds = {
+        "lo": f"{month.isoformat()} 00:00:00+00",
+        "hi": f"{add_months(month, 1).isoformat()} 00:00:00+00",
+    }
+    in_range = "created_at >= CAST(:lo AS timestamptz) AND created_at < CAST(:hi AS timestamptz)"
+    stranded = 0
+    if conn.execute(text("SELECT to_regclass(:t) IS NOT NULL"), {"t": default}).scalar():
+        # Blocks new default-partition writes until the move commits
+        conn.execute(text(f"LOCK TABLE {default} IN SHARE ROW EXCLUSIVE MODE"))
+        stranded = conn.execute(text(f"SELECT count(*) FROM {default} WHERE {in_range}"), bounds).scalar()
+    if stranded:
+        columns = conn.execute(text("""
+            SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) FROM pg_attribute
+            WHERE attrelid = to_regclass(:t) AND attnum > 0 AND NOT attisdropped
+        """), {"t": PARENT}).scalar()
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {default}"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{bounds['lo']}') TO ('{bounds['hi']}')"))
+    if stranded:
+        conn.execute(text(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {default} WHERE {in_range}"), bounds)
+        conn.execute(text(f"DELETE FROM {default} WHERE {in_range}"), bounds)
+        conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {default} DEFAULT"))
+        logger.info("Moved user_logs rows out of the default partition", partition=name, rows=stranded)
+
+
+def ensure_partitions(engine: Engine = default_engine, months_ahead: Optional[int] = None) -> List[str]:
+    """Create the current month's partition and ``months_ahead`` more; returns the ones created."""
+    months_ahead = settings.log_partition_months_ahead if months_ahead is None else months_ahead
+    created: List[str] = []
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return created
+        existing = {p["name"] for p in list_partitions(conn)}
+    first = month_start()
+    for n in range(months_ahead + 1):
+        month = add_months(first, n)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        try:
+            with engine.begin() as conn:
+                _create_partition(conn, month)
+        except Exception as e:
+            logger.error("Failed to create user_logs partition", partition=name, error=str(e))
+            continue
+        created.append(name)
+    if created:
+        logger.info("Created user_logs partitions", partitions=created)
+    return created
+
+
+def _export(engine: Engine, name: str, archive_dir: str) -> str:
+    """Write a detached partition to ``<archive_dir>/<name>.csv.gz``; returns the file path.
+
+    Input texts are joined back from ``log_contents`` and decoded, so the
+    archive is self-contained.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    fd, tmp = tempfile.mkstemp(dir=archive_dir, prefix=f".{name}-")
+    exported = 0
+    try:
+        with os.fdopen(fd, "wb") as fh, engine.connect() as conn:
+            with gzip.open(fh, "wt", encoding="utf-8", newline="") as gz:
+                writer = csv.writer(gz)
+                writer.writerow(["id", "type", "input_text", "result_summary", "created_at"])
+                result = conn.execution_options(stream_results=True, yield_per=5000).execute(text(f"""
+                    SELECT l.id, l.type, l.input_text, c.encoding, c.data, l.result_summary, l.created_at
+                    FROM {name} l LEFT JOIN log_contents c ON c.id = l.content_id
+                    ORDER BY l.id
+                """))
+                for log_id, log_type, input_text, encoding, data, summary, created_at in result:
+                    writer.writerow([
+                        log_id, log_type, log_text(input_text, encoding, data), summary,
+                        created_at.isoformat() if created_at else "",
+                    ])
+                    exported += 1
+            fh.flush()
+            os.fsync(fh.fileno())
+            expected = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+    except Exception:
+        os.unlink(tmp)
+        raise
+    if exported != expected:
+        os.unlink(tmp)
+        raise RuntimeError(f"exported {exported} of {expected} rows from {name}")
+    os.replace(tmp, path)
+    return path
+
+
+def apply_retention(
+    engine: Engine = default_engine,
+    retain_months: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+) -> List[Dict]:
+    """Detach, archive and drop partitions older than ``retain_months`` full months."""
+    retain_months = settings.log_retention_months if retain_months is None else retain_months
+    archive_dir = archive_dir or settings.log_archive_dir
+    if retain_months <= 0:
+        return []
+    cutoff = add_months(month_start(), -retain_months)
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return []
+        expired = [p for p in list_partitions(conn) if p["month"] < cutoff]
+    if dry_run:
+        return expired
+
+    archived = []
+    for partition in expired:
+        name = partition["name"]
+        if partition["attached"]:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            logger.info("Detached user_logs partition", partition=name)
+        path = _export(engine, name, archive_dir)
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {name}"))
+        logger.info("Archived and dropped user_logs partition", partition=name, path=path)
+        archived.append({**partition, "path": path})
+
+    if archived:
+        # Recent-log responses may have shrunk, so old ETags must stop matching
+        log_versions.bump("symptom_check", "misinformation_scan", "feedback")
+        with SessionLocal(bind=engine) as db:
+            pruned = prune_orphans(db)
+        logger.info("Pruned unreferenced log contents", contents=pruned)
+    return archived
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="list monthly partitions")
+    ensure = sub.add_parser("ensure", help="create upcoming partitions")
+    ensure.add_argument("--months-ahead", type=int, default=None)
+    retain = sub.add_parser("retain", help="archive and drop expired partitions")
+    retain.add_argument("--retain-months", type=int, default=None)
+    retain.add_argument("--archive-dir", default=None)
+    retain.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        result = ensure_partitions(months_ahead=args.months_ahead)
+    elif args.command == "retain":
+        result = apply_retention(retain_months=args.retain_months, archive_dir=args.archive_dir, dry_run=args.dry_run)
+    else:
+        with default_engine.connect() as conn:
+            result = list_partitions(conn) if is_partitioned(conn) else []
+    print(json.dumps(result, default=str, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Re-run symptom extraction over stored ``symptom_check`` logs.
+
+Run this after upgrading the NER model, the symptom vocabulary or the rule
+table, so historical summaries and the symptom rollups match what the live
+endpoint would produce today::
+
+    cd backend
+    python -m app.reprocess --workers 4 --batch-size 32
+    python -m app.reprocess --dry-run --limit 10000      # count what would change
+
+Rows are read in ``id`` order by keyset (``id > last_id``), so no query ever
+holds a long-running cursor. Chunks are fanned out to a process pool whose
+workers each load ``SymptomExtractor`` once and run batched inference. Results
+are written back in order, one transaction per chunk: changed summaries are
+bulk-updated and the symptom rollups are corrected by the difference between
+the old and new symptom lists. After each commit the last processed id is
+saved to a checkpoint file, so an interrupted run resumes where it stopped.
+Rerunning a chunk is harmless because unchanged rows are skipped.
+
+Age and sex are not stored with logs, so rules that depend on them do not
+count towards the recomputed ``actions``/``cautions`` totals.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import func, select, update
+
+from . import models
+from .db import SessionLocal
+from .httpcache import queue_version_bump
+from .logstore import TEXT_COLUMNS, log_text, with_contents
+from .nlp import SymptomExtractor
+from .rollups import apply_rollups, rollup_counts, symptom_summary
+from .rules import NO_SYMPTOMS_CAUTION, rule_engine
+
+logger = structlog.get_logger()
+
+LOG_TYPE = "symptom_check"
+MAX_SYMPTOMS = 10  # same cap as the /api/symptom-check response
+
+Row = Tuple[int, str, Optional[str], object]  # id, input_text, result_summary, created_at
+
+_extractor: Optional[SymptomExtractor] = None
+_prefer_model = True
+_batch_size = 32
+
+
+def _init_worker(prefer_model: bool, batch_size: int, model_name: Optional[str], threads: int) -> None:
+    """Process pool initializer: load the extractor (and model) once per worker."""
+    global _extractor, _prefer_model, _batch_size
+    _prefer_model = prefer_model
+    _batch_size = batch_size
+    if prefer_model and threads:
+        try:
+            import torch  # avoid every worker claiming every core
+            torch.set_num_threads(threads)
+        except Exception:
+            pass
+    kwargs = {"model_name": model_name} if model_name else {}
+    _extractor = SymptomExtractor(enable=prefer_model, **kwargs)
+    if prefer_model:
+        _extractor._ensure_pipeline()
+
+
+def _extract_chunk(items: List[Tuple[int, str]]) -> List[List[str]]:
+    results = _extractor.extract_symptoms_batch(
+        [text for _, text in items], prefer_model=_prefer_model, batch_size=_batch_size
+    )
+    return [[r["name"] for r in found[:MAX_SYMPTOMS]] for found in results]
+
+
+def summarize(names: List[str]) -> str:
+    actions, cautions = rule_engine.evaluate(names)
+    if not names:
+        cautions.insert(0, NO_SYMPTOMS_CAUTION)
+    return symptom_summary(names, len(actions), len(cautions))
+
+
+def load_checkpoint(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_checkpoint(path: str, state: Dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".reprocess-")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(state, fh, indent=2)
+    os.replace(tmp, path)  # never leave a truncated checkpoint behind
+
+
+def iter_chunks(after_id: int, until_id: int, chunk_size: int) -> Iterator[List[Row]]:
+    """Yield ``symptom_check`` rows with ``after_id < id <= until_id`` in id order."""
+    stmt = (
+        with_contents(select(models.UserLog.id, *TEXT_COLUMNS, models.UserLog.result_summary, models.UserLog.created_at))
+        .where(models.UserLog.type == LOG_TYPE)
+        .order_by(models.UserLog.id)
+        .limit(chunk_size)
+    )
+    while after_id < until_id:
+        with SessionLocal() as db:
+            rows = db.execute(
+                stmt.where(models.UserLog.id > after_id, models.UserLog.id <= until_id)
+            ).all()
+        if not rows:
+            return
+        yield [(r[0], log_text(r[1], r[2], r[3]), r[4], r[5]) for r in rows]
+        after_id = rows[-1][0]
+
+
+def write_chunk(rows: List[Row], names: List[List[str]], dry_run: bool = False) -> int:
+    """Store new summaries and rollup deltas for one chunk; returns rows changed."""
+    changes = []
+    old_entries = []
+    new_entries = []
+    for (log_id, _, old_summary, created_at), found in zip(rows, names):
+        summary = summarize(found)
+        if summary == old_summary:
+            continue
+        changes.append({"id": log_id, "created_at": created_at, "result_summary": summary})
+        old_entries.append((LOG_TYPE, old_summary, created_at))
+        new_entries.append((LOG_TYPE, summary, created_at))
+    if not changes or dry_run:
+        return len(changes)
+
+    symptoms = rollup_counts(new_entries)[2]
+    symptoms.subtract(rollup_counts(old_entries)[2])
+    with SessionLocal() as db:
+        db.execute(update(models.UserLog), changes)
+        apply_rollups(db, Counter(), Counter(), symptoms)
+        queue_version_bump(db, LOG_TYPE)
+        db.commit()
+    return len(changes)
+
+
+def _prune_empty_rollups() -> None:
+    with SessionLocal() as db:
+        db.query(models.SymptomHourlyRollup).filter(models.SymptomHourlyRollup.count <= 0).delete()
+        db.commit()
+
+
+def run(
+    checkpoint_path: str,
+    workers: int = 0,
+    chunk_size: int = 256,
+    batch_size: int = 32,
+    prefer_model: bool = True,
+    model_name: Optional[str] = None,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    restart: bool = False,
+    report_seconds: float = 10.0,
+) -> Dict:
+    state = {} if restart or dry_run else load_checkpoint(checkpoint_path)
+    if not state:
+        with SessionLocal() as db:
+            until_id = db.execute(
+                select(func.max(models.UserLog.id)).where(models.UserLog.type == LOG_TYPE)
+            ).scalar() or 0
+        # Rows written after the run starts were already extracted by the live model
+        state = {"until_id": until_id, "last_id": 0, "scanned": 0, "updated": 0, "elapsed_seconds": 0.0}
+    else:
+        logger.info("Resuming reprocessing", last_id=state["last_id"], until_id=state["until_id"])
+    state.update(model=model_name, prefer_model=prefer_model, rules_version=rule_engine.ruleset.version)
+
+    threads = max(1, (os.cpu_count() or 1) // workers) if workers else 0
+    init_args = (prefer_model, batch_size, model_name, threads)
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) if workers else None
+    if pool is None:
+        _init_worker(*init_args)
+
+    started = time.monotonic()
+    elapsed_before = state["elapsed_seconds"]
+    scanned = updated = 0
+    last_report = started
+    pending: Deque[Tuple[List[Row], Future]] = deque()
+
+    def finish_oldest() -> None:
+        nonlocal scanned, updated, last_report
+        rows, future = pending.popleft()
+        changed = write_chunk(rows, future.result(), dry_run=dry_run)
+        scanned += len(rows)
+        updated += changed
+        state["last_id"] = rows[-1][0]
+        state["scanned"] += len(rows)
+        state["updated"] += changed
+        state["elapsed_seconds"] = round(elapsed_before + time.monotonic() - started, 3)
+        if not dry_run:
+            save_checkpoint(checkpoint_path, state)
+        now = time.monotonic()
+        if now - last_report >= report_seconds:
+            last_report = now
+            logger.info(
+                "Reprocessing progress",
+                rows=scanned,
+                updated=updated,
+                last_id=state["last_id"],
+                until_id=state["until_id"],
+                rows_per_sec=round(scanned / (now - started), 1),
+            )
+
+    try:
+        remaining = limit
+        for rows in iter_chunks(state["last_id"], state["until_id"], chunk_size):
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                rows = rows[:remaining]
+                remaining -= len(rows)
+            items = [(r[0], r[1]) for r in rows]
+            if pool is None:
+                future: Future = Future()
+                future.set_result(_extract_chunk(items))
+            else:
+                future = pool.submit(_extract_chunk, items)
+            pending.append((rows, future))
+            # Keep every worker busy while bounding memory to a few chunks per worker
+            while len(pending) > max(1, workers * 2) or (pending and pending[0][1].done()):
+                finish_oldest()
+        while pending:
+            finish_oldest()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if updated and not dry_run:
+        _prune_empty_rollups()
+    elapsed = time.monotonic() - started
+    report = {
+        "rows": scanned,
+        "updated": updated,
+        "last_id": state["last_id"],
+        "until_id": state["until_id"],
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(scanned / elapsed, 1) if elapsed > 0 else 0.0,
+        "dry_run": dry_run,
+    }
+    logger.info("Reprocessing finished", **report)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (0 runs inline)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="rows per keyset query and per write transaction")
+    parser.add_argument("--batch-size", type=int, default=32, help="texts per NER forward pass")
+    parser.add_argument("--model", default=None, help="NER model name (defaults to the one the API uses)")
+    parser.add_argument("--no-model", action="store_true", help="use keyword heuristics only")
+    parser.add_argument("--checkpoint", default="reprocess_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many rows")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--report-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    report = run(
+        args.checkpoint,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        prefer_model=not args.no_model,
+        model_name=args.model,
+        limit=args.limit,
+        dry_run=args.dry_run,
+        restart=args.restart,
+        report_seconds=args.report_seconds,
+    )
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
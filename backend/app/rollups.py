@@ -0,0 +1,152 @@
+import datetime as dt
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .activity import queue_log_event
+from .httpcache import queue_version_bump
+from .logstore import store_content
+
+logger = structlog.get_logger()
+
+# Rollup tables are maintained on write, so dashboard stats never scan user_logs.
+# Every counter is bucketed by UTC hour; coarser buckets are summed on read.
+
+
+def hour_bucket(ts: Optional[dt.datetime] = None) -> dt.datetime:
+    ts = ts or dt.datetime.now(dt.timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt.timezone.utc)
+    return ts.astimezone(dt.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def parse_summary(summary: Optional[str]) -> Dict[str, str]:
+    """Parse a ``key=value; key=value`` result summary.
+
+    ``notes`` is free text and always last, so everything after ``notes=``
+    is kept verbatim.
+    """
+    fields: Dict[str, str] = {}
+    if not summary:
+        return fields
+    parts = summary.split("; ")
+    for i, part in enumerate(parts):
+        key, sep, value = part.partition("=")
+        if not sep:
+            continue
+        key = key.strip()
+        if key == "notes":
+            fields[key] = "; ".join([value] + parts[i + 1:])
+            break
+        fields[key] = value.strip()
+    return fields
+
+
+def summary_symptoms(summary: Optional[str]) -> List[str]:
+    extracted = parse_summary(summary).get("extracted", "")
+    return [name.strip()[:100] for name in extracted.split(",") if name.strip()]
+
+
+def symptom_summary(names: Iterable[str], actions_count: int, cautions_count: int) -> str:
+    """Format a ``symptom_check`` result summary (parsed back by ``summary_symptoms``)."""
+    return f"extracted={','.join(names)}; actions={actions_count}; cautions={cautions_count}"
+
+
+def rollup_counts(
+    entries: Iterable[Tuple[str, Optional[str], Optional[dt.datetime]]],
+) -> Tuple[Counter, Counter, Counter]:
+    """Aggregate ``(type, result_summary, created_at)`` entries into rollup counters."""
+    types: Counter = Counter()
+    feedback: Counter = Counter()
+    symptoms: Counter = Counter()
+    for log_type, summary, created_at in entries:
+        bucket = hour_bucket(created_at)
+        types[(bucket, log_type)] += 1
+        if log_type == "feedback":
+            fields = parse_summary(summary)
+            feedback[(bucket, fields.get("context", "")[:50], fields.get("verdict", "")[:20])] += 1
+        elif log_type == "symptom_check":
+            for name in summary_symptoms(summary):
+                symptoms[(bucket, name)] += 1
+    return types, feedback, symptoms
+
+
+def _upsert_counts(db: Session, model, key_names: Tuple[str, ...], counts: Counter) -> None:
+    # Rows go in primary-key order so concurrent writers lock hot rows in the same
+    # order and cannot deadlock each other
+    rows = [dict(zip(key_names, key), count=n) for key, n in sorted(counts.items()) if n]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_names),
+            set_={"count": model.count + stmt.excluded.count},
+        )
+        db.execute(stmt)
+        return
+
+    # Portable fallback for dialects without ON CONFLICT
+    for row in rows:
+        filters = [getattr(model, k) == row[k] for k in key_names]
+        existing = db.execute(select(model).where(*filters).with_for_update()).scalar_one_or_none()
+        if existing is None:
+            db.add(model(**row))
+        else:
+            existing.count += row["count"]
+    db.flush()
+
+
+def apply_rollups(db: Session, types: Counter, feedback: Counter, symptoms: Counter) -> None:
+    """Add (or, with negative counts, subtract) counter deltas to the rollup tables."""
+    _upsert_counts(db, models.LogHourlyRollup, ("bucket_start", "type"), types)
+    _upsert_counts(db, models.FeedbackHourlyRollup, ("bucket_start", "context", "verdict"), feedback)
+    _upsert_counts(db, models.SymptomHourlyRollup, ("bucket_start", "name"), symptoms)
+
+
+def record_log(db: Session, log_type: str, input_text: str, result_summary: Optional[str]) -> models.UserLog:
+    """Add a ``UserLog`` and bump its rollups in the caller's transaction.
+
+    ``input_text`` is stored once in ``log_contents`` and referenced by id.
+    The caller commits (or rolls back) everything together; the activity feed
+    event is published only after a successful commit.
+    """
+    now = dt.datetime.now(dt.timezone.utc)
+    content_id = store_content(db, input_text)
+    log = models.UserLog(type=log_type, content_id=content_id, result_summary=result_summary, created_at=now)
+    db.add(log)
+    apply_rollups(db, *rollup_counts([(log_type, result_summary, now)]))
+    db.flush()
+    queue_log_event(db, log, input_text)
+    queue_version_bump(db, log_type)
+    return log
+
+
+def rebuild_rollups(db: Session, batch_size: int = 10_000) -> int:
+    """Recompute every rollup table from ``user_logs``; returns the number of rows scanned."""
+    for model in (models.LogHourlyRollup, models.FeedbackHourlyRollup, models.SymptomHourlyRollup):
+        db.query(model).delete()
+    stmt = select(models.UserLog.type, models.UserLog.result_summary, models.UserLog.created_at)
+    types: Counter = Counter()
+    feedback: Counter = Counter()
+    symptoms: Counter = Counter()
+    scanned = 0
+    for partition in db.execute(stmt.execution_options(yield_per=batch_size)).partitions():
+        t, f, s = rollup_counts(partition)
+        types.update(t)
+        feedback.update(f)
+        symptoms.update(s)
+        scanned += len(partition)
+    apply_rollups(db, types, feedback, symptoms)
+    db.commit()
+    logger.info("Rollups rebuilt", rows=scanned)
+    return scanned
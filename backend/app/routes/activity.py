@@ -0,0 +1,54 @@
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import structlog
+
+from ..activity import TooManySubscribers, broker
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+
+@router.websocket("/ws/activity")
+async def activity_feed(websocket: WebSocket):
+    """Push new log events and symptom-pattern snapshots to a dashboard.
+
+    Sends recent events on connect, then live events as JSON text frames
+    (``{"event": "log" | "patterns" | "dropped", "data": ...}``). Reads no
+    database rows, so DB load does not grow with connected dashboards.
+    """
+    await websocket.accept()
+    try:
+        subscription = broker.subscribe()
+    except TooManySubscribers:
+        logger.warning("Activity feed subscriber cap reached", subscribers=broker.subscriber_count)
+        await websocket.close(code=1013, reason="Too many subscribers")
+        return
+
+    async def drain_client() -> None:
+        # Consume client frames so disconnects are noticed promptly
+        while True:
+            await websocket.receive_text()
+
+    receiver = asyncio.create_task(drain_client())
+    try:
+        for payload in broker.snapshot():
+            await websocket.send_text(payload.decode())
+        while True:
+            getter = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                break
+            if subscription.dropped:
+                await websocket.send_text(f'{{"event":"dropped","data":{{"count":{subscription.dropped}}}}}')
+                subscription.dropped = 0
+            await websocket.send_text(getter.result().decode())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning("Activity feed connection failed", error=str(e))
+    finally:
+        receiver.cancel()
+        subscription.close()
@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from ..db import engine, pool_stats, read_engine, replica_monitor
+from ..llm import llm_router
+
 router = APIRouter()
 
 
@@ -8,3 +11,21 @@ def health_check():
     return {"status": "ok"}
 
 
+@router.get("/health/db")
+def database_health():
+    """Connection pool usage per engine and replica routing state."""
+    engines = {"primary": pool_stats(engine)}
+    if read_engine is not None:
+        engines["replica"] = {
+            **pool_stats(read_engine),
+            "healthy": replica_monitor.healthy,
+            "lag_seconds": replica_monitor.lag,
+            "max_lag_seconds": replica_monitor.max_lag,
+        }
+    return {"engines": engines, "reads": dict(replica_monitor.reads)}
+
+
+@router.get("/health/llm")
+def llm_health():
+    """Per-provider circuit state, error rate, latency percentiles and in-flight requests."""
+    return {"preferred": llm_router.provider, "providers": llm_router.snapshot()}
@@ -1,17 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 from slowapi.util import get_remote_address
 from slowapi import Limiter
+import datetime as dt
 import structlog
-import hashlib
 
-from ..deps import get_db
+from ..deps import get_db, get_read_db
 from .. import models
+from ..rollups import record_log
 from ..config import settings
 from ..cache import CacheClient
+from ..activity import broker
+from ..logstore import TEXT_COLUMNS, log_text, with_contents
+from ..httpcache import cache_headers, etag_matches, log_versions, make_etag, not_modified
 
 logger = structlog.get_logger()
 limiter = Limiter(key_func=get_remote_address)
@@ -27,25 +32,62 @@ class LogItem(BaseModel):
     result_summary: Optional[str]
     created_at: Optional[str]
 
-    class Config:
-        from_attributes = True
+
+LOG_COLUMNS = (
+    models.UserLog.id,
+    models.UserLog.type,
+    *TEXT_COLUMNS,
+    models.UserLog.result_summary,
+    models.UserLog.created_at,
+)
+
+
+def fetch_recent(db: Session, stmt, limit: int) -> list:
+    """Run ``stmt`` (newest first) for ``limit`` rows, looking at recent rows first.
+
+    The ``created_at`` lower bound lets PostgreSQL prune all but the latest
+    monthly partitions; only if that window holds fewer than ``limit`` rows is
+    the query repeated without it.
+    """
+    if settings.log_query_window_days > 0:
+        since = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=settings.log_query_window_days)
+        rows = db.execute(stmt.where(models.UserLog.created_at >= since).limit(limit)).all()
+        if len(rows) >= limit:
+            return rows
+    return db.execute(stmt.limit(limit)).all()
 
 
 @router.get("/logs", response_model=List[LogItem])
 @limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def get_logs(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     type: Optional[str] = Query(None, description="Filter by type: symptom_check | misinformation_scan | feedback"),
     limit: int = Query(10, ge=1, le=100),
 ):
     try:
-        query = db.query(models.UserLog).order_by(desc(models.UserLog.created_at))
+        etag = make_etag("logs", type or "*", limit, log_versions.current(db, type))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        # Plain column tuples instead of ORM entities: no identity map or
+        # attribute instrumentation, and the rows serialize straight to JSON.
+        stmt = with_contents(select(*LOG_COLUMNS)).order_by(desc(models.UserLog.created_at))
         if type:
-            query = query.filter(models.UserLog.type == type)
-        items = query.limit(limit).all()
+            stmt = stmt.where(models.UserLog.type == type)
+        rows = fetch_recent(db, stmt, limit)
+        items = [
+            {
+                "id": row_id,
+                "type": row_type,
+                "input_text": log_text(input_text, encoding, data),
+                "result_summary": result_summary,
+                "created_at": created_at.isoformat() if created_at else None,
+            }
+            for row_id, row_type, input_text, encoding, data, result_summary, created_at in rows
+        ]
         logger.info("Fetched logs", count=len(items), type=type)
-        return items
+        return cache_headers(ORJSONResponse(items), etag)
     except Exception as e:
         logger.error("Failed to fetch logs", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch logs")
@@ -55,6 +97,8 @@ class FeedbackRequest(BaseModel):
     context: str = Field(..., description="Context of feedback e.g. 'symptom_check' or 'misinformation_scan'")
     verdict: str = Field(..., description="'up' | 'down' | 'neutral'")
     notes: Optional[str] = None
+    claim: Optional[str] = Field(None, max_length=2000, description="Assessed claim the verdict is about")
+    risk: Optional[str] = Field(None, max_length=20, description="Risk level shown for the claim")
 
 
 @router.post("/feedback")
@@ -65,8 +109,10 @@ async def submit_feedback(
     db: Session = Depends(get_db)
 ):
     try:
-        summary = f"context={payload.context}; verdict={payload.verdict}; notes={(payload.notes or '')[:200]}"
-        db.add(models.UserLog(type="feedback", input_text=payload.context, result_summary=summary))
+        risk = f"risk={payload.risk}; " if payload.risk else ""
+        summary = f"context={payload.context}; verdict={payload.verdict}; {risk}notes={(payload.notes or '')[:200]}"
+        # Per-claim verdicts keep the claim as input text, the training data for app.classifier
+        record_log(db, "feedback", payload.claim or payload.context, summary)
         db.commit()
         logger.info("Feedback stored", context=payload.context, verdict=payload.verdict)
         return {"ok": True}
@@ -86,30 +132,38 @@ class ClusterItem(BaseModel):
 @limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def symptom_patterns(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     n_clusters: int = Query(3, ge=2, le=10),
     limit: int = Query(200, ge=10, le=1000),
 ):
     """Cluster recent symptom descriptions using TF-IDF + KMeans (placeholder heuristic if sklearn unavailable)."""
     try:
-        # Generate cache key based on parameters
-        cache_key = f"patterns:v1:{n_clusters}:{limit}:{hashlib.md5(str(limit).encode()).hexdigest()}"
+        # Clusters are a function of the symptom_check rows, so their version is the snapshot version
+        etag = make_etag("patterns", n_clusters, limit, log_versions.current(db, "symptom_check"))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        # The cached snapshot keeps the ETag it was computed under: serving it with the
+        # live version would pair a newer ETag with older clusters
+        cache_key = f"patterns:v2:{n_clusters}:{limit}"
         cached = cache.get_json(cache_key)
-        if cached and isinstance(cached, list):
+        if isinstance(cached, dict) and isinstance(cached.get("clusters"), list) and cached.get("etag"):
             logger.info("Returning cached clustering results", n_clusters=n_clusters)
-            return cached
-
-        rows = (
-            db.query(models.UserLog)
-            .filter(models.UserLog.type == "symptom_check")
-            .order_by(desc(models.UserLog.created_at))
-            .limit(limit)
-            .all()
+            if etag_matches(request, cached["etag"]):
+                return not_modified(cached["etag"])
+            return cache_headers(ORJSONResponse(cached["clusters"]), cached["etag"])
+
+        rows = fetch_recent(
+            db,
+            with_contents(select(*TEXT_COLUMNS))
+            .where(models.UserLog.type == "symptom_check")
+            .order_by(desc(models.UserLog.created_at)),
+            limit,
         )
-        texts = [r.input_text for r in rows if r.input_text]
+        texts = [t for t in (log_text(*row) for row in rows) if t]
         if not texts:
-            return []
-        clusters: List[ClusterItem] = []
+            return cache_headers(ORJSONResponse([]), etag)
+        clusters: List[dict] = []
         try:
             from sklearn.feature_extraction.text import TfidfVectorizer
             from sklearn.cluster import KMeans
@@ -124,7 +178,7 @@ async def symptom_patterns(
             for i in range(n_clusters):
                 top_terms = [terms[ind] for ind in order_centroids[i, :8]]  # Increased from 5 to 8
                 count = int(np.sum(labels == i))
-                clusters.append(ClusterItem(label=i, terms=top_terms, count=count))
+                clusters.append({"label": i, "terms": [str(t) for t in top_terms], "count": count})
         except Exception:
             # Heuristic: bucket by simple keywords
             buckets = {
@@ -134,12 +188,13 @@ async def symptom_patterns(
             }
             for i, (_, keywords) in buckets.items():
                 count = sum(any(k in t.lower() for k in keywords) for t in texts)
-                clusters.append(ClusterItem(label=i, terms=keywords[:8], count=count))
+                clusters.append({"label": i, "terms": keywords[:8], "count": count})
         
         # Cache results for 5 minutes
-        cache.set_json(cache_key, [c.dict() for c in clusters], ttl_seconds=300)
+        cache.set_json(cache_key, {"etag": etag, "clusters": clusters}, ttl_seconds=300)
+        broker.publish("patterns", {"n_clusters": n_clusters, "limit": limit, "clusters": clusters})
         logger.info("Computed and cached clustering results", n_clusters=n_clusters, count=len(clusters))
-        return clusters
+        return cache_headers(ORJSONResponse(clusters), etag)
     except Exception as e:
         logger.error("Clustering failed", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to compute patterns")
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from pydantic import BaseModel, Field, model_validator
+from pydantic_core import PydanticCustomError
+from typing import AsyncIterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from slowapi.util import get_remote_address
 from slowapi import Limiter
+import asyncio
 import structlog
+import orjson
 
 from ..deps import get_db
-from .. import models
-from ..llm import LLMClient
+from ..db import SessionLocal
+from ..rollups import record_log
+from ..llm import llm_router
+from ..classifier import get_classifier, is_uncertain, risk_level, split_sentences
+from ..fetcher import FetchError, fetcher
 from ..config import settings
 
 logger = structlog.get_logger()
@@ -22,11 +30,31 @@ TRUSTED_SOURCES = [
     {"name": "NHP", "url": "https://www.nhp.gov.in"},
     {"name": "WHO India", "url": "https://www.who.int/india"},
 ]
+TRUSTED_SOURCE_URLS = [src["url"] for src in TRUSTED_SOURCES]
+
+RISKY_KEYWORDS = [
+    "miracle cure",
+    "100% effective",
+    "no side effects",
+    "detox",
+    "instantly",
+    "secret remedy",
+]
+
+SUMMARY_MAX_CHARS = 1000
+STREAM_BATCH_SENTENCES = 16  # sentences scored per batch before their claim events go out
 
 
 class MisinformationScanRequest(BaseModel):
-    text: str = Field(..., min_length=10, description="Article or post text to scan")
-    url: Optional[str] = None
+    text: Optional[str] = Field(None, description="Article or post text to scan")
+    url: Optional[str] = Field(None, max_length=2048, description="Article URL, fetched when text is short or missing")
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if not self.url and len((self.text or "").strip()) < 10:
+            # PydanticCustomError keeps the error context JSON-serializable, so this stays a 422
+            raise PydanticCustomError("text_or_url", "Provide either text (at least 10 characters) or a url")
+        return self
 
 
 class ClaimAssessment(BaseModel):
@@ -34,6 +62,7 @@ class ClaimAssessment(BaseModel):
     risk: str
     rationale: str
     references: List[str]
+    score: Optional[float] = Field(None, description="Calibrated classifier probability that the claim is dubious")
 
 
 class MisinformationScanResponse(BaseModel):
@@ -42,88 +71,254 @@ class MisinformationScanResponse(BaseModel):
     high_risk_count: int = 0
 
 
+# Assessments are built as plain dicts shaped like ClaimAssessment; the model
+# stays as the documented response schema but is not constructed per sentence.
+def _assess_sentence(sentence: str) -> Optional[dict]:
+    """Keyword heuristic, used when the classifier is unavailable."""
+    lower = sentence.lower()
+    if any(k in lower for k in RISKY_KEYWORDS):
+        return {
+            "claim": sentence,
+            "risk": "high",
+            "rationale": "Contains absolute or sensational claims often associated with misinformation.",
+            "references": TRUSTED_SOURCE_URLS,
+        }
+    return None
+
+
+def _classified_assessment(sentence: str, risk: str, score: float) -> dict:
+    if risk == "high":
+        rationale = f"Classified as a likely dubious health claim (score {score:.2f})."
+    else:
+        rationale = f"Resembles dubious health claims (score {score:.2f}); verify with trusted sources."
+    return {
+        "claim": sentence,
+        "risk": risk,
+        "rationale": rationale,
+        "references": TRUSTED_SOURCE_URLS,
+        "score": round(score, 3),
+    }
+
+
+def _assess_sentences(sentences: List[str]) -> Tuple[List[dict], bool]:
+    """Score sentences in one batch.
+
+    Returns the medium/high assessments and whether any score fell in the
+    uncertain band (always true for the keyword fallback).
+    """
+    classifier = get_classifier()
+    if classifier is None:
+        return [a for a in map(_assess_sentence, sentences) if a is not None], True
+
+    flagged: List[dict] = []
+    uncertain = False
+    for sentence, score in zip(sentences, classifier.score(sentences).tolist()):
+        lower = sentence.lower()
+        if any(k in lower for k in RISKY_KEYWORDS):
+            # The old keyword list stays a floor so known phrases are never missed
+            score = max(score, settings.misinfo_high_threshold)
+        uncertain = uncertain or is_uncertain(score)
+        risk = risk_level(score)
+        if risk != "low":
+            flagged.append(_classified_assessment(sentence, risk, score))
+    return flagged, uncertain
+
+
+def _assess_text(text: str) -> Tuple[List[dict], int, bool]:
+    """Score every sentence of ``text``; returns assessments, sentence count and uncertainty."""
+    sentences = split_sentences(text)
+    flagged, uncertain = _assess_sentences(sentences)
+    return flagged, len(sentences), uncertain
+
+
+def _wants_llm(uncertain: bool) -> bool:
+    if settings.misinfo_llm_mode == "always":
+        return True
+    if settings.misinfo_llm_mode == "never":
+        return False
+    return uncertain
+
+
+def _local_summary(sentences: int, flagged: List[dict]) -> str:
+    high = sum(1 for c in flagged if c["risk"] == "high")
+    medium = sum(1 for c in flagged if c["risk"] == "medium")
+    return (
+        f"Screened {sentences} sentences locally: {high} high-risk and {medium} medium-risk claims. "
+        "Verify health claims with trusted sources."
+    )
+
+
+def _general_assessment() -> dict:
+    return {
+        "claim": "General content review",
+        "risk": "low",
+        "rationale": "No obvious red flags detected with heuristics. Verify health claims with trusted sources.",
+        "references": TRUSTED_SOURCE_URLS,
+    }
+
+
+def _log_scan(db: Session, text: str, claims_count: int, high_count: int, llm_used: bool) -> None:
+    try:
+        summary = f"claims={claims_count}; high_risk={high_count}; llm={int(llm_used)}"
+        record_log(db, "misinformation_scan", text[:5000], summary)
+        db.commit()
+        logger.info(
+            "Misinformation scan completed",
+            claims_count=claims_count,
+            high_risk_count=high_count,
+            llm_used=llm_used,
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error("Failed to log misinformation scan", error=str(e))
+
+
+def _log_scan_in_session(text: str, claims_count: int, high_count: int, llm_used: bool) -> None:
+    # Dependencies with yield are torn down before a streamed body is sent,
+    # so the stream logs through its own session.
+    db = SessionLocal()
+    try:
+        _log_scan(db, text, claims_count, high_count, llm_used)
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def _resolve_text(payload: MisinformationScanRequest) -> str:
+    """Return the text to scan, fetching ``payload.url`` when text is short or missing."""
+    text = (payload.text or "").strip()
+    if payload.url and len(text) < settings.fetch_min_text_length:
+        try:
+            return await fetcher.fetch_text(payload.url)
+        except FetchError as e:
+            logger.warning("Article fetch failed", url=payload.url, error=str(e))
+            if len(text) < 10:
+                raise HTTPException(status_code=422, detail=f"Could not fetch article: {e}")
+    return text
+
+
 @router.post("/misinformation-scan", response_model=MisinformationScanResponse)
 @limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def scan_misinformation(
-    request: MisinformationScanRequest, 
+    request: Request,
+    payload: MisinformationScanRequest,
     db: Session = Depends(get_db),
     remote_address: str = Depends(get_remote_address)
 ):
     """Scan content for medical misinformation"""
     try:
+        text = await _resolve_text(payload)
         logger.info(
             "Misinformation scan request",
-            text_length=len(request.text),
-            url=request.url,
+            text_length=len(text),
+            url=payload.url,
             client_ip=remote_address,
         )
 
-        sentences = [s.strip() for s in request.text.split('.') if s.strip()]
-        flagged: List[ClaimAssessment] = []
-        risky_keywords = [
-            "miracle cure",
-            "100% effective",
-            "no side effects",
-            "detox",
-            "instantly",
-            "secret remedy",
-        ]
-
-        for s in sentences:
-            lower = s.lower()
-            if any(k in lower for k in risky_keywords):
-                flagged.append(
-                    ClaimAssessment(
-                        claim=s,
-                        risk="high",
-                        rationale="Contains absolute or sensational claims often associated with misinformation.",
-                        references=[src["url"] for src in TRUSTED_SOURCES],
-                    )
-                )
+        flagged, sentences, uncertain = await asyncio.to_thread(_assess_text, text)
+        llm_used = _wants_llm(uncertain)
+        summary_text = None if llm_used else _local_summary(sentences, flagged)
 
         if not flagged:
-            flagged.append(
-                ClaimAssessment(
-                    claim="General content review",
-                    risk="low",
-                    rationale="No obvious red flags detected with heuristics. Verify health claims with trusted sources.",
-                    references=[src["url"] for src in TRUSTED_SOURCES],
-                )
-            )
+            flagged.append(_general_assessment())
 
-        summary_text = None
-        try:
-            llm = LLMClient()
-            notes = llm.analyze_claims(request.text)
-            if notes:
-                summary_text = notes[0][:1000]
-        except Exception as e:
-            logger.warning("LLM analysis failed", error=str(e))
-
-        high_count = sum(1 for c in flagged if c.risk == 'high')
-        response = MisinformationScanResponse(
-            assessments=flagged,
-            summary=summary_text,
-            high_risk_count=high_count,
-        )
+        if llm_used:
+            try:
+                notes = await llm_router.analyze_claims(text)
+                if notes:
+                    summary_text = notes[0][:SUMMARY_MAX_CHARS]
+            except Exception as e:
+                logger.warning("LLM analysis failed", error=str(e))
 
-        try:
-            summary = f"claims={len(flagged)}; high_risk={high_count}"
-            db.add(models.UserLog(type="misinformation_scan", input_text=request.text[:5000], result_summary=summary))
-            db.commit()
-            logger.info(
-                "Misinformation scan completed",
-                claims_count=len(flagged),
-                high_risk_count=high_count,
-            )
-        except Exception as e:
-            db.rollback()
-            logger.error("Failed to log misinformation scan", error=str(e))
+        high_count = sum(1 for c in flagged if c["risk"] == 'high')
+        response = {
+            "assessments": flagged,
+            "summary": summary_text,
+            "high_risk_count": high_count,
+        }
 
-        return response
+        _log_scan(db, text, len(flagged), high_count, llm_used)
 
+        return ORJSONResponse(response)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Misinformation scan failed", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to analyze content")
 
 
+@router.post("/misinformation-scan/stream")
+@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
+async def scan_misinformation_stream(
+    request: Request,
+    payload: MisinformationScanRequest,
+    remote_address: str = Depends(get_remote_address),
+):
+    """Stream scan results as Server-Sent Events.
+
+    Sentences are scored off the event loop in batches of
+    ``STREAM_BATCH_SENTENCES`` and each batch's ``claim`` events are sent as
+    soon as it is scored. Then come ``summary`` events carrying LLM token
+    deltas (or a single local summary when the classifier is confident), and
+    a final ``high_risk_count`` event once the scan has been logged.
+    """
+    text = await _resolve_text(payload)
+    logger.info(
+        "Misinformation stream request",
+        text_length=len(text),
+        url=payload.url,
+        client_ip=remote_address,
+    )
+
+    async def event_stream() -> AsyncIterator[bytes]:
+        sentences = await asyncio.to_thread(split_sentences, text)
+        flagged: List[dict] = []
+        uncertain = False
+        for start in range(0, len(sentences), STREAM_BATCH_SENTENCES):
+            batch, batch_uncertain = await asyncio.to_thread(
+                _assess_sentences, sentences[start:start + STREAM_BATCH_SENTENCES]
+            )
+            uncertain = uncertain or batch_uncertain
+            flagged.extend(batch)
+            for assessment in batch:
+                yield _sse("claim", assessment)
+        llm_used = _wants_llm(uncertain)
+        claims_count = len(flagged)
+        high_count = sum(1 for c in flagged if c["risk"] == "high")
+        if not claims_count:
+            claims_count = 1
+            yield _sse("claim", _general_assessment())
+
+        if llm_used:
+            sent = 0
+            chunks = llm_router.stream_claims(text)
+            try:
+                # stream_claims blocks between provider chunks, so it is iterated in a worker thread
+                async for delta in iterate_in_threadpool(chunks):
+                    delta = delta[: SUMMARY_MAX_CHARS - sent]
+                    if not delta:
+                        break
+                    sent += len(delta)
+                    yield _sse("summary", {"delta": delta})
+            except Exception as e:
+                logger.warning("LLM streaming failed", error=str(e))
+            finally:
+                try:
+                    chunks.close()  # cancels the provider streams still running
+                except ValueError:
+                    pass  # cancelled mid-chunk: still executing in its thread, closed when collected
+        else:
+            yield _sse("summary", {"delta": _local_summary(len(sentences), flagged)})
+
+        await asyncio.to_thread(_log_scan_in_session, text, claims_count, high_count, llm_used)
+        yield _sse("high_risk_count", {"high_risk_count": high_count})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,115 @@
+import datetime as dt
+from collections import defaultdict
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+from slowapi.util import get_remote_address
+from slowapi import Limiter
+import structlog
+
+from ..deps import get_read_db
+from .. import models
+from ..config import settings
+from ..rollups import hour_bucket
+
+logger = structlog.get_logger()
+limiter = Limiter(key_func=get_remote_address)
+
+router = APIRouter()
+
+
+class StatsBucket(BaseModel):
+    bucket_start: str
+    counts: Dict[str, int]
+
+
+class SymptomCount(BaseModel):
+    name: str
+    count: int
+
+
+class StatsResponse(BaseModel):
+    start: str
+    end: str
+    bucket: str
+    totals: Dict[str, int]
+    series: List[StatsBucket]
+    feedback: Dict[str, Dict[str, int]]
+    top_symptoms: List[SymptomCount]
+
+
+def _bucket_key(ts: dt.datetime, bucket: str) -> dt.datetime:
+    ts = hour_bucket(ts)
+    return ts.replace(hour=0) if bucket == "day" else ts
+
+
+@router.get("/stats", response_model=StatsResponse)
+@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
+async def get_stats(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    hours: int = Query(24, ge=1, le=24 * 90, description="Time range ending now, in hours"),
+    bucket: str = Query("hour", pattern="^(hour|day)$"),
+    top: int = Query(10, ge=1, le=50),
+):
+    """Dashboard activity counts served from the hourly rollup tables.
+
+    Cost depends on the time range only, not on the size of ``user_logs``.
+    """
+    try:
+        end = hour_bucket()
+        start = end - dt.timedelta(hours=hours - 1)
+
+        type_rows = db.execute(
+            select(models.LogHourlyRollup.bucket_start, models.LogHourlyRollup.type, models.LogHourlyRollup.count)
+            .where(models.LogHourlyRollup.bucket_start >= start)
+        ).all()
+        totals: Dict[str, int] = defaultdict(int)
+        series: Dict[dt.datetime, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for bucket_start, log_type, count in type_rows:
+            totals[log_type] += count
+            series[_bucket_key(bucket_start, bucket)][log_type] += count
+
+        feedback_rows = db.execute(
+            select(
+                models.FeedbackHourlyRollup.context,
+                models.FeedbackHourlyRollup.verdict,
+                func.sum(models.FeedbackHourlyRollup.count),
+            )
+            .where(models.FeedbackHourlyRollup.bucket_start >= start)
+            .group_by(models.FeedbackHourlyRollup.context, models.FeedbackHourlyRollup.verdict)
+        ).all()
+        feedback: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for context, verdict, count in feedback_rows:
+            feedback[context][verdict] = int(count)
+
+        total = func.sum(models.SymptomHourlyRollup.count).label("total")
+        symptom_rows = db.execute(
+            select(models.SymptomHourlyRollup.name, total)
+            .where(models.SymptomHourlyRollup.bucket_start >= start)
+            .group_by(models.SymptomHourlyRollup.name)
+            .order_by(desc(total))
+            .limit(top)
+        ).all()
+
+        payload = {
+            "start": start.isoformat(),
+            "end": (end + dt.timedelta(hours=1)).isoformat(),
+            "bucket": bucket,
+            "totals": dict(totals),
+            "series": [
+                {"bucket_start": key.isoformat(), "counts": dict(series[key])}
+                for key in sorted(series)
+            ],
+            "feedback": dict(feedback),
+            "top_symptoms": [{"name": name, "count": int(count)} for name, count in symptom_rows],
+        }
+        logger.info("Fetched stats", hours=hours, bucket=bucket, buckets=len(series))
+        return ORJSONResponse(payload)
+    except Exception as e:
+        logger.error("Failed to fetch stats", error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to fetch stats")
@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from slowapi.util import get_remote_address
 from slowapi import Limiter
+import asyncio
 import structlog
 
 from ..deps import get_db
-from .. import models
+from ..rollups import record_log, symptom_summary
 from ..config import settings
 from ..nlp import SymptomExtractor
 from ..cache import CacheClient
+from ..rules import NO_SYMPTOMS_CAUTION, rule_engine
 
 logger = structlog.get_logger()
 limiter = Limiter(key_func=get_remote_address)
@@ -42,7 +45,8 @@ cache = CacheClient()
 @router.post("/symptom-check", response_model=SymptomCheckResponse)
 @limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def symptom_check(
-    request: SymptomCheckRequest, 
+    request: Request,
+    payload: SymptomCheckRequest,
     db: Session = Depends(get_db),
     remote_address: str = Depends(get_remote_address),
     prefer_model: bool = True,
@@ -51,62 +55,46 @@ async def symptom_check(
     try:
         logger.info(
             "Symptom check request",
-            text_length=len(request.text),
-            age=request.age,
-            sex=request.sex,
+            text_length=len(payload.text),
+            age=payload.age,
+            sex=payload.sex,
             client_ip=remote_address,
         )
 
-        # Cache key
-        cache_key = f"symptom_extract:v1:{int(prefer_model)}:{hash(request.text)}"
-        cached = cache.get_json(cache_key)
+        # Cache key names the backend without loading it; results are stored under the
+        # backend that produced them, which is hf (or heuristic) after a failed load
+        def cache_key() -> str:
+            return f"symptom_extract:v2:{extractor.current_backend(prefer_model)}:{hash(payload.text)}"
+
+        cached = cache.get_json(cache_key())
         if cached and isinstance(cached.get("results"), list):
             raw = cached["results"]
         else:
-            # Extract via HF NER + heuristics
-            raw = extractor.extract_symptoms(request.text, prefer_model=prefer_model)
-            cache.set_json(cache_key, {"results": raw}, ttl_seconds=3600)
-
-        extracted = [SymptomSuggestion(name=r["name"], confidence=r["confidence"]) for r in raw][:10]
-
-        # Indian-context suggestions
-        known_actions = {
-            "fever": ["Monitor temperature", "Hydrate well", "Paracetamol as per dosage if needed"],
-            "cough": ["Avoid irritants", "Warm fluids", "Consult local physician if persistent"],
-            "headache": ["Rest", "Hydration", "Paracetamol if appropriate"],
-            "chest pain": ["Seek urgent care at nearest hospital (112/108) if severe"]
-        }
+            # Extract via HF NER + heuristics; the first call may load the model
+            raw = await asyncio.to_thread(extractor.extract_symptoms, payload.text, prefer_model)
+            cache.set_json(cache_key(), {"results": raw}, ttl_seconds=3600)
 
-        suggested_actions: List[str] = []
-        caution_flags: List[str] = []
+        # Plain dicts: the extractor output is already well-formed, so skip
+        # per-item model construction and response re-validation.
+        extracted = [{"name": r["name"], "confidence": float(r["confidence"])} for r in raw[:10]]
 
-        lower_text = request.text.lower()
-        if not extracted:
-            caution_flags.append("No clear symptoms extracted. Provide more detail or consult a medical professional.")
-        for s in extracted:
-            if s.name in known_actions:
-                suggested_actions.extend(known_actions[s.name])
-            if s.name in {"chest pain", "shortness of breath"}:
-                caution_flags.append("Potential emergency; Dial 112/108 or visit a nearby hospital immediately if severe.")
-
-        # Deduplicate
-        seen = set()
-        unique_actions: List[str] = []
-        for a in suggested_actions:
-            if a not in seen:
-                seen.add(a)
-                unique_actions.append(a)
-
-        response = SymptomCheckResponse(
-            extracted_symptoms=extracted,
-            suggested_actions=unique_actions,
-            caution_flags=caution_flags,
+        # Indian-context suggestions from the rule table
+        unique_actions, caution_flags = rule_engine.evaluate(
+            [s["name"] for s in extracted], age=payload.age, sex=payload.sex
         )
+        if not extracted:
+            caution_flags.insert(0, NO_SYMPTOMS_CAUTION)
+
+        response = {
+            "extracted_symptoms": extracted,
+            "suggested_actions": unique_actions,
+            "caution_flags": caution_flags,
+        }
 
         # Persist anonymized log
         try:
-            summary = f"extracted={','.join([s.name for s in extracted])}; actions={len(unique_actions)}; cautions={len(caution_flags)}"
-            db.add(models.UserLog(type="symptom_check", input_text=request.text[:5000], result_summary=summary))
+            summary = symptom_summary([s["name"] for s in extracted], len(unique_actions), len(caution_flags))
+            record_log(db, "symptom_check", payload.text[:5000], summary)
             db.commit()
             logger.info(
                 "Symptom check completed",
@@ -118,7 +106,7 @@ async def symptom_check(
             db.rollback()
             logger.error("Failed to log symptom check", error=str(e))
 
-        return response
+        return ORJSONResponse(response)
 
     except Exception as e:
         logger.error("Symptom check failed", error=str(e), exc_info=True)
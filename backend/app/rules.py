@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "data", "symptom_rules.json")
+
+NO_SYMPTOMS_CAUTION = "No clear symptoms extracted. Provide more detail or consult a medical professional."
+
+
+def normalize_symptom(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Suggested actions and caution flags for one symptom, with optional patient predicates.
+
+    Rule file entries look like::
+
+        {"symptom": "fever", "actions": ["..."], "cautions": ["..."],
+         "when": {"min_age": 0, "max_age": 5, "sex": ["female"]}}
+    """
+
+    actions: Tuple[str, ...] = ()
+    cautions: Tuple[str, ...] = ()
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    sexes: Optional[FrozenSet[str]] = None
+
+    def applies(self, age: Optional[int], sex: Optional[str]) -> bool:
+        if self.min_age is not None and (age is None or age < self.min_age):
+            return False
+        if self.max_age is not None and (age is None or age > self.max_age):
+            return False
+        if self.sexes is not None and (sex is None or sex.lower() not in self.sexes):
+            return False
+        return True
+
+
+class RuleSet:
+    """Immutable rules indexed by normalized symptom name."""
+
+    def __init__(self, index: Dict[str, Tuple[Rule, ...]], version: str = "") -> None:
+        self.index = index
+        self.version = version
+
+    @classmethod
+    def compile(cls, data: dict) -> "RuleSet":
+        grouped: Dict[str, List[Rule]] = {}
+        for i, entry in enumerate(data.get("rules", [])):
+            symptom = normalize_symptom(entry.get("symptom") or "")
+            if not symptom:
+                raise ValueError(f"rule {i} has no symptom")
+            when = entry.get("when") or {}
+            sexes = when.get("sex")
+            if isinstance(sexes, str):
+                sexes = [sexes]
+            grouped.setdefault(symptom, []).append(Rule(
+                actions=tuple(entry.get("actions") or ()),
+                cautions=tuple(entry.get("cautions") or ()),
+                min_age=when.get("min_age"),
+                max_age=when.get("max_age"),
+                sexes=frozenset(s.lower() for s in sexes) if sexes else None,
+            ))
+        return cls({k: tuple(v) for k, v in grouped.items()}, version=str(data.get("version", "")))
+
+    def evaluate(
+        self, symptoms: Iterable[str], age: Optional[int] = None, sex: Optional[str] = None
+    ) -> Tuple[List[str], List[str]]:
+        """Return ``(actions, cautions)`` for the matched symptoms, deduplicated in order."""
+        actions: Dict[str, None] = {}
+        cautions: Dict[str, None] = {}
+        for name in symptoms:
+            for rule in self.index.get(normalize_symptom(name), ()):
+                if rule.applies(age, sex):
+                    actions.update(dict.fromkeys(rule.actions))
+                    cautions.update(dict.fromkeys(rule.cautions))
+        return list(actions), list(cautions)
+
+
+class RuleEngine:
+    """Holds the compiled rule set and hot-reloads it when the rule file changes.
+
+    The file's mtime is checked at most every ``reload_seconds``; a reload
+    compiles a new ``RuleSet`` and swaps the reference, so in-flight
+    evaluations keep using the set they started with. A broken file is logged
+    and the previous rules stay active.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_seconds: float = 5.0) -> None:
+        self.path = path or DEFAULT_RULES_PATH
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+        self._ruleset = RuleSet({})
+        self.reload()
+
+    @property
+    def ruleset(self) -> RuleSet:
+        return self._ruleset
+
+    def reload(self) -> bool:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+                if mtime_ns == self._mtime_ns:
+                    return False
+                with open(self.path, "r", encoding="utf-8") as fh:
+                    ruleset = RuleSet.compile(json.load(fh))
+            except Exception as e:
+                logger.error("Failed to load symptom rules; keeping previous rules", path=self.path, error=str(e))
+                return False
+            self._ruleset = ruleset
+            self._mtime_ns = mtime_ns
+            logger.info("Symptom rules loaded", path=self.path, version=ruleset.version, symptoms=len(ruleset.index))
+            return True
+
+    def evaluate(
+        self, symptoms: Iterable[str], age: Optional[int] = None, sex: Optional[str] = None
+    ) -> Tuple[List[str], List[str]]:
+        if self.reload_seconds and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.reload()
+        return self._ruleset.evaluate(symptoms, age=age, sex=sex)
+
+
+rule_engine = RuleEngine(settings.symptom_rules_path, settings.symptom_rules_reload_seconds)
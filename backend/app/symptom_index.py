@@ -0,0 +1,225 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+DEFAULT_VOCAB_PATH = os.path.join(os.path.dirname(__file__), "data", "symptom_vocab.json")
+
+MAGIC = b"MLSYMIX1"
+HEADER = struct.Struct("<8sIHBBI")  # magic, meta length, key width, max distance, prefix length, record count
+ID = struct.Struct("<I")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().replace("-", " ").split())
+
+
+def _deletes(term: str, max_distance: int) -> Set[str]:
+    """All strings reachable from ``term`` by deleting up to ``max_distance`` characters."""
+    out = {term}
+    n = len(term)
+    for d in range(1, min(max_distance, n) + 1):
+        for drop in combinations(range(n), d):
+            dropped = set(drop)
+            out.add("".join(c for i, c in enumerate(term) if i not in dropped))
+    return out
+
+
+def _osa_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or ``max_distance + 1`` once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def allowed_distance(term: str, max_distance: int) -> int:
+    # Short terms tolerate no typos ("rash" must not match "cash")
+    if len(term) <= 4:
+        return 0
+    if len(term) <= 8:
+        return min(1, max_distance)
+    return max_distance
+
+
+class SymptomIndex:
+    """Maps raw symptom spans to canonical vocabulary names.
+
+    Exact variants (and their space-free forms, so ``"head ache"`` finds
+    ``"headache"``) live in a dict. Typos go through a SymSpell-style index:
+    the deletes of every variant's prefix are precomputed into a sorted table
+    of fixed-width ``(delete, variant id)`` records stored in a file and
+    memory-mapped read-only, so all workers share the same pages. A lookup
+    binary-searches the deletes of the query prefix and verifies candidates
+    with a bounded edit distance.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len, self.key_width, self.max_distance, self.prefix_length, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a symptom index")
+        meta = json.loads(self._mm[HEADER.size:HEADER.size + meta_len])
+        self.source_hash: str = meta["source_hash"]
+        self.variants: List[str] = meta["variants"]
+        self.canonical: List[str] = meta["canonical"]
+        self.exact: Dict[str, str] = {}
+        for variant, canonical in zip(self.variants, self.canonical):
+            self.exact[variant] = canonical
+            self.exact.setdefault(variant.replace(" ", ""), canonical)
+        self._records_at = HEADER.size + meta_len
+        self._record_size = self.key_width + ID.size
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+
+    @classmethod
+    def build(cls, vocab: Dict[str, List[str]], path: str, max_distance: int = 2, prefix_length: int = 7,
+              source_hash: str = "") -> "SymptomIndex":
+        variants: List[str] = []
+        canonical: List[str] = []
+        for name, synonyms in vocab.items():
+            canon = normalize(name)
+            for variant in dict.fromkeys([canon] + [normalize(s) for s in synonyms]):
+                variants.append(variant)
+                canonical.append(canon)
+
+        records: Set[Tuple[bytes, int]] = set()
+        for vid, variant in enumerate(variants):
+            for key in _deletes(variant[:prefix_length], max_distance):
+                records.add((key.encode(), vid))
+        key_width = max((len(k) for k, _ in records), default=1)
+        meta = json.dumps({"source_hash": source_hash, "variants": variants, "canonical": canonical}).encode()
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".symidx-")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(HEADER.pack(MAGIC, len(meta), key_width, max_distance, prefix_length, len(records)))
+            fh.write(meta)
+            for key, vid in sorted(records):
+                fh.write(key.ljust(key_width, b"\0"))
+                fh.write(ID.pack(vid))
+        os.replace(tmp, path)  # atomic, so concurrent workers never map a partial file
+        logger.info("Symptom index built", path=path, variants=len(variants), records=len(records))
+        return cls(path)
+
+    def _key_at(self, i: int) -> bytes:
+        off = self._records_at + i * self._record_size
+        return self._mm[off:off + self.key_width]
+
+    def _ids_for(self, key: str) -> List[int]:
+        raw = key.encode()
+        if len(raw) > self.key_width:
+            return []
+        target = raw.ljust(self.key_width, b"\0")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        ids = []
+        while lo < self.count and self._key_at(lo) == target:
+            off = self._records_at + lo * self._record_size + self.key_width
+            ids.append(ID.unpack_from(self._mm, off)[0])
+            lo += 1
+        return ids
+
+    def _lookup(self, name: str) -> Optional[str]:
+        term = normalize(name)
+        if not term:
+            return None
+        hit = self.exact.get(term) or self.exact.get(term.replace(" ", ""))
+        if hit is not None:
+            return hit
+        max_distance = allowed_distance(term, self.max_distance)
+        if not max_distance:
+            return None
+
+        best: Optional[Tuple[int, int, str]] = None
+        seen: Set[int] = set()
+        for key in _deletes(term[:self.prefix_length], max_distance):
+            for vid in self._ids_for(key):
+                if vid in seen:
+                    continue
+                seen.add(vid)
+                variant = self.variants[vid]
+                distance = _osa_distance(term, variant, max_distance)
+                if distance <= max_distance:
+                    candidate = (distance, len(variant), variant)
+                    if best is None or candidate < best:
+                        best = candidate
+        if best is None:
+            return None
+        return self.exact[best[2]]
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def _source_hash(vocab_bytes: bytes, max_distance: int, prefix_length: int) -> str:
+    return hashlib.sha256(vocab_bytes + f":{max_distance}:{prefix_length}".encode()).hexdigest()[:16]
+
+
+def load_or_build(vocab_path: Optional[str] = None, index_path: Optional[str] = None,
+                  max_distance: int = 2, prefix_length: int = 7) -> SymptomIndex:
+    """Map the index file for ``vocab_path``, building it first if missing or stale."""
+    vocab_path = vocab_path or DEFAULT_VOCAB_PATH
+    with open(vocab_path, "rb") as fh:
+        raw = fh.read()
+    digest = _source_hash(raw, max_distance, prefix_length)
+    index_path = index_path or os.path.join(tempfile.gettempdir(), f"medlens-symptom-index-{digest}.bin")
+    if os.path.exists(index_path):
+        try:
+            index = SymptomIndex(index_path)
+            if index.source_hash == digest:
+                return index
+            index.close()
+        except Exception as e:
+            logger.warning("Symptom index unreadable; rebuilding", path=index_path, error=str(e))
+    vocab = json.loads(raw)["symptoms"]
+    return SymptomIndex.build(vocab, index_path, max_distance, prefix_length, source_hash=digest)
+
+
+_index: Optional[SymptomIndex] = None
+_index_failed = False
+_index_lock = threading.Lock()
+
+
+def get_symptom_index() -> Optional[SymptomIndex]:
+    """Process-wide index, loaded on first use; ``None`` if it cannot be built."""
+    global _index, _index_failed
+    if _index is None and not _index_failed:
+        with _index_lock:
+            if _index is None and not _index_failed:
+                try:
+                    _index = load_or_build(settings.symptom_vocab_path, settings.symptom_index_path)
+                except Exception as e:
+                    _index_failed = True
+                    logger.error("Failed to load symptom index; names stay unnormalized", error=str(e))
+    return _index
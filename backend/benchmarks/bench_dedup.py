@@ -0,0 +1,96 @@
+"""Storage saved by content-deduplicated log texts on a realistic corpus.
+
+Loads the same generated corpus (see ``stubs.generate_log_corpus``) into two
+fresh SQLite databases, one with texts inline in ``user_logs`` and one through
+``app.logstore``, and reports logical text bytes, stored bytes and the
+resulting database file sizes. Pass ``--codec zstd`` to compare codecs (needs
+the ``zstandard`` package).
+
+    cd backend && python -m benchmarks.bench_dedup --rows 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def _load(path: str, rows: int, seed: int, inline: bool, chunk: int = 10_000) -> float:
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app import models
+    from app.db import Base
+    from app.logstore import store_contents
+
+    from .stubs import generate_log_corpus
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    corpus = list(generate_log_corpus(rows, seed=seed))
+    start = time.perf_counter()
+    with Session(engine) as db:
+        for i in range(0, len(corpus), chunk):
+            entries = corpus[i:i + chunk]
+            if inline:
+                values = [
+                    {"type": t, "input_text": text, "result_summary": summary, "created_at": created_at}
+                    for t, text, summary, created_at in entries
+                ]
+            else:
+                ids = store_contents(db, [text for _, text, _, _ in entries])
+                values = [
+                    {"type": t, "content_id": ids[text], "result_summary": summary, "created_at": created_at}
+                    for t, text, summary, created_at in entries
+                ]
+            db.execute(insert(models.UserLog), values)
+            db.commit()
+    elapsed = time.perf_counter() - start
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--codec", choices=["zlib", "zstd"], default="zlib")
+    args = parser.parse_args()
+
+    os.environ["LOG_CONTENT_CODEC"] = args.codec
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # app.db's engine is unused; databases are per run
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.logstore import report
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inline_db = os.path.join(tmp, "inline.sqlite3")
+        dedup_db = os.path.join(tmp, "dedup.sqlite3")
+        inline_s = _load(inline_db, args.rows, args.seed, inline=True)
+        dedup_s = _load(dedup_db, args.rows, args.seed, inline=False)
+        with Session(create_engine(f"sqlite:///{dedup_db}")) as db:
+            stats = report(db)
+        inline_size = os.path.getsize(inline_db)
+        dedup_size = os.path.getsize(dedup_db)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "codec": args.codec,
+        "contents": stats["contents"],
+        "contents_by_encoding": stats["contents_by_encoding"],
+        "logical_text_mb": round(stats["logical_bytes"] / 1e6, 2),
+        "stored_text_mb": round(stats["stored_bytes"] / 1e6, 2),
+        "text_saved_ratio": stats["saved_ratio"],
+        "inline_db_mb": round(inline_size / 1e6, 2),
+        "dedup_db_mb": round(dedup_size / 1e6, 2),
+        "db_saved_ratio": round(1 - dedup_size / inline_size, 4),
+        "inline_load_s": round(inline_s, 2),
+        "dedup_load_s": round(dedup_s, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Latency, throughput, memory and parity of the NER inference backends.
+
+Each backend in ``app.ner_backends`` is loaded in its own process (so peak RSS
+is per backend) and measured on the reference texts in
+``app/data/ner_reference.txt``: load time, single-text p50/p95 latency,
+batched throughput and peak RSS. Entities are compared with the fp32 ``hf``
+backend as in ``python -m app.ner_backends parity``.
+
+Without ``--model`` a small randomly initialised BERT token classifier with
+the production label set is generated locally, so the benchmark needs no
+network; its absolute numbers are much lower than the real model's, but the
+relative cost of the backends carries over. Pass ``--model`` (a hub name or
+local directory) to measure the real one.
+
+    cd backend && python -m benchmarks.bench_ner
+    python -m benchmarks.bench_ner --backends hf onnx --model d4data/biomedical-ner-all --texts 2000
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Label set of d4data/biomedical-ner-all that the extractor keys on, plus a few neighbours
+LABELS = [
+    "O",
+    "B-Sign_symptom", "I-Sign_symptom",
+    "B-Disease_disorder", "I-Disease_disorder",
+    "B-Biological_structure", "I-Biological_structure",
+    "B-Medication", "I-Medication",
+    "B-Duration", "I-Duration",
+    "B-Severity", "I-Severity",
+]
+
+
+def build_tiny_model(path: str, texts: List[str], seed: int = 42) -> str:
+    """Save a small random BERT token classifier and a WordPiece tokenizer for ``texts`` under ``path``."""
+    import torch
+    from transformers import BertConfig, BertForTokenClassification, BertTokenizerFast
+
+    torch.manual_seed(seed)
+    words = sorted({w for text in texts for w in re.findall(r"\w+", text.lower())})
+    chars = sorted({c for text in texts for c in text.lower() if not c.isspace()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + [f"##{c}" for c in chars]
+    vocab += [w for w in words if w not in vocab]
+    os.makedirs(path, exist_ok=True)
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(vocab) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=vocab_file, do_lower_case=True)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=128,
+        num_hidden_layers=4,
+        num_attention_heads=4,
+        intermediate_size=512,
+        max_position_embeddings=512,
+        num_labels=len(LABELS),
+        id2label=dict(enumerate(LABELS)),
+        label2id={label: i for i, label in enumerate(LABELS)},
+    )
+    BertForTokenClassification(config).eval().save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def _worker(args: argparse.Namespace) -> None:
+    from app.ner_backends import load_pipeline, load_reference, run_pipeline
+
+    from .harness import peak_rss_mb
+
+    texts = load_reference(args.reference)
+    export_s = None
+    if args.backend == "onnx":
+        # The app never exports on load; do the deploy-time step here and time it separately
+        from app.ner_backends import export_onnx
+
+        start = time.perf_counter()
+        export_onnx(args.model)
+        export_s = round(time.perf_counter() - start, 2)
+    start = time.perf_counter()
+    pipe = load_pipeline(args.model, args.backend)
+    load_s = time.perf_counter() - start
+    rss_loaded = peak_rss_mb()
+
+    preds = run_pipeline(pipe, texts, args.batch_size)  # also warms up
+    latencies = []
+    for text in texts:
+        t0 = time.perf_counter()
+        pipe(text)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    corpus = (texts * (args.texts // len(texts) + 1))[:args.texts]
+    t0 = time.perf_counter()
+    run_pipeline(pipe, corpus, args.batch_size)
+    batch_s = time.perf_counter() - t0
+
+    # Pipelines return numpy floats; keep only what the parity check reads
+    preds = [
+        [{"entity_group": p.get("entity_group"), "start": p.get("start"), "end": p.get("end"), "score": float(p["score"])} for p in out]
+        for out in preds
+    ]
+    print(json.dumps({
+        "export_s": export_s,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "throughput_texts_per_s": round(len(corpus) / batch_s, 1),
+        "rss_after_load_mb": round(rss_loaded, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "preds": preds,
+    }))
+
+
+def _run_backend(backend: str, args: argparse.Namespace, model: str, env: Dict[str, str]) -> Dict:
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_ner", "--worker",
+        "--backend", backend, "--model", model, "--reference", args.reference,
+        "--texts", str(args.texts), "--batch-size", str(args.batch_size),
+    ]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=None, help="default: all of app.ner_backends.BACKENDS")
+    parser.add_argument("--model", default=None, help="hub name or directory; default: a generated tiny model")
+    parser.add_argument("--reference", default=None, help="text file, one input per line")
+    parser.add_argument("--texts", type=int, default=1000, help="texts in the throughput run")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=None, help="NER_NUM_THREADS for every backend")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", default="hf", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")  # app.config needs one; nothing connects
+    from app.ner_backends import BACKENDS, REFERENCE_PATH, compare, load_reference
+
+    args.reference = args.reference or REFERENCE_PATH
+    if args.worker:
+        _worker(args)
+        return
+
+    backends = args.backends or list(BACKENDS)
+    if "hf" not in backends:
+        backends.insert(0, "hf")  # the parity baseline
+    with tempfile.TemporaryDirectory() as tmp:
+        model = args.model or build_tiny_model(os.path.join(tmp, "tiny-ner"), load_reference(args.reference), args.seed)
+        env = {**os.environ, "NER_ONNX_DIR": os.path.join(tmp, "onnx")}
+        if args.threads:
+            env["NER_NUM_THREADS"] = str(args.threads)
+        results = {backend: _run_backend(backend, args, model, env) for backend in backends}
+
+    baseline = results["hf"].get("preds")
+    for backend, result in results.items():
+        preds = result.pop("preds", None)
+        if backend != "hf" and baseline is not None and preds is not None:
+            result["parity"] = compare(baseline, preds)
+
+    print(json.dumps({
+        "model": args.model or "generated",
+        "texts": args.texts,
+        "batch_size": args.batch_size,
+        "threads": args.threads,
+        "backends": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Serialization micro-benchmark for the hot response paths.
+
+Compares the previous path (build a Pydantic model per item, let FastAPI
+validate against ``response_model`` and encode with the stdlib encoder)
+against the current one (plain dicts encoded once by orjson).
+
+    cd backend && python -m benchmarks.bench_serialization --items 100
+"""
+import argparse
+import datetime as dt
+import json
+import time
+from typing import Callable, List, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+
+class _OrmRow:
+    """Stands in for a ``UserLog`` ORM entity."""
+
+    def __init__(self, i: int) -> None:
+        self.id = i
+        self.type = "symptom_check"
+        self.input_text = "fever and cough for three days with mild headache " * 4
+        self.result_summary = "extracted=fever,cough,headache; actions=6; cautions=0"
+        self.created_at = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(minutes=i)
+
+
+class _LogItem(BaseModel):
+    id: int
+    type: str
+    input_text: str
+    result_summary: Optional[str]
+    created_at: Optional[dt.datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class _ClaimAssessment(BaseModel):
+    claim: str
+    risk: str
+    rationale: str
+    references: List[str]
+
+
+_REFS = ["https://www.mohfw.gov.in", "https://www.icmr.gov.in", "https://www.nhp.gov.in", "https://www.who.int/india"]
+
+
+def _timeit(fn: Callable[[], bytes], repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = [_OrmRow(i) for i in range(args.items)]
+    tuples = [(r.id, r.type, r.input_text, r.result_summary, r.created_at) for r in rows]
+    logs_adapter = TypeAdapter(List[_LogItem])
+    claims_adapter = TypeAdapter(List[_ClaimAssessment])
+    sentences = [f"This miracle cure works instantly, claim number {i}" for i in range(args.items)]
+
+    def logs_before() -> bytes:
+        items = [_LogItem.model_validate(r) for r in rows]
+        validated = logs_adapter.validate_python(items, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def logs_after() -> bytes:
+        return orjson.dumps([
+            {
+                "id": i,
+                "type": t,
+                "input_text": text,
+                "result_summary": summary,
+                "created_at": created.isoformat() if created else None,
+            }
+            for i, t, text, summary, created in tuples
+        ])
+
+    def claims_before() -> bytes:
+        items = [_ClaimAssessment(claim=s, risk="high", rationale="sensational", references=list(_REFS)) for s in sentences]
+        validated = claims_adapter.validate_python(items, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def claims_after() -> bytes:
+        return orjson.dumps([
+            {"claim": s, "risk": "high", "rationale": "sensational", "references": _REFS} for s in sentences
+        ])
+
+    results = {}
+    for name, before, after in (("logs", logs_before, logs_after), ("claims", claims_before, claims_after)):
+        b = _timeit(before, args.repeat)
+        a = _timeit(after, args.repeat)
+        results[name] = {"items": args.items, "before_us": round(b, 1), "after_us": round(a, 1), "speedup": round(b / a, 2)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
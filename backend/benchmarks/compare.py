@@ -0,0 +1,37 @@
+"""Compare two ``benchmarks.run`` reports scenario by scenario.
+
+    python -m benchmarks.compare base.json head.json
+"""
+import argparse
+import json
+from typing import Dict, Tuple
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "process_to_first_request_p50_ms")
+
+
+def _load(path: str) -> Tuple[Dict[str, dict], str]:
+    with open(path) as fh:
+        report = json.load(fh)
+    return {r["scenario"]: r for r in report["results"]}, report.get("commit", "?")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+
+    base, base_commit = _load(args.base)
+    head, head_commit = _load(args.head)
+    print(f"{'scenario':<28} {'metric':<34} {base_commit:>12} {head_commit:>12} {'change':>9}")
+    for name in [s for s in head if s in base]:
+        for metric in METRICS:
+            if metric not in base[name] or metric not in head[name]:
+                continue
+            b, h = base[name][metric], head[name][metric]
+            change = f"{(h - b) / b * 100:+.1f}%" if b else "n/a"
+            print(f"{name:<28} {metric:<34} {b:>12} {h:>12} {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Boots the app in-process against local stand-ins and drives load through it.
+
+Environment must be configured before ``app`` is imported, because settings,
+engines and cache clients are created at import time; use ``boot_app``.
+"""
+import asyncio
+import os
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from .stubs import FakeCohereServer, FakeOpenAIServer, StubNERPipeline, generate_log_corpus
+
+
+@dataclass
+class BenchConfig:
+    database_url: str = "sqlite:///./benchmarks.sqlite3"
+    replica_url: Optional[str] = None
+    redis: str = "fake"  # fake | none | redis:// URL
+    ner_latency_ms: float = 20.0
+    llm_latency_ms: float = 200.0
+    llm_error_rate: float = 0.0
+    llm_tail_ms: float = 0.0  # slow-tail latency and its probability for the OpenAI fake
+    llm_tail_rate: float = 0.0
+    llm: bool = True
+    cohere: bool = False  # second provider behind the router
+    cohere_latency_ms: float = 300.0
+    cohere_error_rate: float = 0.0
+    llm_hedge: bool = True
+    misinfo_llm_mode: str = "uncertain"  # uncertain | always | never
+    seed: int = 42
+    extra_env: Dict[str, str] = field(default_factory=dict)
+
+
+def _patch_redis(mode: str) -> None:
+    from app import activity as activity_module
+    from app import cache as cache_module
+
+    if mode == "none":
+        cache_module.redis = None
+        activity_module.aioredis = None
+    elif mode == "fake":
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        cache_module.redis = SimpleNamespace(
+            from_url=lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)
+        )
+        activity_module.aioredis = SimpleNamespace(
+            from_url=lambda url, **kwargs: fakeredis.aioredis.FakeRedis(server=server, **kwargs)
+        )
+
+
+def boot_app(config: BenchConfig):
+    """Configure the environment, install stand-ins and return ``(app, llm_servers)``.
+
+    ``llm_servers`` maps provider name to its fake server (empty with ``llm=False``).
+    """
+    os.environ["DATABASE_URL"] = config.database_url
+    if config.replica_url:
+        os.environ["DATABASE_REPLICA_URL"] = config.replica_url
+    if config.redis not in ("fake", "none"):
+        os.environ["REDIS_URL"] = config.redis
+    llm_servers = {}
+    if config.llm:
+        llm_servers["openai"] = FakeOpenAIServer(
+            latency_ms=config.llm_latency_ms,
+            error_rate=config.llm_error_rate,
+            tail_ms=config.llm_tail_ms,
+            tail_rate=config.llm_tail_rate,
+            seed=config.seed,
+        ).start()
+        os.environ["OPENAI_API_KEY"] = "bench"
+        os.environ["OPENAI_BASE_URL"] = llm_servers["openai"].base_url + "/v1"
+        if config.cohere:
+            llm_servers["cohere"] = FakeCohereServer(
+                latency_ms=config.cohere_latency_ms, error_rate=config.cohere_error_rate, seed=config.seed + 1
+            ).start()
+            os.environ["COHERE_API_KEY"] = "bench"
+            os.environ["COHERE_BASE_URL"] = llm_servers["cohere"].base_url + "/v1"
+    os.environ["LLM_HEDGE"] = "true" if config.llm_hedge else "false"
+    os.environ["MISINFO_LLM_MODE"] = config.misinfo_llm_mode
+    os.environ.update(config.extra_env)
+
+    _patch_redis(config.redis)
+
+    from app.main import app
+    from app.nlp import SymptomExtractor
+    from app.routes import logs, misinformation, stats, symptoms
+
+    # The stub is installed as the shared pipeline so _ensure_pipeline never loads HF
+    SymptomExtractor._pipeline = StubNERPipeline(latency_ms=config.ner_latency_ms)
+    SymptomExtractor.loaded_backend = "stub"
+    for module in (logs, misinformation, stats, symptoms):
+        module.limiter.enabled = False
+
+    # Request logging would dominate the measurements
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    return app, llm_servers
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def summarize(latencies: List[float], wall_s: float, errors: int) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_s, 2) if wall_s else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+RequestFn = Callable[[object, int], Awaitable[object]]
+
+
+async def drive(app, make_request: RequestFn, requests: int, concurrency: int) -> Dict[str, float]:
+    """Issue ``requests`` calls through an in-process ASGI client and summarize latencies."""
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                resp = await make_request(client, i)
+                latencies.append(time.perf_counter() - start)
+                if getattr(resp, "status_code", 200) >= 400:
+                    errors += 1
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - wall_start
+    return summarize(latencies, wall, errors)
+
+
+def seed_logs(rows: int, seed: int = 42, chunk: int = 10_000) -> None:
+    """Bulk-insert ``rows`` synthetic ``user_logs`` rows (mostly symptom checks)."""
+    from sqlalchemy import func, insert, select
+
+    from app import models
+    from app.db import Base, SessionLocal, engine
+    from app.logstore import store_contents
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(models.UserLog)).scalar_one()
+    remaining = rows - existing
+    if remaining <= 0:
+        sync_replica()
+        return
+
+    corpus = generate_log_corpus(remaining, seed=seed)
+    while remaining > 0:
+        entries = [next(corpus) for _ in range(min(chunk, remaining))]
+        with SessionLocal() as db:
+            ids = store_contents(db, [text for _, text, _, _ in entries])
+            db.execute(insert(models.UserLog), [
+                {"type": t, "content_id": ids[text], "result_summary": summary, "created_at": created_at}
+                for t, text, summary, created_at in entries
+            ])
+            db.commit()
+        remaining -= len(entries)
+
+    from app.rollups import rebuild_rollups
+
+    with SessionLocal() as db:
+        rebuild_rollups(db)
+    sync_replica()
+
+
+def sync_replica() -> None:
+    """Copy a seeded SQLite primary into the SQLite replica file.
+
+    Stands in for streaming replication when benchmarking read routing with
+    two local SQLite databases; PostgreSQL replicas are left alone. Writes made
+    during a run stay on the primary, like an arbitrarily lagging replica.
+    """
+    import sqlite3
+
+    from app.config import settings
+
+    primary, replica = settings.database_url, settings.database_replica_url
+    if not replica or not primary.startswith("sqlite:///") or not replica.startswith("sqlite:///"):
+        return
+    src_path, dst_path = primary[len("sqlite:///"):], replica[len("sqlite:///"):]
+    if os.path.exists(dst_path) and os.path.getmtime(dst_path) >= os.path.getmtime(src_path):
+        return
+    src, dst = sqlite3.connect(src_path), sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
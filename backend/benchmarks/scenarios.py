@@ -0,0 +1,324 @@
+"""Benchmark scenarios. Each runs in its own process so peak RSS is per scenario.
+
+    python -m benchmarks.scenarios <name> '<json options>'
+
+prints a single JSON object on stdout. ``benchmarks.run`` drives this.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Dict
+
+import httpx
+
+from .harness import BenchConfig, boot_app, drive, percentile, seed_logs
+from .stubs import generate_article, generate_posts
+
+SCENARIOS: Dict[str, Callable[[dict], dict]] = {}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+def _config(opts: dict, **overrides) -> BenchConfig:
+    values = {k: v for k, v in opts.items() if k in BenchConfig.__dataclass_fields__}
+    values.update(overrides)
+    return BenchConfig(**values)
+
+
+def _import_times(stderr: str, top: int = 15) -> list:
+    """Slowest modules imported directly by the child's top-level imports, from ``-X importtime``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line.split(":", 1)[1].split("|")
+        if len(fields) != 3:
+            continue
+        _, cumulative_us, name = fields
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth <= 1:
+            rows.append({"module": name.strip(), "depth": depth, "cumulative_ms": round(int(cumulative_us) / 1000, 1)})
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+@scenario("cold_start")
+def cold_start(opts: dict) -> dict:
+    """Wall time from interpreter launch to the first served request, over fresh processes.
+
+    The child runs the app's lifespan startup like a server worker would, then
+    serves one request. One extra run under ``python -X importtime`` reports
+    the slowest imports.
+    """
+    runs = int(opts.get("runs", 5))
+    child = (
+        "import time; t0 = time.perf_counter()\n"
+        "import asyncio, json\n"
+        "from benchmarks.harness import BenchConfig, boot_app, drive\n"
+        f"cfg = BenchConfig(**{ {k: v for k, v in opts.items() if k in BenchConfig.__dataclass_fields__}!r})\n"
+        "app, _ = boot_app(cfg)\n"
+        "t1 = time.perf_counter()\n"
+        "async def health(c, i):\n"
+        "    return await c.get('/api/health')\n"
+        "async def main():\n"
+        "    async with app.router.lifespan_context(app):\n"
+        "        t2 = time.perf_counter()\n"
+        "        await drive(app, health, 1, 1)\n"
+        "        print(json.dumps({'import_s': t1 - t0, 'startup_s': t2 - t1, 'first_request_s': time.perf_counter() - t0,\n"
+        "                          'first_request_at': time.time()}), flush=True)\n"
+        "asyncio.run(main())\n"
+    )
+    totals, imports, startups, first = [], [], [], []
+    for _ in range(runs):
+        launched = time.time()
+        out = subprocess.run(
+            [sys.executable, "-c", child], capture_output=True, text=True, check=True, cwd=os.getcwd()
+        ).stdout.strip().splitlines()[-1]
+        data = json.loads(out)
+        # Measured to the response, not process exit: warm-up may still be running in the background
+        totals.append(data["first_request_at"] - launched)
+        imports.append(data["import_s"])
+        startups.append(data["startup_s"])
+        first.append(data["first_request_s"])
+    traced = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child], capture_output=True, text=True, check=True, cwd=os.getcwd()
+    )
+    totals.sort(), imports.sort(), startups.sort(), first.sort()
+    return {
+        "runs": runs,
+        "process_to_first_request_p50_ms": round(percentile(totals, 50) * 1000, 1),
+        "process_to_first_request_p95_ms": round(percentile(totals, 95) * 1000, 1),
+        "app_import_p50_ms": round(percentile(imports, 50) * 1000, 1),
+        "lifespan_startup_p50_ms": round(percentile(startups, 50) * 1000, 1),
+        "in_process_first_request_p50_ms": round(percentile(first, 50) * 1000, 1),
+        "slowest_imports": _import_times(traced.stderr),
+    }
+
+
+def _symptom(opts: dict, cached: bool) -> dict:
+    app, _ = boot_app(_config(opts, llm=False))
+    seed_logs(0)
+    requests = int(opts.get("requests", 500))
+
+    async def call(client, i):
+        text = "I have fever, cough and a head ache since yesterday"
+        if not cached:
+            text = f"{text} (case {i})"
+        return await client.post("/api/symptom-check", json={"text": text, "age": 30, "sex": "female"})
+
+    async def run():
+        if cached:
+            await drive(app, call, 1, 1)  # warm the cache entry
+        return await drive(app, call, requests, int(opts.get("concurrency", 8)))
+
+    return asyncio.run(run())
+
+
+@scenario("symptom_uncached")
+def symptom_uncached(opts: dict) -> dict:
+    return _symptom(opts, cached=False)
+
+
+@scenario("symptom_cached")
+def symptom_cached(opts: dict) -> dict:
+    return _symptom(opts, cached=True)
+
+
+@scenario("scan_long_article")
+def scan_long_article(opts: dict) -> dict:
+    app, llm_servers = boot_app(_config(opts))
+    seed_logs(0)
+    article = generate_article(int(opts.get("paragraphs", 60)), seed=int(opts.get("seed", 42)))
+    requests = int(opts.get("requests", 100))
+
+    async def call(client, i):
+        return await client.post("/api/misinformation-scan", json={"text": article})
+
+    result = asyncio.run(drive(app, call, requests, int(opts.get("concurrency", 4))))
+    result["article_chars"] = len(article)
+    result["llm_calls"] = sum(server.requests for server in llm_servers.values())
+    return result
+
+
+@scenario("scan_posts")
+def scan_posts(opts: dict) -> dict:
+    """Short varied posts; ``llm_calls`` shows how often the classifier defers to the LLM."""
+    app, llm_servers = boot_app(_config(opts))
+    seed_logs(0)
+    requests = int(opts.get("requests", 200))
+    posts = generate_posts(requests, seed=int(opts.get("seed", 42)))
+
+    async def call(client, i):
+        return await client.post("/api/misinformation-scan", json={"text": posts[i]})
+
+    result = asyncio.run(drive(app, call, requests, int(opts.get("concurrency", 4))))
+    result["llm_calls"] = sum(server.requests for server in llm_servers.values())
+    return result
+
+
+def _llm_scan(opts: dict, **overrides):
+    """Boot with both fake providers and every scan going to the LLM router."""
+    app, llm_servers = boot_app(_config(opts, cohere=True, misinfo_llm_mode="always", **overrides))
+    seed_logs(0)
+    text = "Garlic water cures dengue overnight. See a doctor if the fever lasts more than three days."
+
+    async def call(client, i):
+        return await client.post("/api/misinformation-scan", json={"text": text})
+
+    return app, llm_servers, call
+
+
+async def _llm_health(app) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return (await client.get("/api/health/llm")).json()["providers"]
+
+
+@scenario("llm_hedging")
+def llm_hedging(opts: dict) -> dict:
+    """OpenAI with a rare slow tail, Cohere as the hedge target; compare with ``--no-llm-hedge``.
+
+    Hedging fires past the provider's own p95, so it only cuts tails rarer than 5%.
+    """
+    app, llm_servers, call = _llm_scan(
+        opts,
+        llm_tail_ms=float(opts.get("llm_tail_ms", 2000.0)),
+        llm_tail_rate=float(opts.get("llm_tail_rate", 0.03)),
+    )
+    requests = int(opts.get("requests", 300))
+
+    async def run():
+        result = await drive(app, call, requests, int(opts.get("concurrency", 8)))
+        result["providers"] = await _llm_health(app)
+        return result
+
+    result = asyncio.run(run())
+    result["provider_requests"] = {name: server.requests for name, server in llm_servers.items()}
+    return result
+
+
+@scenario("llm_outage")
+def llm_outage(opts: dict) -> dict:
+    """OpenAI fails completely in the middle phase; traffic should fail over and the breaker open."""
+    reset_s = float(opts.get("breaker_reset_seconds", 2.0))
+    app, llm_servers, call = _llm_scan(opts, extra_env={"LLM_BREAKER_RESET_SECONDS": str(reset_s)})
+    requests = int(opts.get("requests", 200))
+    concurrency = int(opts.get("concurrency", 8))
+    openai = llm_servers["openai"]
+
+    async def run():
+        phases = {}
+        for phase, error_rate in (("healthy", 0.0), ("openai_down", 1.0), ("recovered", 0.0)):
+            openai.error_rate = error_rate
+            before = {name: server.requests for name, server in llm_servers.items()}
+            result = await drive(app, call, requests, concurrency)
+            result["provider_requests"] = {
+                name: server.requests - before[name] for name, server in llm_servers.items()
+            }
+            result["providers"] = await _llm_health(app)
+            phases[phase] = result
+            if phase == "openai_down":
+                # Let the breaker go half-open so the recovery phase can close it
+                await asyncio.sleep(reset_s)
+        return phases
+
+    return asyncio.run(run())
+
+
+@scenario("logs_paging")
+def logs_paging(opts: dict) -> dict:
+    app, _ = boot_app(_config(opts, llm=False))
+    rows = int(opts.get("rows", 10_000))
+    seed_logs(rows, seed=int(opts.get("seed", 42)))
+    requests = int(opts.get("requests", 500))
+    types = [None, "symptom_check", "misinformation_scan", "feedback"]
+
+    async def call(client, i):
+        params = {"limit": 100}
+        if types[i % len(types)]:
+            params["type"] = types[i % len(types)]
+        return await client.get("/api/logs", params=params)
+
+    result = asyncio.run(drive(app, call, requests, int(opts.get("concurrency", 8))))
+    result["rows"] = rows
+    return result
+
+
+@scenario("patterns")
+def patterns(opts: dict) -> dict:
+    # Redis off so every request recomputes; cached hits are measured by symptom_cached
+    app, _ = boot_app(_config(opts, llm=False, redis="none"))
+    rows = int(opts.get("rows", 10_000))
+    seed_logs(rows, seed=int(opts.get("seed", 42)))
+    requests = int(opts.get("requests", 20))
+
+    async def call(client, i):
+        return await client.get("/api/symptom-patterns", params={"n_clusters": 5, "limit": 1000})
+
+    result = asyncio.run(drive(app, call, requests, int(opts.get("concurrency", 1))))
+    result["rows"] = rows
+    return result
+
+
+@scenario("stats")
+def stats(opts: dict) -> dict:
+    app, _ = boot_app(_config(opts, llm=False))
+    rows = int(opts.get("rows", 10_000))
+    seed_logs(rows, seed=int(opts.get("seed", 42)))
+    requests = int(opts.get("requests", 200))
+    ranges = [("24", "hour"), ("168", "day"), ("720", "day")]
+
+    async def call(client, i):
+        hours, bucket = ranges[i % len(ranges)]
+        return await client.get("/api/stats", params={"hours": hours, "bucket": bucket})
+
+    result = asyncio.run(drive(app, call, requests, int(opts.get("concurrency", 8))))
+    result["rows"] = rows
+    return result
+
+
+@scenario("mixed_read_write")
+def mixed_read_write(opts: dict) -> dict:
+    # Dashboard reads racing request logging; run with --replica-url to move the reads off the primary
+    app, _ = boot_app(_config(opts, llm=False))
+    rows = int(opts.get("rows", 10_000))
+    seed_logs(rows, seed=int(opts.get("seed", 42)))
+    requests = int(opts.get("requests", 400))
+
+    async def call(client, i):
+        if i % 4 == 0:
+            return await client.post("/api/feedback", json={"context": "symptom_check", "verdict": "up"})
+        # One shared client simulates many users, so drop the writers' read-your-writes cookie
+        client.cookies.clear()
+        if i % 4 == 1:
+            return await client.get("/api/stats", params={"hours": 168, "bucket": "day"})
+        return await client.get("/api/logs", params={"limit": 100})
+
+    async def run():
+        result = await drive(app, call, requests, int(opts.get("concurrency", 16)))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            result["reads"] = (await client.get("/api/health/db")).json()["reads"]
+        return result
+
+    result = asyncio.run(run())
+    result["rows"] = rows
+    return result
+
+
+def main() -> None:
+    name = sys.argv[1]
+    opts = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+    result = SCENARIOS[name](opts)
+    sys.stdout.write("\n" + json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
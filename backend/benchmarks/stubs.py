@@ -0,0 +1,443 @@
+"""Local stand-ins for the app's external dependencies.
+
+- ``StubNERPipeline`` replaces the Hugging Face NER pipeline with a
+  vocabulary matcher that sleeps for a configurable latency.
+- ``FakeOpenAIServer`` is an OpenAI-compatible ``/v1/chat/completions``
+  endpoint (streaming and non-streaming) with injectable latency and errors.
+- ``FakeCohereServer`` does the same for Cohere's v1 ``/chat`` endpoint.
+- ``ArticleServer`` serves generated HTML articles with ETag validators.
+- ``generate_log_corpus`` yields realistic ``user_logs`` rows.
+
+Run the fake OpenAI server on its own to exercise the streaming scan endpoint by hand::
+
+    python -m benchmarks.stubs --port 8900
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8900/v1 uvicorn app.main:app
+"""
+import datetime as dt
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Union
+
+DEFAULT_VOCABULARY = (
+    "fever",
+    "cough",
+    "headache",
+    "head ache",
+    "chest pain",
+    "sore throat",
+    "shortness of breath",
+    "breathlessness",
+    "fatigue",
+    "nausea",
+    "vomiting",
+    "diarrhea",
+    "feverish",
+    "dizziness",
+    "rash",
+)
+
+
+class StubNERPipeline:
+    """Callable with the shape of ``transformers.pipeline("ner", aggregation_strategy="simple")``."""
+
+    def __init__(self, latency_ms: float = 20.0, vocabulary: Sequence[str] = DEFAULT_VOCABULARY) -> None:
+        self.latency_s = latency_ms / 1000.0
+        self._pattern = re.compile(
+            r"\b(" + "|".join(re.escape(v) for v in sorted(vocabulary, key=len, reverse=True)) + r")\b",
+            re.IGNORECASE,
+        )
+
+    def _predict(self, text: str) -> List[Dict[str, Union[str, float, int]]]:
+        return [
+            {"entity_group": "Sign_symptom", "word": m.group(0), "score": 0.9, "start": m.start(), "end": m.end()}
+            for m in self._pattern.finditer(text)
+        ]
+
+    def __call__(self, inputs, **kwargs):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if isinstance(inputs, str):
+            return self._predict(inputs)
+        return [self._predict(t) for t in inputs]
+
+
+class _StubServer:
+    """Runs a ``ThreadingHTTPServer`` on an ephemeral localhost port in a daemon thread."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self) -> None:
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._httpd is not None, "server not started"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, port: int = 0) -> "_StubServer":
+        owner = self
+
+        class Handler(self.handler_class):
+            server_owner = owner
+
+            def log_message(self, format, *args):  # silence per-request stderr logging
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the router closed a losing hedged stream
+
+    def _begin(self) -> Optional[dict]:
+        """Read the request, apply injected latency; returns the body, or ``None`` after sending an error."""
+        owner: _FakeLLMServer = self.server_owner
+        length = int(self.headers.get("content-length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with owner._rng_lock:
+            owner.requests += 1
+        time.sleep(owner.delay())
+        if owner.should_fail():
+            with owner._rng_lock:
+                owner.failures += 1
+            payload = json.dumps({"error": {"message": "injected failure", "type": "server_error"}}).encode()
+            self.send_response(500)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return None
+        return body
+
+    def _send_json(self, data: dict) -> None:
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _OpenAIHandler(_FakeLLMHandler):
+    def do_POST(self):
+        owner: FakeOpenAIServer = self.server_owner
+        body = self._begin()
+        if body is None:
+            return
+
+        model = body.get("model", "fake-model")
+        created = int(time.time())
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("content-type", "text/event-stream")
+            self.send_header("cache-control", "no-cache")
+            self.send_header("connection", "close")
+            self.end_headers()
+            for token in owner.tokens:
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                self.wfile.flush()
+                time.sleep(owner.token_latency_s)
+            done = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            self.wfile.write(b"data: " + json.dumps(done).encode() + b"\n\n")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self._send_json({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(owner.tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": len(owner.tokens), "total_tokens": len(owner.tokens) + 1},
+        })
+
+
+class _CohereHandler(_FakeLLMHandler):
+    def do_POST(self):
+        owner: FakeCohereServer = self.server_owner
+        body = self._begin()
+        if body is None:
+            return
+
+        text = "".join(owner.tokens)
+        if body.get("stream"):
+            # Newline-delimited JSON events, as the v1 chat_stream endpoint sends them
+            self.send_response(200)
+            self.send_header("content-type", "application/stream+json")
+            self.send_header("connection", "close")
+            self.end_headers()
+            self.wfile.write(json.dumps({"event_type": "stream-start", "generation_id": "fake"}).encode() + b"\n")
+            for token in owner.tokens:
+                self.wfile.write(json.dumps({"event_type": "text-generation", "text": token}).encode() + b"\n")
+                self.wfile.flush()
+                time.sleep(owner.token_latency_s)
+            end = {
+                "event_type": "stream-end",
+                "finish_reason": "COMPLETE",
+                "response": {"text": text, "generation_id": "fake", "finish_reason": "COMPLETE"},
+            }
+            self.wfile.write(json.dumps(end).encode() + b"\n")
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self._send_json({"text": text, "generation_id": "fake", "response_id": "fake", "finish_reason": "COMPLETE"})
+
+
+class _FakeLLMServer(_StubServer):
+    """Shared latency, slow-tail and error injection for the fake LLM providers.
+
+    Each request sleeps ``latency_ms``, or ``tail_ms`` with probability
+    ``tail_rate``, then fails with probability ``error_rate``. The attributes
+    can be changed while the server runs, e.g. to take a provider down.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        error_rate: float = 0.0,
+        token_latency_ms: float = 5.0,
+        text: str = "These claims are not supported by evidence from WHO or ICMR. Consult a doctor.",
+        seed: int = 0,
+        tail_ms: float = 0.0,
+        tail_rate: float = 0.0,
+    ) -> None:
+        super().__init__()
+        self.latency_s = latency_ms / 1000.0
+        self.tail_s = tail_ms / 1000.0
+        self.tail_rate = tail_rate
+        self.token_latency_s = token_latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.tokens = re.findall(r"\S+\s*", text)
+        self.requests = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._rng_lock:
+            slow = self.tail_rate and self._rng.random() < self.tail_rate
+        return self.tail_s if slow else self.latency_s
+
+    def should_fail(self) -> bool:
+        with self._rng_lock:
+            return self._rng.random() < self.error_rate
+
+
+class FakeOpenAIServer(_FakeLLMServer):
+    """OpenAI-compatible chat completions server; point ``OPENAI_BASE_URL`` at ``base_url + "/v1"``."""
+
+    handler_class = _OpenAIHandler
+
+
+class FakeCohereServer(_FakeLLMServer):
+    """Cohere v1 ``/chat`` server (plain and streamed); point ``COHERE_BASE_URL`` at ``base_url + "/v1"``."""
+
+    handler_class = _CohereHandler
+
+
+def generate_article(n_paragraphs: int = 40, risky_every: int = 7, seed: int = 0) -> str:
+    """Return deterministic article text mixing neutral and sensational sentences."""
+    rng = random.Random(seed)
+    neutral = [
+        "Regular hand washing reduces the spread of respiratory infections",
+        "Doctors recommend staying hydrated during a fever",
+        "Seasonal influenza vaccines are updated every year",
+        "A balanced diet supports recovery after illness",
+        "Persistent cough for more than two weeks should be evaluated",
+    ]
+    risky = [
+        "This miracle cure removes all toxins instantly",
+        "The secret remedy is 100% effective with no side effects",
+        "A detox tea cures diabetes in a week",
+    ]
+    paragraphs = []
+    for i in range(n_paragraphs):
+        sentences = [rng.choice(neutral) for _ in range(4)]
+        if risky_every and i % risky_every == 0:
+            sentences.insert(rng.randrange(len(sentences)), rng.choice(risky))
+        paragraphs.append(". ".join(sentences) + ".")
+    return "\n\n".join(paragraphs)
+
+
+def generate_posts(n: int, seed: int = 0) -> List[str]:
+    """Return ``n`` short social posts composed from templates that are not in the classifier seed set."""
+    rng = random.Random(seed)
+    remedies = ["turmeric paste", "a neem drink", "clove oil", "fermented rice water", "this herbal capsule"]
+    conditions = ["dengue", "typhoid", "migraine", "high cholesterol", "chikungunya", "joint pain"]
+    dubious = [
+        "{r} cures {c} in two days, doctors are stunned",
+        "Stop your {c} medicine, {r} works better",
+        "{r} gives complete protection from {c}",
+        "Hospitals hide that {r} reverses {c}",
+    ]
+    sober = [
+        "Cases of {c} usually rise after the monsoon",
+        "See a doctor if {c} symptoms last more than a few days",
+        "Researchers are testing whether {r} helps with {c}",
+        "The health department published advice on {c} this week",
+    ]
+    filler = ["Please share.", "Forwarded as received.", "Stay safe everyone.", "Read the full thread below."]
+    posts = []
+    for _ in range(n):
+        templates = rng.sample(sober, 2) + ([rng.choice(dubious)] if rng.random() < 0.4 else [])
+        rng.shuffle(templates)
+        sentences = [t.format(r=rng.choice(remedies), c=rng.choice(conditions)) for t in templates]
+        sentences = [s[0].upper() + s[1:] + "." for s in sentences] + [rng.choice(filler)]
+        posts.append(" ".join(sentences))
+    return posts
+
+
+def generate_log_corpus(rows: int, seed: int = 42, articles: int = 50, days: int = 90):
+    """Yield ``(type, input_text, result_summary, created_at)`` tuples shaped like production logs.
+
+    Symptom checks combine a few symptoms with a filler phrase, so common
+    descriptions repeat often. Scans draw from ``articles`` viral articles
+    with a skewed popularity, the way a few shared links dominate real
+    traffic. Feedback carries only its context.
+    """
+    rng = random.Random(seed)
+    now = dt.datetime.now(dt.timezone.utc)
+    vocab = list(DEFAULT_VOCABULARY)
+    fillers = ["since yesterday", "for three days", "on and off", "after travel", "at night", "with mild pain"]
+    types = ["symptom_check"] * 8 + ["misinformation_scan", "feedback"]
+    article_texts = [
+        generate_article(n_paragraphs=5 + i % 30, seed=i)[:5000] for i in range(articles)
+    ]
+    for _ in range(rows):
+        t = rng.choice(types)
+        if t == "symptom_check":
+            words = rng.sample(vocab, rng.randint(1, 3))
+            text = f"I have {' and '.join(words)} {rng.choice(fillers)}"
+            summary = f"extracted={','.join(words)}; actions={rng.randint(0, 6)}; cautions={rng.randint(0, 1)}"
+        elif t == "misinformation_scan":
+            text = article_texts[min(int(rng.paretovariate(1.2)) - 1, articles - 1)]
+            summary = f"claims={rng.randint(1, 5)}; high_risk={rng.randint(0, 3)}"
+        else:
+            text = rng.choice(["symptom_check", "misinformation_scan"])
+            summary = f"context={text}; verdict={rng.choice(['up', 'down', 'neutral'])}; notes="
+        created_at = now - dt.timedelta(seconds=rng.randint(0, days * 86400))
+        yield t, text, summary, created_at
+
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        owner: ArticleServer = self.server_owner
+        owner.requests += 1
+        match = re.fullmatch(r"/article/(\d+)", self.path)
+        if not match:
+            self.send_response(404)
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+        html = owner.render(int(match.group(1)))
+        etag = '"' + hashlib.sha256(html).hexdigest()[:16] + '"'
+        time.sleep(owner.latency_s)
+        if self.headers.get("if-none-match") == etag:
+            owner.not_modified += 1
+            self.send_response(304)
+            self.send_header("etag", etag)
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("content-type", "text/html; charset=utf-8")
+        self.send_header("etag", etag)
+        self.send_header("content-length", str(len(html)))
+        self.end_headers()
+        self.wfile.write(html)
+
+
+class ArticleServer(_StubServer):
+    """Serves ``/article/<seed>`` pages; counts full responses and 304 revalidations."""
+
+    handler_class = _ArticleHandler
+
+    def __init__(self, latency_ms: float = 50.0, n_paragraphs: int = 40) -> None:
+        super().__init__()
+        self.latency_s = latency_ms / 1000.0
+        self.n_paragraphs = n_paragraphs
+        self.requests = 0
+        self.not_modified = 0
+
+    def render(self, seed: int) -> bytes:
+        body = "".join(f"<p>{p}</p>" for p in generate_article(self.n_paragraphs, seed=seed).split("\n\n"))
+        return (
+            "<html><head><title>Article</title><script>var x = 1;</script></head>"
+            f"<body><nav>Home</nav><article><h1>Health news {seed}</h1>{body}</article>"
+            "<footer>Footer</footer></body></html>"
+        ).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--token-latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        latency_ms=args.latency_ms, error_rate=args.error_rate, token_latency_ms=args.token_latency_ms
+    ).start(port=args.port)
+    print(f"Fake OpenAI server on {server.base_url}/v1", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Boots the app once against the benchmark stand-ins (SQLite, fakeredis, stub NER, fake LLMs).
+
+Settings, engines and cache clients are created when ``app`` is imported, so
+the environment is configured here, before any test module imports it.
+"""
+import os
+import tempfile
+
+import pytest
+
+from benchmarks.harness import BenchConfig, boot_app
+
+_TMP = tempfile.mkdtemp(prefix="medlens-tests-")
+
+APP, LLM_SERVERS = boot_app(BenchConfig(
+    database_url=f"sqlite:///{os.path.join(_TMP, 'tests.sqlite3')}",
+    ner_latency_ms=0.0,
+    llm_latency_ms=20.0,
+    cohere=True,
+    cohere_latency_ms=20.0,
+))
+
+from app.db import Base, engine  # noqa: E402
+
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def app():
+    return APP
+
+
+@pytest.fixture
+def llm_servers():
+    return LLM_SERVERS
+
@@ -0,0 +1,150 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app import activity
+from app.config import settings
+
+
+class FakeRedisServer:
+    """Just enough of redis.asyncio for the broker, with a switch to drop connections."""
+
+    def __init__(self) -> None:
+        self.up = True
+        self.published = 0
+        self._pubsubs = []
+
+    def from_url(self, url, **kwargs):
+        return _Client(self)
+
+    def drop(self) -> None:
+        self.up = False
+        for pubsub in self._pubsubs:
+            pubsub.queue.put_nowait(ConnectionError("Connection closed by server."))
+        self._pubsubs.clear()
+
+
+class _Client:
+    def __init__(self, server: FakeRedisServer) -> None:
+        self.server = server
+
+    async def ping(self):
+        if not self.server.up:
+            raise ConnectionError("Error 111 connecting to localhost:6379. Connection refused.")
+        return True
+
+    def pubsub(self, **kwargs):
+        return _PubSub(self.server)
+
+    async def publish(self, channel, payload):
+        if not self.server.up:
+            raise ConnectionError("Connection closed by server.")
+        self.server.published += 1
+        for pubsub in self.server._pubsubs:
+            pubsub.queue.put_nowait({"type": "message", "channel": channel, "data": payload})
+
+    async def aclose(self):
+        pass
+
+
+class _PubSub:
+    def __init__(self, server: FakeRedisServer) -> None:
+        self.server = server
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server._pubsubs.append(self)
+
+    async def listen(self):
+        while True:
+            item = await self.queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def aclose(self):
+        pass
+
+
+async def _until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+async def _next_event(sub) -> dict:
+    return orjson.loads(await asyncio.wait_for(sub.queue.get(), timeout=2.0))
+
+
+def test_feed_survives_a_redis_disconnect(monkeypatch):
+    server = FakeRedisServer()
+    monkeypatch.setattr(activity, "aioredis", server)
+    monkeypatch.setattr(settings, "redis_retry_max_seconds", 0.05)
+
+    async def run():
+        broker = activity.ActivityBroker(url="redis://fake")
+        await broker.start()
+        sub = broker.subscribe()
+        try:
+            await _until(lambda: broker._redis is not None)
+            broker.publish("log", {"id": 1})
+            assert (await _next_event(sub))["data"] == {"id": 1}
+            assert server.published == 1
+
+            # Connection lost: events are delivered in-process instead of vanishing
+            server.drop()
+            await _until(lambda: broker._redis is None)
+            broker.publish("log", {"id": 2})
+            assert (await _next_event(sub))["data"] == {"id": 2}
+            assert server.published == 1
+
+            # Redis back: the reader re-subscribes and publishing goes through it again
+            server.up = True
+            await _until(lambda: broker._redis is not None)
+            broker.publish("log", {"id": 3})
+            assert (await _next_event(sub))["data"] == {"id": 3}
+            assert server.published == 2
+        finally:
+            sub.close()
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_publish_failure_before_the_reader_notices_is_delivered_locally(monkeypatch):
+    server = FakeRedisServer()
+    monkeypatch.setattr(activity, "aioredis", server)
+
+    async def run():
+        broker = activity.ActivityBroker(url="redis://fake")
+        await broker.start()
+        sub = broker.subscribe()
+        try:
+            await _until(lambda: broker._redis is not None)
+            server.up = False  # publish fails, but the subscription has not errored yet
+            broker.publish("log", {"id": 7})
+            assert (await _next_event(sub))["data"] == {"id": 7}
+        finally:
+            sub.close()
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("redis_module", [None])
+def test_without_redis_fanout_is_local(monkeypatch, redis_module):
+    monkeypatch.setattr(activity, "aioredis", redis_module)
+
+    async def run():
+        broker = activity.ActivityBroker()
+        await broker.start()
+        sub = broker.subscribe()
+        broker.publish("log", {"id": 9})
+        assert (await _next_event(sub))["data"] == {"id": 9}
+        assert broker.snapshot()
+        sub.close()
+        await broker.stop()
+
+    asyncio.run(run())
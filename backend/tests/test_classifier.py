@@ -0,0 +1,35 @@
+import pytest
+
+from app.classifier import feedback_label, split_sentences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Drink water. Rest well.", ["Drink water.", "Rest well."]),
+    ("Take vitamin C. It cures colds.", ["Take vitamin C.", "It cures colds."]),
+    ("Hepatitis B. is spread by blood.", ["Hepatitis B. is spread by blood."]),
+    ("Dr. Rao says rest. Then recover.", ["Dr. Rao says rest.", "Then recover."]),
+    ("J. R. Smith wrote it. Nobody agreed.", ["J. R. Smith wrote it.", "Nobody agreed."]),
+    ("U.S. officials agree. Others do not.", ["U.S. officials agree.", "Others do not."]),
+    ("Use herbs, e.g. neem daily. Stop after.", ["Use herbs, e.g. neem daily.", "Stop after."]),
+    ("Take 2.5 mg twice. Done!", ["Take 2.5 mg twice.", "Done!"]),
+    ("Miracle cure\nShare now", ["Miracle cure", "Share now"]),
+])
+def test_split_sentences(text, expected):
+    assert split_sentences(text) == expected
+
+
+def test_split_sentences_stops_at_the_cap():
+    assert len(split_sentences("One. " * 50, max_sentences=10)) == 10
+
+
+@pytest.mark.parametrize("risk, verdict, label", [
+    ("high", "up", 1),
+    ("high", "down", 0),
+    ("medium", "up", 1),
+    ("medium", "down", 0),
+    ("low", "up", 0),
+    ("low", "down", 1),
+    ("high", "neutral", None),
+])
+def test_feedback_label(risk, verdict, label):
+    assert feedback_label(risk, verdict) == label
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app import fetcher as fetcher_module
+from app.config import settings
+from app.fetcher import ArticleFetcher, FetchError, check_public_url
+from benchmarks.stubs import ArticleServer
+
+
+@pytest.fixture
+def article_server():
+    with ArticleServer(latency_ms=100.0, n_paragraphs=5) as server:
+        yield server
+
+
+def _fetch_all(fetcher: ArticleFetcher, urls):
+    async def run():
+        try:
+            return await asyncio.gather(*(fetcher.fetch_text(u) for u in urls), return_exceptions=True)
+        finally:
+            await fetcher.close()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/",
+    "http://localhost:8000/admin",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.7/",
+    "http://[::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "file:///etc/passwd",
+])
+def test_non_public_urls_are_refused(url):
+    with pytest.raises(FetchError):
+        asyncio.run(check_public_url(url))
+
+
+def test_public_address_is_allowed():
+    asyncio.run(check_public_url("http://8.8.8.8/"))
+
+
+def test_local_article_server_is_refused_by_default(article_server):
+    result, = _fetch_all(ArticleFetcher(), [article_server.base_url + "/article/1"])
+    assert isinstance(result, FetchError)
+    assert article_server.requests == 0
+
+
+def test_concurrent_fetches_of_one_url_share_a_request(article_server, monkeypatch):
+    monkeypatch.setattr(settings, "fetch_allow_private_hosts", True)
+    url = article_server.base_url + "/article/2"
+    results = _fetch_all(ArticleFetcher(), [url] * 8)
+
+    assert all(isinstance(r, str) and "Health news 2" in r for r in results)
+    assert article_server.requests == 1
+
+
+def test_cancelled_leader_releases_waiters(article_server, monkeypatch):
+    monkeypatch.setattr(settings, "fetch_allow_private_hosts", True)
+    fetcher = ArticleFetcher()
+    url = article_server.base_url + "/article/3"
+
+    async def run():
+        leader = asyncio.create_task(fetcher.fetch_text(url))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(fetcher.fetch_text(url))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        try:
+            return await asyncio.wait_for(waiter, timeout=2)
+        except FetchError as e:
+            return e
+        finally:
+            await fetcher.close()
+
+    assert isinstance(asyncio.run(run()), FetchError)
+    assert url not in fetcher._inflight
+
+
+def test_rebinding_host_cannot_reach_a_private_address(article_server, monkeypatch):
+    """The name passes the URL check as a public IP, then resolves to loopback for the connection."""
+    answers = iter([["93.184.216.34"], ["127.0.0.1"]])
+
+    async def rebinding_resolve(host, port):
+        return next(answers)
+
+    monkeypatch.setattr(fetcher_module, "_resolve", rebinding_resolve)
+    port = article_server.base_url.rsplit(":", 1)[1]
+    result, = _fetch_all(ArticleFetcher(), [f"http://localhost:{port}/article/4"])
+
+    assert isinstance(result, FetchError)
+    assert article_server.requests == 0
+
+
+def test_connections_go_to_the_checked_address(article_server, monkeypatch):
+    monkeypatch.setattr(settings, "fetch_allow_private_hosts", True)
+    resolved = []
+
+    async def recording_resolve(host, port):
+        resolved.append(host)
+        return ["127.0.0.1"]
+
+    monkeypatch.setattr(fetcher_module, "_resolve", recording_resolve)
+    port = article_server.base_url.rsplit(":", 1)[1]
+    result, = _fetch_all(ArticleFetcher(), [f"http://articles.example:{port}/article/5"])
+
+    assert "Health news 5" in result
+    assert resolved == ["articles.example", "articles.example"]  # URL check, then the connection
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.llm import UNAVAILABLE_NOTE, LLMRouter
+from benchmarks.stubs import FakeCohereServer, FakeOpenAIServer
+
+OPENAI_TEXT = "OpenAI says these claims are unsupported."
+COHERE_TEXT = "Cohere says these claims are unsupported."
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """A fake OpenAI and a fake Cohere server behind a fresh router, both healthy and fast."""
+    openai = FakeOpenAIServer(latency_ms=10.0, token_latency_ms=1.0, text=OPENAI_TEXT).start()
+    cohere = FakeCohereServer(latency_ms=10.0, token_latency_ms=1.0, text=COHERE_TEXT).start()
+    for name, value in {
+        "openai_api_key": "test",
+        "openai_base_url": openai.base_url + "/v1",
+        "cohere_api_key": "test",
+        "cohere_base_url": cohere.base_url + "/v1",
+        "llm_provider_order": "openai,cohere",
+        "llm_timeout_seconds": 5.0,
+        "llm_hedge": True,
+        "llm_hedge_default_delay_ms": 100.0,
+        "llm_breaker_failures": 2,
+        "llm_breaker_reset_seconds": 0.3,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    router = LLMRouter()
+    yield router, openai, cohere
+    router.close()
+    openai.stop()
+    cohere.stop()
+
+
+def _analyze(router: LLMRouter, text: str = "Garlic cures dengue overnight."):
+    return asyncio.run(router.analyze_claims(text))
+
+
+def _state(router: LLMRouter, name: str):
+    return next(s for s in router.states if s.name == name)
+
+
+def test_fast_primary_answers_without_hedging(providers):
+    router, openai, cohere = providers
+    assert _analyze(router) == [OPENAI_TEXT]
+    assert (openai.requests, cohere.requests) == (1, 0)
+
+
+def test_slow_primary_is_hedged_to_the_next_provider(providers):
+    router, openai, cohere = providers
+    openai.latency_s = 1.0
+    start = time.monotonic()
+    assert _analyze(router) == [COHERE_TEXT]
+    assert time.monotonic() - start < 0.8
+    assert (openai.requests, cohere.requests) == (1, 1)
+
+
+def test_slow_primary_stream_is_hedged(providers):
+    router, openai, cohere = providers
+    openai.latency_s = 1.0
+    assert "".join(router.stream_claims("Garlic cures dengue overnight.")) == COHERE_TEXT
+
+
+def test_failing_provider_fails_over_and_trips_its_breaker(providers, monkeypatch):
+    router, openai, cohere = providers
+    monkeypatch.setattr(settings, "llm_hedge", False)  # outcomes are recorded before each call returns
+    openai.error_rate = 1.0
+    for _ in range(2):
+        assert _analyze(router) == [COHERE_TEXT]
+    assert _state(router, "openai").state() == "open"
+
+    # While open, OpenAI is skipped without a request
+    assert _analyze(router) == [COHERE_TEXT]
+    assert openai.requests == 2
+
+    # After the reset period one trial request closes it again
+    openai.error_rate = 0.0
+    time.sleep(settings.llm_breaker_reset_seconds)
+    assert _state(router, "openai").state() == "half_open"
+    assert _analyze(router) == [OPENAI_TEXT]
+    assert _state(router, "openai").state() == "closed"
+
+
+def test_failed_trial_reopens_the_breaker(providers, monkeypatch):
+    router, openai, cohere = providers
+    monkeypatch.setattr(settings, "llm_hedge", False)
+    openai.error_rate = 1.0
+    for _ in range(2):
+        _analyze(router)
+    time.sleep(settings.llm_breaker_reset_seconds)
+    assert _analyze(router) == [COHERE_TEXT]
+    assert openai.requests == 3
+    assert _state(router, "openai").state() == "open"
+
+
+def test_all_providers_down_falls_back_to_the_heuristic_note(providers):
+    router, openai, cohere = providers
+    openai.error_rate = cohere.error_rate = 1.0
+    assert _analyze(router) == [UNAVAILABLE_NOTE]
+    assert list(router.stream_claims("Garlic cures dengue overnight.")) == [UNAVAILABLE_NOTE]
+
+
+def test_stream_with_no_first_chunk_gives_up_at_the_deadline(providers, monkeypatch):
+    router, openai, cohere = providers
+    monkeypatch.setattr(settings, "llm_provider_order", "openai")
+    monkeypatch.setattr(settings, "llm_timeout_seconds", 0.3)
+
+    class HungProvider:
+        name = "openai"
+
+        def stream(self, text):
+            time.sleep(5)
+            yield "too late"
+
+    _state(router, "openai").provider = HungProvider()
+    start = time.monotonic()
+    assert list(router.stream_claims("Garlic cures dengue overnight.")) == [UNAVAILABLE_NOTE]
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from typing import List, Tuple
+
+from app.config import settings
+from app.routes import misinformation
+from benchmarks.stubs import generate_article
+
+
+def _events(body: bytes) -> List[Tuple[str, dict]]:
+    events = []
+    for block in body.decode().split("\n\n"):
+        if block.strip():
+            name, data = block.split("\n", 1)
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+async def _stream(app, payload: dict, on_chunk) -> int:
+    """Drive the ASGI app directly; httpx's ASGI transport would buffer the whole body."""
+    request = {"type": "http.request", "body": json.dumps(payload).encode(), "more_body": False}
+    status = 0
+
+    async def receive():
+        nonlocal request
+        if request is not None:
+            message, request = request, None
+            return message
+        await asyncio.Event().wait()  # no disconnect; cancelled once the response ends
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            on_chunk(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/misinformation-scan/stream",
+        "raw_path": b"/api/misinformation-scan/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"test"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def test_events_arrive_in_order(app, monkeypatch):
+    monkeypatch.setattr(settings, "misinfo_llm_mode", "always")
+    chunks: List[bytes] = []
+    status = asyncio.run(_stream(app, {"text": generate_article(n_paragraphs=6)}, chunks.append))
+
+    assert status == 200
+    events = _events(b"".join(chunks))
+    names = [name for name, _ in events]
+    first_summary = names.index("summary")
+    assert names[0] == "claim"
+    assert set(names[:first_summary]) == {"claim"}
+    assert set(names[first_summary:-1]) == {"summary"}
+    assert names[-1] == "high_risk_count"
+
+    claims = [data for name, data in events if name == "claim"]
+    summary = "".join(data["delta"] for name, data in events if name == "summary")
+    assert summary.startswith("These claims are not supported")  # streamed from the fake provider
+    assert events[-1][1]["high_risk_count"] == sum(1 for c in claims if c["risk"] == "high")
+
+
+def test_claims_are_sent_before_the_whole_text_is_scored(app, monkeypatch):
+    monkeypatch.setattr(settings, "misinfo_llm_mode", "never")
+    scored_batches = []
+    assess = misinformation._assess_sentences
+
+    def counting_assess(sentences):
+        scored_batches.append(len(sentences))
+        return assess(sentences)
+
+    monkeypatch.setattr(misinformation, "_assess_sentences", counting_assess)
+    # Every paragraph carries a sensational sentence, so each batch yields claims
+    text = generate_article(n_paragraphs=40, risky_every=1)
+    batches_at_first_claim = []
+
+    def on_chunk(chunk: bytes) -> None:
+        if chunk.startswith(b"event: claim") and not batches_at_first_claim:
+            batches_at_first_claim.append(len(scored_batches))
+
+    assert asyncio.run(_stream(app, {"text": text}, on_chunk)) == 200
+    assert len(scored_batches) > 3
+    assert max(scored_batches) <= misinformation.STREAM_BATCH_SENTENCES
+    # At most one batch of look-ahead: the middleware relays each chunk before the next is produced
+    assert batches_at_first_claim[0] <= 2
+
+
+def test_short_text_without_url_is_rejected(app):
+    chunks: List[bytes] = []
+    assert asyncio.run(_stream(app, {"text": "Hello."}, chunks.append)) == 422
@@ -0,0 +1,86 @@
+import pytest
+
+from app import ner_backends
+from app.nlp import SymptomExtractor
+from benchmarks.stubs import DEFAULT_VOCABULARY, StubNERPipeline
+
+TEXTS = [
+    "I have had a fever and a dry cough since yesterday",
+    "Chest pain and shortness of breath after climbing stairs",
+    "Mild headache, some nausea and dizziness at night",
+]
+
+
+@pytest.fixture
+def stub_loaders(monkeypatch):
+    """hf and torch-int8 run the full stub vocabulary; onnx misses a few entities."""
+    reduced = [v for v in DEFAULT_VOCABULARY if v not in ("cough", "nausea")]
+    loaders = {
+        "hf": lambda model_name: StubNERPipeline(latency_ms=0.0),
+        "torch-int8": lambda model_name: StubNERPipeline(latency_ms=0.0),
+        "onnx": lambda model_name: StubNERPipeline(latency_ms=0.0, vocabulary=reduced),
+    }
+    monkeypatch.setattr(ner_backends, "_LOADERS", loaders)
+    return loaders
+
+
+def test_identical_backend_has_full_parity(stub_loaders):
+    result = ner_backends.parity("torch-int8", "stub", TEXTS)
+    assert result["f1"] == 1.0
+    assert result["identical_texts"] == len(TEXTS)
+    assert result["score_abs_diff_max"] == 0.0
+
+
+def test_missing_entities_lower_recall(stub_loaders):
+    result = ner_backends.parity("onnx", "stub", TEXTS)
+    assert result["precision"] == 1.0
+    assert result["recall"] < 1.0
+    assert result["identical_texts"] == 1
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        ner_backends.load_pipeline("stub", "tensorrt")
+
+
+def test_extractor_falls_back_to_hf_and_records_it(stub_loaders, monkeypatch):
+    def missing_export(model_name):
+        raise FileNotFoundError("no ONNX export")
+
+    monkeypatch.setitem(stub_loaders, "onnx", missing_export)
+    extractor = SymptomExtractor(model_name="stub", backend="onnx")
+    extractor._pipeline = None  # the suite installs a shared stub on the class
+    extractor._ensure_pipeline()
+
+    assert extractor.loaded_backend == "hf"
+    names = [s["name"] for s in extractor.extract_symptoms(TEXTS[0])]
+    assert "fever" in names and "cough" in names
+
+
+def test_failed_load_is_not_retried_until_the_retry_time(stub_loaders, monkeypatch):
+    attempts = []
+
+    def broken(model_name):
+        attempts.append(model_name)
+        raise ImportError("no transformers")
+
+    monkeypatch.setitem(stub_loaders, "onnx", broken)
+    monkeypatch.setitem(stub_loaders, "hf", broken)
+    extractor = SymptomExtractor(model_name="stub", backend="onnx")
+    extractor._pipeline = None
+
+    assert extractor.current_backend() == "onnx"
+    assert attempts == []  # naming the backend never loads it
+    for _ in range(3):
+        assert extractor.extract_symptoms(TEXTS[0])  # keyword heuristics still answer
+    assert len(attempts) == 2  # onnx, then hf, once
+    assert extractor.current_backend() == "heuristic"
+
+    extractor._retry_at = 0.0
+    extractor._ensure_pipeline()
+    assert len(attempts) == 4
+
+
+def test_current_backend_without_the_model_is_heuristic():
+    assert SymptomExtractor(enable=False).current_backend() == "heuristic"
+    assert SymptomExtractor().current_backend(prefer_model=False) == "heuristic"
@@ -0,0 +1,78 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import db as db_module
+from app import models
+
+
+@pytest.fixture
+def unreachable_replica(monkeypatch, tmp_path):
+    """Route reads to a replica whose database cannot be opened, with its health check passed."""
+    replica = db_module._make_engine(f"sqlite:///{tmp_path}/missing-dir/replica.sqlite3")
+    monitor = db_module.ReplicaMonitor(replica, max_lag=5.0, check_seconds=60.0)
+    monitor.checked_at = time.monotonic()
+    monkeypatch.setattr(db_module, "read_engine", replica)
+    monkeypatch.setattr(db_module, "replica_monitor", monitor)
+    monkeypatch.setattr(
+        db_module, "ReadSessionLocal", sessionmaker(class_=db_module.ReadSession, autoflush=False, bind=replica)
+    )
+    yield monitor
+    replica.dispose()
+
+
+def _request():
+    return SimpleNamespace(method="GET", headers={}, cookies={}, state=SimpleNamespace())
+
+
+def test_failed_replica_read_is_retried_on_the_primary(unreachable_replica):
+    request = _request()
+    sessions = db_module.get_read_db(request)
+    db = next(sessions)
+    try:
+        assert request.state.read_source == "replica"
+        assert db.execute(text("SELECT 1")).scalar() == 1
+        assert request.state.read_source == "primary-retry"
+        assert unreachable_replica.reads["primary-retry"] == 1
+    finally:
+        sessions.close()
+
+
+@pytest.mark.parametrize("read", [
+    lambda db: db.scalar(select(func.count()).select_from(models.UserLog)),
+    lambda db: db.scalars(select(models.UserLog.id).limit(5)).all(),
+    lambda db: db.get(models.LogContent, 1),
+    lambda db: db.query(models.UserLog).limit(5).all(),
+], ids=["scalar", "scalars", "get", "query"])
+def test_every_read_api_falls_back_to_the_primary(unreachable_replica, read):
+    request = _request()
+    sessions = db_module.get_read_db(request)
+    db = next(sessions)
+    try:
+        read(db)
+        assert request.state.read_source == "primary-retry"
+    finally:
+        sessions.close()
+
+
+def test_read_route_survives_an_unreachable_replica(app, unreachable_replica):
+    from fastapi.testclient import TestClient
+
+    response = TestClient(app).get("/api/stats")
+    assert response.status_code == 200
+    assert unreachable_replica.reads["primary-retry"] >= 1
+
+
+def test_reads_stay_on_the_primary_without_a_replica(monkeypatch):
+    monkeypatch.setattr(db_module, "read_engine", None)
+    request = _request()
+    sessions = db_module.get_read_db(request)
+    db = next(sessions)
+    try:
+        assert db.execute(text("SELECT 1")).scalar() == 1
+        assert request.state.read_source == "primary"
+    finally:
+        sessions.close()
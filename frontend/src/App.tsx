@@ -1183,8 +1183,8 @@ function MisinformationFilter() {
                       )}
                     </div>
                     <div className="flex gap-2 pt-2">
-                      <button onClick={()=>sendFeedback('misinformation_scan','up')} className="px-3 py-2 rounded bg-green-600 text-white text-sm">Helpful</button>
-                      <button onClick={()=>sendFeedback('misinformation_scan','down')} className="px-3 py-2 rounded bg-red-600 text-white text-sm">Not Helpful</button>
+                      <button onClick={()=>sendFeedback('misinformation_scan','up',undefined,a.score != null ? a : undefined)} className="px-3 py-2 rounded bg-green-600 text-white text-sm">Helpful</button>
+                      <button onClick={()=>sendFeedback('misinformation_scan','down',undefined,a.score != null ? a : undefined)} className="px-3 py-2 rounded bg-red-600 text-white text-sm">Not Helpful</button>
                     </div>
                   </AnimatedCard>
                 ))}
@@ -1214,7 +1214,22 @@ const RecentActivity = () => {
     }
   };
 
-  useEffect(() => { fetchLogs() }, []);
+  useEffect(() => {
+    fetchLogs();
+    // Live updates over the activity feed instead of polling /logs
+    const ws = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/ws/activity`);
+    ws.onmessage = (msg) => {
+      try {
+        const evt = JSON.parse(msg.data);
+        if (evt.event === 'log') {
+          setItems(prev => [evt.data, ...prev.filter(it => it.id !== evt.data.id)].slice(0, 6));
+        }
+      } catch {
+        // ignore malformed frames
+      }
+    };
+    return () => ws.close();
+  }, []);
 
   return (
     <div>
@@ -1250,9 +1265,9 @@ const RecentActivity = () => {
   );
 };
 
-async function sendFeedback(context: string, verdict: 'up'|'down'|'neutral', notes?: string) {
+async function sendFeedback(context: string, verdict: 'up'|'down'|'neutral', notes?: string, assessment?: { claim: string, risk: string }) {
   try {
-    await axios.post(`${API_BASE}/feedback`, { context, verdict, notes });
+    await axios.post(`${API_BASE}/feedback`, { context, verdict, notes, claim: assessment?.claim, risk: assessment?.risk });
     toast.success('Thanks for the feedback!');
   } catch (e: any) {
     toast.error('Failed to send feedback');